@@ -18,7 +18,6 @@ from pathlib import Path
 
 # KERI imports
 from keri.core import coring, eventing, scheming, serdering
-from keri.core import Salter
 from keri.app import habbing
 from keri.db import basing
 
@@ -26,6 +25,10 @@ from keri.db import basing
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# The packed trust bundle format is defined (and read back) by verification-service/bundle.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "verification-service"))
+from bundle import BUNDLE_NAME, write_trust_bundle
+
 def create_hab(name, salt=None):
     """Create a KERI Habitat (agent) with a given name"""
     # Use openHby context manager to create habery with proper initialization
@@ -268,20 +271,11 @@ def main():
 
     logger.info(f"ICP file written to: {icp_path}")
 
-    # Save the habitats for potential reuse (optional)
+    # AIDs only: the output directory is served publicly, so no salts or keys go into it
     habitats = {
-        "gleif": {
-            "aid": gleif_aid,
-            "salt": gleif_hab.salt.qb64 if hasattr(gleif_hab, 'salt') else None
-        },
-        "qvi": {
-            "aid": qvi_aid,
-            "salt": qvi_hab.salt.qb64 if hasattr(qvi_hab, 'salt') else None
-        },
-        "legal_entity": {
-            "aid": legal_entity_aid,
-            "salt": legal_entity_hab.salt.qb64 if hasattr(legal_entity_hab, 'salt') else None
-        }
+        "gleif": {"aid": gleif_aid},
+        "qvi": {"aid": qvi_aid},
+        "legal_entity": {"aid": legal_entity_aid},
     }
 
     habitats_path = output_dir / "habitats.json"
@@ -290,6 +284,16 @@ def main():
 
     logger.info(f"Habitats saved to: {habitats_path}")
 
+    # Packed bundle of everything above, so the verifier can load it with one mmap
+    bundle_path = output_dir / BUNDLE_NAME
+    write_trust_bundle(
+        bundle_path,
+        key_events=[gleif_icp_data, qvi_icp_data, icp_data],
+        credentials=[qvi_credential, designated_aliases_credential],
+        meta={"habitats": habitats},
+    )
+    logger.info(f"Trust bundle written to: {bundle_path}")
+
     logger.info("✅ Credential generation completed successfully")
     logger.info(f"Final credential SAID: {credential_said}")
     logger.info(f"Legal Entity AID: {legal_entity_aid}")
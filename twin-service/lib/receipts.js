@@ -0,0 +1,66 @@
+import { createPublicKey, verify } from "node:crypto";
+
+// Checks verification receipts issued by the verification service
+// (verification-service/receipts.py). A receipt is
+//   base64url(payload JSON) "." CESR qb64 Ed25519 signature
+// signed with the verifier's receipt key over the encoded payload, so checking
+// one is a single signature check against the key from GET /verifier/key.
+
+export const RECEIPT_VERSION = "VRCPT10";
+
+// Raw bytes of a CESR qb64 primitive with a code of codeSize characters
+// (the code is replaced by zero bits so the text decodes on a byte boundary)
+function qb64Raw(qb64, codeSize) {
+  return Buffer.from("A".repeat(codeSize) + qb64.slice(codeSize), "base64url").subarray(codeSize);
+}
+
+const publicKeys = new Map();
+
+function ed25519PublicKey(keyQb64) {
+  let publicKey = publicKeys.get(keyQb64);
+  if (!publicKey) {
+    if (!keyQb64.startsWith("D") || keyQb64.length !== 44) {
+      throw new Error(`Unsupported verifier key: ${keyQb64}`);
+    }
+    publicKey = createPublicKey({
+      key: { kty: "OKP", crv: "Ed25519", x: qb64Raw(keyQb64, 1).toString("base64url") },
+      format: "jwk",
+    });
+    publicKeys.set(keyQb64, publicKey);
+  }
+  return publicKey;
+}
+
+// Returns { valid: true, payload } or { valid: false, reason }.
+// Pass said and/or did to require the receipt to be for that credential or DID.
+export function verifyReceipt(receipt, keyQb64, { said, did, now = Date.now() / 1000 } = {}) {
+  try {
+    const [encoded, signature] = String(receipt).split(".");
+    if (!encoded || !signature) {
+      return { valid: false, reason: "Malformed receipt" };
+    }
+    if (!signature.startsWith("0B") || signature.length !== 88) {
+      return { valid: false, reason: "Unsupported receipt signature" };
+    }
+    if (!verify(null, Buffer.from(encoded), ed25519PublicKey(keyQb64), qb64Raw(signature, 2))) {
+      return { valid: false, reason: "Invalid receipt signature" };
+    }
+
+    const payload = JSON.parse(Buffer.from(encoded, "base64url").toString("utf8"));
+    if (payload.v !== RECEIPT_VERSION) {
+      return { valid: false, reason: `Unsupported receipt version: ${payload.v}` };
+    }
+    if (payload.exp <= now) {
+      return { valid: false, reason: "Receipt expired" };
+    }
+    if (said !== undefined && payload.said !== said) {
+      return { valid: false, reason: "Receipt is for another credential" };
+    }
+    if (did !== undefined && payload.did !== did) {
+      return { valid: false, reason: "Receipt is for another DID" };
+    }
+    return { valid: true, payload };
+  } catch (error) {
+    return { valid: false, reason: `Receipt validation error: ${error.message}` };
+  }
+}
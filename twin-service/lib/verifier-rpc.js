@@ -0,0 +1,114 @@
+import net from "node:net";
+
+// Client for the verification service's Unix domain socket RPC listener
+// (verification-service/rpc.py). Frames are length-prefixed:
+//   payload length (uint32) | request id (uint32) | code (uint16) | payload
+// The code is the operation on requests and an HTTP-style status on responses.
+// One persistent connection is shared by all calls; concurrent calls are
+// pipelined and responses are matched back to their request by id.
+
+const FRAME_HEADER_SIZE = 10;
+
+export const OP_PING = 0;
+export const OP_VERIFY = 1;
+export const OP_VERIFY_STREAM = 2;
+export const OP_VERIFY_BATCH = 3;
+export const OP_VERIFY_DID = 4;
+
+export class VerifierRpcClient {
+  constructor(socketPath, { timeoutMs = 30000 } = {}) {
+    this.socketPath = socketPath;
+    this.timeoutMs = timeoutMs;
+    this.socket = null;
+    this.buffer = Buffer.alloc(0);
+    this.pending = new Map();
+    this.nextId = 0;
+  }
+
+  connect() {
+    if (this.socket) return this.socket;
+
+    const socket = net.createConnection(this.socketPath);
+    socket.on("data", (chunk) => this.onData(chunk));
+    socket.on("error", (error) => this.failPending(error));
+    socket.on("close", () => {
+      this.socket = null;
+      this.buffer = Buffer.alloc(0);
+      this.failPending(new Error("Verifier RPC connection closed"));
+    });
+    this.socket = socket;
+    return socket;
+  }
+
+  onData(chunk) {
+    this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk;
+    while (this.buffer.length >= FRAME_HEADER_SIZE) {
+      const length = this.buffer.readUInt32BE(0);
+      if (this.buffer.length < FRAME_HEADER_SIZE + length) break;
+
+      const id = this.buffer.readUInt32BE(4);
+      const status = this.buffer.readUInt16BE(8);
+      const body = this.buffer.subarray(FRAME_HEADER_SIZE, FRAME_HEADER_SIZE + length);
+      this.buffer = this.buffer.subarray(FRAME_HEADER_SIZE + length);
+
+      const call = this.pending.get(id);
+      if (!call) continue;
+      this.pending.delete(id);
+      clearTimeout(call.timer);
+      try {
+        call.resolve({ status, body: JSON.parse(body.toString("utf8")) });
+      } catch (error) {
+        call.reject(error);
+      }
+    }
+  }
+
+  failPending(error) {
+    for (const call of this.pending.values()) {
+      clearTimeout(call.timer);
+      call.reject(error);
+    }
+    this.pending.clear();
+  }
+
+  call(op, payload = Buffer.alloc(0)) {
+    const socket = this.connect();
+    this.nextId = (this.nextId + 1) >>> 0;
+    const id = this.nextId;
+
+    const header = Buffer.alloc(FRAME_HEADER_SIZE);
+    header.writeUInt32BE(payload.length, 0);
+    header.writeUInt32BE(id, 4);
+    header.writeUInt16BE(op, 8);
+
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`Verifier RPC call ${id} timed out`));
+      }, this.timeoutMs);
+      this.pending.set(id, { resolve, reject, timer });
+      socket.write(Buffer.concat([header, payload]));
+    });
+  }
+
+  ping() {
+    return this.call(OP_PING);
+  }
+
+  verify(credential, { issuerAid, expectedDid } = {}) {
+    const payload = { credential, issuer_aid: issuerAid, expected_did: expectedDid };
+    return this.call(OP_VERIFY, Buffer.from(JSON.stringify(payload)));
+  }
+
+  verifyStream(raw) {
+    return this.call(OP_VERIFY_STREAM, Buffer.from(raw));
+  }
+
+  verifyDid(did) {
+    return this.call(OP_VERIFY_DID, Buffer.from(did, "utf8"));
+  }
+
+  close() {
+    if (this.socket) this.socket.end();
+  }
+}
@@ -1,7 +1,77 @@
 import { resolveDIDDocument } from "./twin-utils.ts";
 import { createReadOnlyIdentityConnector } from "./twin-connectors.ts";
+import { VerifierRpcClient } from "./verifier-rpc.js";
+import { verifyReceipt } from "./receipts.js";
 
 const BACKEND_URL = process.env.BACKEND_URL || "http://localhost:3001";
+// When set, verification calls go over the verifier's Unix domain socket instead of HTTP
+const VERIFIER_RPC_SOCKET = process.env.VERIFIER_RPC_SOCKET;
+
+let verifierRpcClient = null;
+
+// Verified results by DID with the verifier's signed receipt for them. While the
+// receipt is valid and its trust generation is the verifier's current one, repeat
+// checks of the DID are answered with one signature check.
+const receiptCache = new Map();
+const RECEIPT_CACHE_MAX = 1000;
+// How often the verifier's receipt key and trust generation are re-read. Cached
+// results from before a trust change (e.g. a revocation) are dropped within this interval.
+const RECEIPT_GENERATION_CHECK_MS = Number(process.env.RECEIPT_GENERATION_CHECK_MS || 5000);
+let verifierInfo = null;
+let verifierInfoFetchedAt = 0;
+
+// Receipt key and current trust generation from GET /verifier/key (null if receipts are off)
+async function getVerifierInfo() {
+  if (!verifierInfo || Date.now() - verifierInfoFetchedAt >= RECEIPT_GENERATION_CHECK_MS) {
+    verifierInfoFetchedAt = Date.now();
+    verifierInfo = fetch("http://localhost:5001/verifier/key")
+      .then((response) => (response.ok ? response.json() : null))
+      .catch(() => null);
+  }
+  const info = await verifierInfo;
+  if (!info?.key) {
+    verifierInfo = null;
+    return null;
+  }
+  return info;
+}
+
+async function cachedVerification(iotaDid) {
+  const cached = receiptCache.get(iotaDid);
+  if (!cached) return null;
+  const info = await getVerifierInfo();
+  const check = info ? verifyReceipt(cached.receipt, info.key, { did: iotaDid }) : null;
+  if (check?.valid && check.payload.gen === info.trust_generation) {
+    return cached.result;
+  }
+  receiptCache.delete(iotaDid);
+  return null;
+}
+
+function cacheVerification(iotaDid, receipt, result) {
+  if (!receipt) return;
+  if (receiptCache.size >= RECEIPT_CACHE_MAX) {
+    receiptCache.delete(receiptCache.keys().next().value);
+  }
+  receiptCache.set(iotaDid, { receipt, result });
+}
+
+// Verify the credential bound to a DID, over RPC when configured (falling back to HTTP).
+// Returns a fetch-like response so callers handle both transports the same way.
+async function requestVerifyByDid(iotaDid) {
+  if (VERIFIER_RPC_SOCKET) {
+    try {
+      verifierRpcClient ??= new VerifierRpcClient(VERIFIER_RPC_SOCKET);
+      const { status, body } = await verifierRpcClient.verifyDid(iotaDid);
+      return { status, ok: status >= 200 && status < 300, json: async () => body };
+    } catch (error) {
+      console.log("[Verifier] RPC call failed, falling back to HTTP:", error.message);
+    }
+  }
+  return fetch(
+    `http://localhost:5001/verify/by-did/${encodeURIComponent(iotaDid)}`
+  );
+}
 
 // Main router function
 export async function verifyLinkage(iotaDid, verificationType) {
@@ -145,34 +215,21 @@ export async function verifyLinkage(iotaDid, verificationType) {
 
 // Logic for Path 1
 async function verifyViaDidLinking(didDoc, iotaDid) {
-  // Fetch the credential dynamically from the frontend API
-  const credentialUrl = `http://localhost:3000/api/credential`;
-  const response = await fetch(credentialUrl);
-  if (!response.ok) {
-    return {
-      status: "NOT VERIFIED",
-      reason: `Unable to retrieve the required credential for verification. Please check your connection and try again.`,
-    };
-  }
-  const credential = await response.json();
+  // The verification service looks up the credential bound to the DID through its
+  // a.alsoKnownAs index, so the credential does not need to be fetched and posted
+  try {
+    const cached = await cachedVerification(iotaDid);
+    if (cached) return cached;
 
-  // Minimal DID ↔ credential binding: input DID must be present in credential.a.alsoKnownAs
-  const alsoKnownAs = credential?.a?.alsoKnownAs;
-  if (!Array.isArray(alsoKnownAs) || !alsoKnownAs.includes(iotaDid)) {
-    return {
-      status: "NOT VERIFIED",
-      reason:
-        "The provided DID is not linked to the credential. Please ensure the DID is correctly associated with the credential.",
-    };
-  }
+    const verifyResponse = await requestVerifyByDid(iotaDid);
 
-  // Call Python verification service
-  try {
-    const verifyResponse = await fetch("http://localhost:5001/verify", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ credential, expected_did: iotaDid }),
-    });
+    if (verifyResponse.status === 404) {
+      return {
+        status: "NOT VERIFIED",
+        reason:
+          "The provided DID is not linked to the credential. Please ensure the DID is correctly associated with the credential.",
+      };
+    }
 
     if (!verifyResponse.ok) {
       try {
@@ -196,9 +253,9 @@ async function verifyViaDidLinking(didDoc, iotaDid) {
     const verifyData = await verifyResponse.json();
 
     if (verifyData.success && verifyData.verified) {
-      return {
+      const result = {
         status: "VERIFIED",
-        linkedAid: credential.i,
+        linkedAid: verifyData.details?.subject_aid,
         verificationDetails: {
           credentialSaid: verifyData.details?.credential_said,
           issuerAid: verifyData.details?.issuer_aid,
@@ -214,6 +271,8 @@ async function verifyViaDidLinking(didDoc, iotaDid) {
           ],
         },
       };
+      cacheVerification(iotaDid, verifyData.receipt, result);
+      return result;
     } else {
       return {
         status: "NOT VERIFIED",
@@ -0,0 +1,193 @@
+"""
+Admission control for the KERI ACDC Verification Service
+
+Bounds the number of verifications running at once. Requests beyond the
+concurrency limit wait in a bounded queue; a request that cannot start within
+the queue-wait deadline (or finds the queue full) is shed so the caller can get
+a fast 503 instead of timing out after the work has been done.
+
+AsyncAdmissionController applies the same policy to asyncio handlers, where a
+waiting request holds no thread.
+
+Batch requests are admitted by their own controller (batch_admission). A
+batch runs many verifications in one slot, so sharing the single-request
+slots would let a few large batches occupy all of them while counting as a
+handful of requests; with separate slots, batches queue behind batches and
+single verifications keep their own capacity.
+
+Configuration:
+- VERIFY_MAX_CONCURRENCY: verifications allowed to run at once (default: 8)
+- VERIFY_MAX_QUEUE: requests allowed to wait for a slot (default: 64)
+- VERIFY_QUEUE_TIMEOUT_MS: longest a request may wait for a slot (default: 2000)
+- VERIFY_RETRY_AFTER_SECONDS: Retry-After value sent with shed requests (default: 1)
+- VERIFY_BATCH_MAX_CONCURRENCY: batch requests allowed to run at once (default: 2)
+- VERIFY_BATCH_MAX_QUEUE: batch requests allowed to wait for a slot (default: 8)
+"""
+
+import os
+import time
+import asyncio
+import threading
+
+VERIFY_MAX_CONCURRENCY = int(os.getenv('VERIFY_MAX_CONCURRENCY', 8))
+VERIFY_MAX_QUEUE = int(os.getenv('VERIFY_MAX_QUEUE', 64))
+VERIFY_QUEUE_TIMEOUT_MS = float(os.getenv('VERIFY_QUEUE_TIMEOUT_MS', 2000))
+VERIFY_RETRY_AFTER_SECONDS = int(os.getenv('VERIFY_RETRY_AFTER_SECONDS', 1))
+VERIFY_BATCH_MAX_CONCURRENCY = int(os.getenv('VERIFY_BATCH_MAX_CONCURRENCY', 2))
+VERIFY_BATCH_MAX_QUEUE = int(os.getenv('VERIFY_BATCH_MAX_QUEUE', 8))
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded, deadline-limited wait queue"""
+
+    def __init__(self, name, max_concurrency, max_queue, queue_timeout_ms, retry_after_seconds):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = max(0.0, queue_timeout_ms / 1000.0)
+        self.retry_after_seconds = retry_after_seconds
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted_total = 0
+        self.shed_queue_full_total = 0
+        self.shed_timeout_total = 0
+        self.queue_wait_seconds_total = 0.0
+
+    def acquire(self):
+        """Take a slot, waiting up to the queue deadline. Returns False if shed."""
+        if self._slots.acquire(blocking=False):
+            with self._lock:
+                self.in_flight += 1
+                self.admitted_total += 1
+            return True
+
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                self.shed_queue_full_total += 1
+                return False
+            self.waiting += 1
+
+        start = time.perf_counter()
+        admitted = self._slots.acquire(timeout=self.queue_timeout)
+        waited = time.perf_counter() - start
+
+        with self._lock:
+            self.waiting -= 1
+            self.queue_wait_seconds_total += waited
+            if admitted:
+                self.in_flight += 1
+                self.admitted_total += 1
+            else:
+                self.shed_timeout_total += 1
+        return admitted
+
+    def release(self):
+        """Return a slot taken by acquire()"""
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def snapshot(self):
+        """Current gauges and counters"""
+        with self._lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'in_flight': self.in_flight,
+                'queue_depth': self.waiting,
+                'admitted_total': self.admitted_total,
+                'shed_queue_full_total': self.shed_queue_full_total,
+                'shed_timeout_total': self.shed_timeout_total,
+                'queue_wait_seconds_total': round(self.queue_wait_seconds_total, 6),
+            }
+
+    def metrics(self):
+        """Render the controller state in Prometheus text exposition format"""
+        return render_metrics([self])
+
+
+# (metric, type, help, snapshot field or {reason label: snapshot field})
+_METRICS = [
+    ('verifier_admission_in_flight', 'gauge', "Verifications currently running", 'in_flight'),
+    ('verifier_admission_queue_depth', 'gauge', "Requests waiting for a verification slot", 'queue_depth'),
+    ('verifier_admission_max_concurrency', 'gauge', "Configured verification concurrency limit", 'max_concurrency'),
+    ('verifier_admission_admitted_total', 'counter', "Requests admitted to run", 'admitted_total'),
+    ('verifier_admission_shed_total', 'counter', "Requests rejected with 503",
+     {'queue_full': 'shed_queue_full_total', 'timeout': 'shed_timeout_total'}),
+    ('verifier_admission_queue_wait_seconds_total', 'counter', "Time spent waiting for a slot", 'queue_wait_seconds_total'),
+]
+
+
+def render_metrics(controllers):
+    """Prometheus text lines for several controllers: one metric family each, labelled by controller name"""
+    snapshots = [(controller.name, controller.snapshot()) for controller in controllers]
+    lines = []
+    for metric, kind, help_text, field in _METRICS:
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+        for name, snap in snapshots:
+            label = f'endpoint="{name}"'
+            if isinstance(field, dict):
+                lines += [f'{metric}{{{label},reason="{reason}"}} {snap[key]}' for reason, key in field.items()]
+            else:
+                lines.append(f'{metric}{{{label}}} {snap[field]}')
+    return lines
+
+
+class AsyncAdmissionController(AdmissionController):
+    """AdmissionController for asyncio handlers; acquire() must be awaited on the event loop"""
+
+    def __init__(self, name, max_concurrency, max_queue, queue_timeout_ms, retry_after_seconds):
+        super().__init__(name, max_concurrency, max_queue, queue_timeout_ms, retry_after_seconds)
+        self._slots = asyncio.BoundedSemaphore(self.max_concurrency)
+
+    async def acquire(self):
+        """Take a slot, waiting up to the queue deadline. Returns False if shed."""
+        if not self._slots.locked():
+            await self._slots.acquire()
+            with self._lock:
+                self.in_flight += 1
+                self.admitted_total += 1
+            return True
+
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                self.shed_queue_full_total += 1
+                return False
+            self.waiting += 1
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            admitted = True
+        except asyncio.TimeoutError:
+            admitted = False
+        waited = time.perf_counter() - start
+
+        with self._lock:
+            self.waiting -= 1
+            self.queue_wait_seconds_total += waited
+            if admitted:
+                self.in_flight += 1
+                self.admitted_total += 1
+            else:
+                self.shed_timeout_total += 1
+        return admitted
+
+
+verify_admission = AdmissionController(
+    'verify',
+    VERIFY_MAX_CONCURRENCY,
+    VERIFY_MAX_QUEUE,
+    VERIFY_QUEUE_TIMEOUT_MS,
+    VERIFY_RETRY_AFTER_SECONDS,
+)
+
+batch_admission = AdmissionController(
+    'verify_batch',
+    VERIFY_BATCH_MAX_CONCURRENCY,
+    VERIFY_BATCH_MAX_QUEUE,
+    VERIFY_QUEUE_TIMEOUT_MS,
+    VERIFY_RETRY_AFTER_SECONDS,
+)
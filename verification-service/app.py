@@ -9,10 +9,28 @@ This service validates the entire issuance chain from Legal Entity -> QVI -> GLE
 """
 
 import os
+import copy
 import json
+import time
+import hashlib
 import logging
-from flask import Flask, request, jsonify
+import threading
+from functools import wraps
+from flask import Flask, Response, request, jsonify
 from dotenv import load_dotenv
+import cesr_stream
+import rpc
+import tracing
+import workers
+import sharding
+import receipts
+import capture
+import checkpoint
+import domain_linkage
+import profiling
+from admission import verify_admission, batch_admission, render_metrics
+from store import LMDB_MAP_SIZE, credential_issuer, credential_subject, open_trust_store
+from bundle import KIND_CREDENTIAL, KIND_KEY_EVENT, KIND_META, open_bundle
 # KERI imports for cryptographic verification
 from keri.core import coring, eventing, parsing, scheming, serdering
 from keri.db import basing
@@ -23,7 +41,7 @@ load_dotenv()
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -32,6 +50,11 @@ app = Flask(__name__)
 
 # Configuration
 PORT = int(os.getenv('PORT', 5001))
+STATUS_MAX_AGE_SECONDS = int(os.getenv('STATUS_MAX_AGE_SECONDS', 60))
+VERIFY_MAX_BATCH_SIZE = int(os.getenv('VERIFY_MAX_BATCH_SIZE', 100))
+MAX_CHAIN_DEPTH = int(os.getenv('MAX_CHAIN_DEPTH', 8))
+TRUST_REFRESH_INTERVAL_SECONDS = float(os.getenv('TRUST_REFRESH_INTERVAL_SECONDS', 1.0))
+VERIFIER_DB_DIR = os.getenv('VERIFIER_DB_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db'))
 GLEIF_ROOT_AID = os.getenv('GLEIF_ROOT_AID')
 if not GLEIF_ROOT_AID:
     raise ValueError("GLEIF_ROOT_AID environment variable is required for credential verification")
@@ -40,51 +63,135 @@ if not GLEIF_ROOT_AID:
 verifier_hby = None
 verifier_hab = None
 verifier_baser = None
+trust_store = None
+
+# Signs verification receipts with the receipt key verifier_hab endorses (None when RECEIPT_TTL_SECONDS is 0)
+receipt_signer = None
+
+# habitats.json contents (GLEIF, QVI and Legal Entity AIDs) as of the last seed
+trust_habitats = {}
+
+# Trust-state generation: bumped whenever the seeded trust artifacts change
+trust_generation = 0
+_trust_fingerprint = None
+_trust_checked_at = None
+_refresh_lock = threading.Lock()
+
+# Credential status results for the current trust generation, keyed by SAID
+_status_cache = {}
+
+# Verified chain suffixes for the current trust generation, keyed by the SAID of the
+# credential authorizing the suffix's first AID (see traverse_issuance_chain)
+_chain_cache = {}
+
+# Verification worker processes (VERIFY_WORKER_PROCESSES), see workers.py
+verify_pool = None
+
+# Saves the warm caches periodically and on shutdown (CHECKPOINT_ENABLED), see checkpoint.py
+checkpointer = None
+
+# Start-up phase durations in seconds (reported on /metrics and by benchmark.py)
+startup_timings = {}
 
 def initialize_verifier():
     """Initialize verifier habitat and persistent Baser database"""
-    global verifier_hby, verifier_hab, verifier_baser
+    global verifier_hby, verifier_hab, verifier_baser, trust_store, receipt_signer
     try:
         # Create persistent Baser database for storing issuer key states
         from pathlib import Path
-        db_dir = Path(__file__).parent / "db"
-        db_dir.mkdir(exist_ok=True)
+        db_dir = Path(VERIFIER_DB_DIR)
+        db_dir.mkdir(parents=True, exist_ok=True)
 
-        verifier_baser = basing.Baser(name="verifier", temp=False, headDirPath=str(db_dir))
+        verifier_baser = basing.Baser(name="verifier", temp=False, headDirPath=str(db_dir), reopen=True)
         logger.info(f"Initialized persistent Baser database at: {db_dir}")
 
-        # Load the seeded key states from the seed script
-        seed_verifier_database()
+        # Key state, credentials and indexes share the Baser's LMDB environment.
+        # In sharded mode the local store only keeps this node's partition.
+        owns = sharding.owns if sharding.ring is not None else None
+        trust_store = sharding.shard_store(open_trust_store(verifier_baser, LMDB_MAP_SIZE, owns))
 
-        # Create verifier habery for verification operations (using Habery instead of Habitat)
-        verifier_hby = habbing.Habery(name="verifier", temp=False, headDirPath=str(db_dir))
-        verifier_hab = verifier_hby.makeHab(name="verifier")
+        # Load the seeded key states and start the first trust generation
+        refresh_verifier_state()
+
+        # Create verifier habery for verification operations on the same Baser (one LMDB environment)
+        verifier_hby = habbing.Habery(name="verifier", temp=False, headDirPath=str(db_dir), db=verifier_baser)
+        verifier_hab = verifier_hby.habByName("verifier") or verifier_hby.makeHab(name="verifier")
         logger.info(f"Initialized verifier habitat with AID: {verifier_hab.pre}")
+        if receipts.RECEIPT_TTL_SECONDS > 0:
+            receipt_signer = receipts.ReceiptSigner.from_hab(verifier_hab, VERIFIER_DB_DIR)
         return True
     except Exception as e:
         logger.error(f"Failed to initialize verifier habitat: {str(e)}")
         return False
 
+def trust_artifacts_fingerprint(inception_dir):
+    """Cheap fingerprint of the trust artifacts (file names, sizes and mtimes)"""
+    entries = []
+    for directory in (inception_dir, inception_dir / "icp"):
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_file():
+                        st = entry.stat()
+                        entries.append((entry.path, st.st_size, st.st_mtime_ns))
+        except FileNotFoundError:
+            continue
+    entries.sort()
+    return hashlib.blake2b(repr(entries).encode(), digest_size=16).hexdigest()
+
 def refresh_verifier_state():
-    """Ensure verifier is seeded with current artifacts and GLEIF AID."""
-    global GLEIF_ROOT_AID
+    """
+    Ensure verifier is seeded with current artifacts and GLEIF AID.
+
+    Artifacts are only re-read when their fingerprint changes; each change
+    starts a new trust generation and drops cached status results. The
+    fingerprint stats every artifact, so it is computed at most once every
+    TRUST_REFRESH_INTERVAL_SECONDS; calls in between return immediately.
+    """
+    global GLEIF_ROOT_AID, trust_generation, _trust_fingerprint, _trust_checked_at
+    now = time.monotonic()
+    if _trust_checked_at is not None and now - _trust_checked_at < TRUST_REFRESH_INTERVAL_SECONDS:
+        return True
+    _trust_checked_at = now
     try:
         from pathlib import Path
         script_dir = Path(__file__).parent
         inception_dir = script_dir.parent / "gleif-frontend" / "public" / ".well-known" / "keri"
 
-        # Update GLEIF_ROOT_AID if the inception file changed
-        gleif_incept_path = inception_dir / "gleif-incept.json"
-        if gleif_incept_path.exists():
-            with open(gleif_incept_path, 'r') as f:
-                event_data = json.load(f)
-            new_gleif = event_data.get('i')
+        fingerprint = trust_artifacts_fingerprint(inception_dir)
+        if fingerprint == _trust_fingerprint:
+            return True
+
+        with _refresh_lock:
+            if fingerprint == _trust_fingerprint:
+                return True
+
+            # Re-seed key states (GLEIF, QVI, LE) using current files
+            seed_verifier_database()
+
+            # Update GLEIF_ROOT_AID if the inception file changed
+            new_gleif = trust_habitats.get('gleif', {}).get('aid')
+            gleif_incept_path = inception_dir / "gleif-incept.json"
+            if not new_gleif and gleif_incept_path.exists():
+                with open(gleif_incept_path, 'r') as f:
+                    new_gleif = json.load(f).get('i')
             if new_gleif and new_gleif != GLEIF_ROOT_AID:
                 GLEIF_ROOT_AID = new_gleif
                 logger.info(f"Updated GLEIF_ROOT_AID from artifacts: {GLEIF_ROOT_AID}")
 
-        # Re-seed key states (GLEIF, QVI, LE) using current files
-        seed_verifier_database()
+            # The generation is persisted so a restart with unchanged artifacts keeps it
+            stored = trust_store.get_meta('trust_state') or {}
+            if _trust_fingerprint is None and stored.get('fingerprint') == fingerprint:
+                generation = stored.get('generation', 0)
+            else:
+                generation = max(trust_generation, stored.get('generation', 0)) + 1
+            trust_store.put_meta('trust_state', {'fingerprint': fingerprint, 'generation': generation})
+
+            _status_cache.clear()
+            _chain_cache.clear()
+            trust_generation = generation
+            _trust_fingerprint = fingerprint
+            logger.info(f"Trust artifacts changed, now at trust generation {trust_generation}")
         return True
     except Exception as e:
         logger.warning(f"refresh_verifier_state failed: {str(e)}")
@@ -92,11 +199,16 @@ def refresh_verifier_state():
 
 def seed_verifier_database():
     """Load inception events into the verifier database"""
+    global trust_habitats
     try:
         from pathlib import Path
         script_dir = Path(__file__).parent
         inception_dir = script_dir.parent / "gleif-frontend" / "public" / ".well-known" / "keri"
 
+        # Prefer the packed trust bundle: one mmap instead of opening each artifact
+        if seed_from_bundle(inception_dir):
+            return
+
         # Load inception events
         gleif_incept_path = inception_dir / "gleif-incept.json"
         qvi_incept_path = inception_dir / "qvi-incept.json"
@@ -107,69 +219,255 @@ def seed_verifier_database():
             if habitats_path.exists():
                 with open(habitats_path, 'r') as f:
                     habitats = json.load(f)
+                trust_habitats = habitats
                 le_aid = habitats.get('legal_entity', {}).get('aid')
                 if le_aid:
                     le_icp_path = inception_dir / "icp" / le_aid
         except Exception as e:
             logger.warning(f"Failed to derive Legal Entity ICP path from habitats.json: {str(e)}")
 
-        # Load GLEIF
-        if gleif_incept_path.exists():
-            with open(gleif_incept_path, 'r') as f:
-                event_data = json.load(f)
-            load_inception_event(event_data)
-
-        # Load QVI
-        if qvi_incept_path.exists():
-            with open(qvi_incept_path, 'r') as f:
-                event_data = json.load(f)
-            load_inception_event(event_data)
-
-        # Load Legal Entity
-        if le_icp_path and le_icp_path.exists():
-            with open(le_icp_path, 'r') as f:
-                event_data = json.load(f)
-            load_inception_event(event_data)
-
-        logger.info("Verifier database seeded with inception events")
+        # All writes go into the trust store in a single transaction
+        with trust_store.writer() as txn:
+            # Load GLEIF
+            if gleif_incept_path.exists():
+                with open(gleif_incept_path, 'r') as f:
+                    event_data = json.load(f)
+                load_inception_event(event_data, txn)
+
+            # Load QVI
+            if qvi_incept_path.exists():
+                with open(qvi_incept_path, 'r') as f:
+                    event_data = json.load(f)
+                load_inception_event(event_data, txn)
+
+            # Load Legal Entity
+            if le_icp_path and le_icp_path.exists():
+                with open(le_icp_path, 'r') as f:
+                    event_data = json.load(f)
+                load_inception_event(event_data, txn)
+
+            # Load credentials (indexed by SAID, subject, issuer and alsoKnownAs DID)
+            for credential_name in ("qvi-credential.json", "legal-entity-credential.json"):
+                credential_path = inception_dir / credential_name
+                if credential_path.exists():
+                    with open(credential_path, 'r') as f:
+                        credential_data = json.load(f)
+                    load_credential(credential_data, txn)
+
+        logger.debug("Verifier database seeded with inception events and credentials")
     except Exception as e:
         logger.error(f"Failed to seed verifier database: {str(e)}")
 
-def load_inception_event(event_data):
-    """Load a single inception event into the baser"""
+def seed_from_bundle(inception_dir):
+    """Load key events, credentials and habitats from trust-bundle.bin. Returns False if there is no usable bundle (missing, unreadable or stale)."""
+    global trust_habitats
+    bundle = open_bundle(inception_dir)
+    if bundle is None:
+        return False
+
+    with bundle:
+        with trust_store.writer() as txn:
+            for _aid, event_data in bundle.items(KIND_KEY_EVENT):
+                load_inception_event(event_data, txn)
+            for said in bundle.keys(KIND_CREDENTIAL):
+                # Records are already compact JSON, so they are stored without re-serializing
+                raw = bytes(bundle.raw(KIND_CREDENTIAL, said))
+                load_credential(json.loads(raw), txn, raw=raw)
+        trust_habitats = bundle.get(KIND_META, 'habitats') or {}
+
+    logger.debug("Verifier database seeded from trust bundle (%d records)", len(bundle))
+    return True
+
+def load_inception_event(event_data, txn=None):
+    """Load a single inception event's key state into the trust store"""
     try:
         aid = event_data['i']
-        verfer_qb64 = event_data['k'][0]
+        keys = event_data['k']
 
-        from keri.core import coring
+        # Reject events whose signing keys are not valid qb64 verfers
+        for verfer_qb64 in keys:
+            coring.Verfer(qb64=verfer_qb64)
 
-        verfer = coring.Verfer(qb64=verfer_qb64)
+        trust_store.put_key_state(aid, keys, event_data.get('s', "0"), txn=txn)
+        logger.debug("Loaded inception event for AID: %s", aid)
 
-        class MockKever:
-            def __init__(self, pre, verfers):
-                self.pre = pre
-                self.verfers = verfers
-
-        mock_kever = MockKever(aid, [verfer])
+    except Exception as e:
+        logger.error(f"Failed to load inception event: {str(e)}")
 
-        if not hasattr(verifier_baser, 'kevers'):
-            verifier_baser.kevers = {}
+def load_credential(credential_data, txn=None, raw=None):
+    """Store a credential in the trust store, indexed by SAID, subject, issuer and a.alsoKnownAs DIDs"""
+    try:
+        said = credential_data.get('d')
+        if not said:
+            logger.error("No SAID found in credential data")
+            return
 
-        verifier_baser.kevers[aid] = [mock_kever]
-        logger.info(f"Loaded inception event for AID: {aid}")
+        trust_store.put_credential(credential_data, raw=raw, txn=txn)
+        logger.debug("Loaded credential: %s", said)
 
     except Exception as e:
-        logger.error(f"Failed to load inception event: {str(e)}")
+        logger.error(f"Failed to load credential: {str(e)}")
+
+def admission_controlled(controller):
+    """Run the view under an admission controller, shedding with 503 + Retry-After"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not controller.acquire():
+                response = jsonify({
+                    "success": False,
+                    "error": "Verification service is overloaded, please retry later"
+                })
+                response.headers['Retry-After'] = str(controller.retry_after_seconds)
+                return response, 503
+            try:
+                return view(*args, **kwargs)
+            finally:
+                controller.release()
+        return wrapper
+    return decorator
+
+def trust_snapshot():
+    """(generation, snapshot) of the trust state for verification worker processes"""
+    return trust_generation, {
+        'store': trust_store.snapshot(),
+        'habitats': trust_habitats,
+        'generation': trust_generation,
+        'gleif_root_aid': GLEIF_ROOT_AID,
+        'receipt_signer': receipt_signer.export() if receipt_signer else None,
+        'chain_cache': _chain_cache.copy(),
+    }
+
+def warm_caches():
+    """In-memory caches that are checkpointed across restarts"""
+    return {'status': _status_cache, 'chain': _chain_cache}
+
+def checkpoint_path():
+    return os.path.join(VERIFIER_DB_DIR, checkpoint.CHECKPOINT_FILENAME)
+
+def save_warm_caches():
+    """Checkpoint the warm caches for the current trust generation; returns the entry count"""
+    return checkpoint.save_checkpoint(checkpoint_path(), trust_generation, _trust_fingerprint, warm_caches())
+
+def restore_warm_caches():
+    """Load checkpointed cache entries that belong to the current trust state"""
+    restored = checkpoint.load_checkpoint(checkpoint_path(), trust_generation, _trust_fingerprint)
+    caches = warm_caches()
+    for name, entries in restored.items():
+        if name in caches:
+            caches[name].update(entries)
+    count = sum(len(entries) for entries in restored.values())
+    if count:
+        logger.info(f"Restored {count} cache entries for trust generation {trust_generation} from checkpoint")
+    return count
+
+def run_request_handler(handler, *args, in_process=False):
+    """
+    Refresh the trust state, then run a verify_*_request handler
 
-# Initialize verifier on startup
-initialize_verifier()
+    Runs in the worker pool when VERIFY_WORKER_PROCESSES is set, in which case
+    the body comes back as encoded JSON bytes instead of a dict. in_process
+    keeps it in this process regardless (profiled requests, whose profile
+    would otherwise only cover the hop to the worker).
+    """
+    with tracing.span('refresh_state'):
+        refresh_verifier_state()
+    if verify_pool is None or in_process:
+        return globals()[handler](*args, refresh=False)
+    with tracing.span('worker_pool'):
+        return verify_pool.call(handler, *args)
+
+def json_response(body):
+    """Flask response for a JSON body given as a dict or as encoded bytes"""
+    if isinstance(body, (bytes, bytearray)):
+        return Response(body, mimetype='application/json')
+    return jsonify(body)
+
+# Initialize verifier on startup (worker processes load a trust snapshot instead)
+if not workers.in_worker_process():
+    _started = time.perf_counter()
+    initialize_verifier()
+    startup_timings['initialize_verifier'] = time.perf_counter() - _started
+    if checkpoint.CHECKPOINT_ENABLED and trust_store is not None:
+        _started = time.perf_counter()
+        restore_warm_caches()
+        startup_timings['restore_checkpoint'] = time.perf_counter() - _started
+        checkpointer = checkpoint.Checkpointer(save_warm_caches)
+        checkpointer.start()
+    _processes = workers.configured_processes()
+    if _processes > 0:
+        verify_pool = workers.VerifierPool(_processes, trust_snapshot, lambda: trust_generation)
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({"status": "healthy", "service": "keri-acdc-verifier"})
 
+def metrics_text(admission=(verify_admission, batch_admission)):
+    """Prometheus metrics in text format (shared by the Flask and ASGI /metrics), with the admission controllers' queues"""
+    lines = render_metrics(admission)
+    lines += [
+        '# HELP verifier_trust_generation Current trust-state generation',
+        '# TYPE verifier_trust_generation gauge',
+        f'verifier_trust_generation {trust_generation}',
+    ]
+    if startup_timings:
+        lines += [
+            '# HELP verifier_startup_phase_seconds Time spent in each start-up phase',
+            '# TYPE verifier_startup_phase_seconds gauge',
+        ]
+        lines += [f'verifier_startup_phase_seconds{{phase="{phase}"}} {seconds:.6f}' for phase, seconds in startup_timings.items()]
+    if sharding.ring is not None:
+        lines += [
+            '# HELP verifier_shard_remote_lookups_total Trust store lookups sent to other shards',
+            '# TYPE verifier_shard_remote_lookups_total counter',
+            f'verifier_shard_remote_lookups_total {trust_store.client.lookups}',
+            '# HELP verifier_shard_remote_errors_total Failed lookups on other shards',
+            '# TYPE verifier_shard_remote_errors_total counter',
+            f'verifier_shard_remote_errors_total {trust_store.client.errors}',
+        ]
+    linkage_stats = domain_linkage.domain_linkage_verifier.describe()
+    lines += [
+        '# HELP verifier_domain_linkage_fetches_total DID configuration and DID document lookups, by HTTP cache result',
+        '# TYPE verifier_domain_linkage_fetches_total counter',
+        f'verifier_domain_linkage_fetches_total{{cache="miss"}} {linkage_stats["requests"] - linkage_stats["revalidated"]}',
+        f'verifier_domain_linkage_fetches_total{{cache="revalidated"}} {linkage_stats["revalidated"]}',
+        f'verifier_domain_linkage_fetches_total{{cache="fresh"}} {linkage_stats["fresh_hits"]}',
+    ]
+    return "\n".join(lines) + "\n"
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(metrics_text(), mimetype='text/plain; version=0.0.4')
+
+def verifier_key_body():
+    """
+    Receipt key, with the verifier AID's endorsement of it, for checking receipts
+
+    trust_generation is the current generation: a client holding receipts for
+    an older one (the receipt's 'gen') must not trust them any more.
+    """
+    return {
+        "success": True,
+        "aid": receipt_signer.aid,
+        "aid_key": receipt_signer.aid_key,
+        "key": receipt_signer.key,
+        "endorsement": receipt_signer.endorsement,
+        "receipt_version": receipts.RECEIPT_VERSION,
+        "receipt_ttl_seconds": receipts.RECEIPT_TTL_SECONDS,
+        "trust_generation": trust_generation,
+    }
+
+@app.route('/verifier/key', methods=['GET'])
+def verifier_key():
+    if receipt_signer is None:
+        return jsonify({"success": False, "error": "Receipts are disabled"}), 404
+    refresh_verifier_state()
+    return jsonify(verifier_key_body())
+
 @app.route('/verify', methods=['POST'])
+@admission_controlled(verify_admission)
 def verify_credential():
     """
     Verify a KERI ACDC credential
@@ -178,66 +476,558 @@ def verify_credential():
     - credential: The ACDC credential object
     - issuer_aid: (optional) The issuer AID if not in credential
     - expected_did: (optional) DID that must appear in credential.a.alsoKnownAs
+
+    Alternatively the body can be a single ACDC sent as application/cesr (with
+    attached signatures), application/cbor or application/msgpack; issuer_aid
+    and expected_did are then passed as query parameters.
+
+    The trace ID is taken from the X-Trace-Id request header when present and
+    is echoed back in the response. Sending the profiling secret in the
+    X-Profile header writes a cProfile file for this request.
+    With CAPTURE_DIR set, sampled requests are recorded for replay.py.
     """
+    captured = capture.sampled()
+    # Captured requests are always traced so their records carry per-step timings
+    trace = tracing.start_trace(request.headers.get('X-Trace-Id'), sampled=True if captured else None)
+    outcome = 'error'
     try:
-        data = request.get_json()
-        if not data or 'credential' not in data:
-            return jsonify({
+        body = request.get_data(cache=False)
+        if profiling.requested(request.headers) or profiling.sampled():
+            with profiling.profile(trace.trace_id) as profile_result:
+                result, status = run_request_handler('verify_credential_request', body, request.mimetype,
+                                                     request.args.to_dict(), in_process=True)
+            response = json_response(result)
+            if profile_result['path']:
+                response.headers['X-Profile-File'] = profile_result['path'].name
+        else:
+            result, status = run_request_handler('verify_credential_request', body, request.mimetype, request.args.to_dict())
+            response = json_response(result)
+        outcome = 'verified' if status == 200 else 'not_verified'
+        if captured:
+            capture.record(trace, body, request.mimetype, request.args.to_dict(), result, status)
+        response.headers['X-Trace-Id'] = trace.trace_id
+        return response, status
+    finally:
+        tracing.finish_trace(trace, endpoint='/verify', outcome=outcome)
+
+def verify_credential_request(body, mimetype, args, refresh=True):
+    """Handle the body of a /verify request, returning (JSON body, status)"""
+    try:
+        try:
+            items = _read_verification_items(body, mimetype, args, batch=False)
+        except ValueError as e:
+            return {
                 "success": False,
-                "error": "Missing 'credential' in request body"
-            }), 400
-
-        credential = data['credential']
-        issuer_aid = data.get('issuer_aid')
-        expected_did = data.get('expected_did')
+                "error": str(e)
+            }, 400
+        if len(items) != 1:
+            return {
+                "success": False,
+                "error": f"Expected one credential, got {len(items)} (use /verify/batch)"
+            }, 400
+        item = items[0]
 
-        logger.info(f"Starting verification for credential: {credential.get('d', 'unknown')}")
+        logger.debug("Starting verification for credential: %s", item['credential'].get('d', 'unknown'))
+        tracing.annotate(credential_said=item['credential'].get('d'))
 
         # Ensure verifier is seeded with the latest artifacts (no manual restart required)
-        refresh_verifier_state()
+        if refresh:
+            with tracing.span('refresh_state'):
+                refresh_verifier_state()
 
         # Perform full verification
-        result = verify_acdc_credential(credential, issuer_aid, expected_did)
+        result = verify_acdc_credential(**item)
+        return _verification_body(result, item['expected_did'])
 
-        if result['verified']:
-            logger.info("Credential verification successful")
-            return jsonify({
-                "success": True,
-                "verified": True,
-                "message": "Credential verified successfully",
-                "details": result
-            })
-        else:
-            logger.warning(f"Credential verification failed: {result.get('reason', 'Unknown error')}")
-            return jsonify({
+    except Exception as e:
+        logger.error("Verification error: %s", e, exc_info=True)
+        return {
+            "success": False,
+            "error": f"Internal server error: {str(e)}"
+        }, 500
+
+def _read_verification_items(body, mimetype, args, batch):
+    """
+    Read the credentials to verify from a /verify or /verify/batch body
+
+    Returns a list of verify_acdc_credential keyword arguments. Binary bodies
+    are parsed from the request buffer by cesr_stream.parse_stream; JSON bodies carry
+    one /verify payload, or a list of them under 'items' for batches. Raises
+    ValueError with a client-facing message if the body is malformed.
+    """
+    if cesr_stream.accepts(mimetype):
+        streamed = cesr_stream.parse_stream(body, mimetype)
+        return [
+            {
+                'credential': message.serder.sad,
+                'issuer_aid': args.get('issuer_aid'),
+                'expected_did': args.get('expected_did'),
+                'serder': message.serder,
+                'sigers': message.sigers,
+            }
+            for message in streamed
+        ]
+
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+    if batch:
+        payloads = data.get('items') if isinstance(data, dict) else None
+    else:
+        payloads = [data]
+    if not isinstance(payloads, list) or not payloads:
+        raise ValueError("Missing 'items' in request body")
+    items = []
+    for payload in payloads:
+        if not isinstance(payload, dict) or not isinstance(payload.get('credential'), dict):
+            raise ValueError("Missing 'credential' in request body")
+        items.append({
+            'credential': payload['credential'],
+            'issuer_aid': payload.get('issuer_aid'),
+            'expected_did': payload.get('expected_did'),
+        })
+    return items
+
+def _verification_body(result, expected_did=None):
+    """Build the (JSON body, status) pair for a verify_acdc_credential result"""
+    if result['verified']:
+        logger.debug("Credential verification successful")
+        body = {
+            "success": True,
+            "verified": True,
+            "message": "Credential verified successfully",
+            "details": result
+        }
+        if receipt_signer is not None:
+            # Lets callers re-check this result with one signature check, see receipts.py
+            chain = [entry['aid'] for entry in result['issuance_chain']]
+            body['receipt'] = receipt_signer.issue(result['credential_said'], chain, trust_generation, expected_did)
+        return body, 200
+    else:
+        logger.warning("Credential verification failed: %s", result.get('reason', 'Unknown error'))
+        return {
+            "success": False,
+            "verified": False,
+            "error": result.get('reason', 'Verification failed'),
+            "details": result
+        }, 400
+
+@app.route('/verify/batch', methods=['POST'])
+@admission_controlled(batch_admission)
+def verify_batch():
+    """
+    Verify several KERI ACDC credentials in one request
+
+    Expects JSON with 'items', a list of /verify payloads, or a stream of ACDCs
+    sent as application/cesr, application/cbor or application/msgpack. Every
+    item gets its own result (same shape as a /verify response body); the
+    request itself succeeds even when some credentials do not verify.
+    """
+    trace = tracing.start_trace(request.headers.get('X-Trace-Id'))
+    outcome = 'error'
+    try:
+        result, status = run_request_handler('verify_batch_request', request.get_data(cache=False), request.mimetype, request.args.to_dict())
+        outcome = 'completed' if status == 200 else 'rejected'
+        response = json_response(result)
+        response.headers['X-Trace-Id'] = trace.trace_id
+        return response, status
+    finally:
+        tracing.finish_trace(trace, endpoint='/verify/batch', outcome=outcome)
+
+def verify_batch_request(body, mimetype, args, refresh=True):
+    """Handle the body of a /verify/batch request, returning (JSON body, status)"""
+    try:
+        try:
+            items = _read_verification_items(body, mimetype, args, batch=True)
+        except ValueError as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }, 400
+        if len(items) > VERIFY_MAX_BATCH_SIZE:
+            return {
+                "success": False,
+                "error": f"Batch of {len(items)} credentials exceeds the limit of {VERIFY_MAX_BATCH_SIZE}"
+            }, 413
+        tracing.annotate(batch_size=len(items))
+
+        if refresh:
+            with tracing.span('refresh_state'):
+                refresh_verifier_state()
+
+        results = [_verification_body(verify_acdc_credential(**item), item['expected_did'])[0] for item in items]
+        return {
+            "success": True,
+            "count": len(results),
+            "verified_count": sum(1 for result in results if result['verified']),
+            "results": results
+        }, 200
+
+    except Exception as e:
+        logger.error("Batch verification error: %s", e, exc_info=True)
+        return {
+            "success": False,
+            "error": f"Internal server error: {str(e)}"
+        }, 500
+
+@app.route('/verify/by-did/<path:did>', methods=['GET'])
+@admission_controlled(verify_admission)
+def verify_by_did(did):
+    """
+    Verify the seeded credential bound to an IOTA DID
+
+    The credential is found through the verifier's DID index (built from the
+    a.alsoKnownAs of every seeded credential), so callers only send the DID.
+    """
+    trace = tracing.start_trace(request.headers.get('X-Trace-Id'))
+    outcome = 'error'
+    try:
+        result, status = run_request_handler('verify_by_did_request', did)
+        outcome = {200: 'verified', 404: 'not_found'}.get(status, 'not_verified')
+        response = json_response(result)
+        response.headers['X-Trace-Id'] = trace.trace_id
+        return response, status
+    finally:
+        tracing.finish_trace(trace, endpoint='/verify/by-did', outcome=outcome)
+
+def verify_by_did_request(did, refresh=True):
+    """Handle the body of a /verify/by-did request, returning (JSON body, status)"""
+    try:
+        if refresh:
+            with tracing.span('refresh_state'):
+                refresh_verifier_state()
+
+        with tracing.span('did_lookup'):
+            credentials = [
+                credential
+                for credential in (trust_store.get_credential(said) for said in trust_store.lookup('dids', did))
+                if credential is not None
+            ]
+
+        if not credentials:
+            return {
                 "success": False,
                 "verified": False,
-                "error": result.get('reason', 'Verification failed'),
-                "details": result
-            }), 400
+                "error": "No credential is bound to the provided DID"
+            }, 404
+
+        # A DID may be bound to several credentials (e.g. after re-issuance); the first one that verifies wins
+        result = None
+        for credential in credentials:
+            tracing.annotate(credential_said=credential.get('d'))
+            result = verify_acdc_credential(credential, None, did)
+            if result['verified']:
+                break
+        return _verification_body(result, did)
 
     except Exception as e:
-        logger.error(f"Verification error: {str(e)}", exc_info=True)
-        return jsonify({
+        logger.error("Verification error: %s", e, exc_info=True)
+        return {
             "success": False,
             "error": f"Internal server error: {str(e)}"
-        }), 500
+        }, 500
+
+@app.route('/verify/domain-linkage', methods=['POST'])
+@admission_controlled(verify_admission)
+def verify_domain_linkage_endpoint():
+    """
+    Verify the W3C domain linkage of a DID
+
+    Expects JSON with:
+    - did: The DID to check
+    - origin: (optional) The web origin; defaults to the DID document's LinkedDomains service.
+      Other origins must be LinkedDomains endpoints of the DID or in DOMAIN_LINKAGE_ALLOWED_ORIGINS.
+    """
+    trace = tracing.start_trace(request.headers.get('X-Trace-Id'))
+    outcome = 'error'
+    try:
+        result, status = verify_domain_linkage_request(request.get_json(silent=True))
+        outcome = 'verified' if status == 200 else 'not_verified'
+        response = jsonify(result)
+        response.headers['X-Trace-Id'] = trace.trace_id
+        return response, status
+    finally:
+        tracing.finish_trace(trace, endpoint='/verify/domain-linkage', outcome=outcome)
+
+@app.route('/verify/domain-linkage/batch', methods=['POST'])
+@admission_controlled(batch_admission)
+def verify_domain_linkage_batch():
+    """
+    Verify the domain linkage of several DIDs
+
+    Expects JSON with 'items', a list of /verify/domain-linkage payloads. The
+    distinct origins and DID documents are fetched concurrently.
+    """
+    trace = tracing.start_trace(request.headers.get('X-Trace-Id'))
+    outcome = 'error'
+    try:
+        result, status = verify_domain_linkage_batch_request(request.get_json(silent=True))
+        outcome = 'completed' if status == 200 else 'rejected'
+        response = jsonify(result)
+        response.headers['X-Trace-Id'] = trace.trace_id
+        return response, status
+    finally:
+        tracing.finish_trace(trace, endpoint='/verify/domain-linkage/batch', outcome=outcome)
+
+def _domain_linkage_items(payloads):
+    """Validate /verify/domain-linkage payloads; raises ValueError with a client-facing message"""
+    if not isinstance(payloads, list) or not payloads:
+        raise ValueError("Missing 'items' in request body")
+    items = []
+    for payload in payloads:
+        if not isinstance(payload, dict) or not isinstance(payload.get('did'), str):
+            raise ValueError("Missing 'did' in request body")
+        if payload.get('origin') is not None and not isinstance(payload['origin'], str):
+            raise ValueError("'origin' must be a string")
+        items.append({'did': payload['did'], 'origin': payload.get('origin')})
+    return items
+
+def _domain_linkage_body(result):
+    if result['verified']:
+        return {
+            "success": True,
+            "verified": True,
+            "message": "Domain linkage verified successfully",
+            "details": result
+        }, 200
+    logger.warning("Domain linkage verification failed: %s", result.get('reason', 'Unknown error'))
+    return {
+        "success": False,
+        "verified": False,
+        "error": result.get('reason', 'Verification failed'),
+        "details": result
+    }, 400
+
+def verify_domain_linkage_request(payload):
+    """Handle the body of a /verify/domain-linkage request, returning (JSON body, status)"""
+    try:
+        items = _domain_linkage_items([payload])
+    except ValueError as e:
+        return {"success": False, "error": str(e)}, 400
+    return _domain_linkage_body(verify_domain_linkage(**items[0]))
+
+def verify_domain_linkage_batch_request(payload):
+    """Handle the body of a /verify/domain-linkage/batch request, returning (JSON body, status)"""
+    try:
+        items = _domain_linkage_items(payload.get('items') if isinstance(payload, dict) else None)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}, 400
+    if len(items) > VERIFY_MAX_BATCH_SIZE:
+        return {
+            "success": False,
+            "error": f"Batch of {len(items)} items exceeds the limit of {VERIFY_MAX_BATCH_SIZE}"
+        }, 413
+    tracing.annotate(batch_size=len(items))
+
+    with tracing.span('domain_linkage'):
+        results = [_domain_linkage_body(result)[0] for result in domain_linkage.domain_linkage_verifier.verify_many(items)]
+    return {
+        "success": True,
+        "count": len(results),
+        "verified_count": sum(1 for result in results if result['verified']),
+        "results": results
+    }, 200
+
+def rpc_handler(endpoint, handle, capture_mimetype=None, admission=verify_admission):
+    """
+    Wrap a (JSON body, status) request handler as an RPC operation with admission control and tracing
+
+    With capture_mimetype, sampled payloads are captured (see capture.py) as
+    request bodies of that content type.
+    """
+    def handler(payload):
+        if not admission.acquire():
+            return {
+                "success": False,
+                "error": "Verification service is overloaded, please retry later"
+            }, 503
+        captured = capture_mimetype is not None and capture.sampled()
+        trace = tracing.start_trace(sampled=True if captured else None)
+        outcome = 'error'
+        try:
+            result, status = handle(payload)
+            outcome = {200: 'verified', 404: 'not_found'}.get(status, 'not_verified')
+            if captured:
+                capture.record(trace, payload, capture_mimetype, {}, result, status, endpoint, transport='rpc')
+            return result, status
+        finally:
+            tracing.finish_trace(trace, endpoint=endpoint, outcome=outcome, transport='rpc')
+            admission.release()
+    return handler
+
+def start_rpc_listener(path):
+    """Serve the verification endpoints on a Unix domain socket (see rpc.py)"""
+    return rpc.RpcServer(path, {
+        rpc.OP_VERIFY: rpc_handler('/verify', lambda payload: run_request_handler('verify_credential_request', payload, 'application/json', {}),
+                                   capture_mimetype='application/json'),
+        rpc.OP_VERIFY_STREAM: rpc_handler('/verify/batch', lambda payload: run_request_handler('verify_batch_request', payload, 'application/cesr', {}),
+                                          admission=batch_admission),
+        rpc.OP_VERIFY_BATCH: rpc_handler('/verify/batch', lambda payload: run_request_handler('verify_batch_request', payload, 'application/json', {}),
+                                         admission=batch_admission),
+        rpc.OP_VERIFY_DID: rpc_handler('/verify/by-did', lambda payload: run_request_handler('verify_by_did_request', payload.decode())),
+    }).start()
+
+@app.route('/admin/profiling', methods=['GET', 'POST', 'DELETE'])
+def profiling_window():
+    """
+    Inspect, open or close a traffic profiling window
+
+    Requires the profiling secret in the X-Profile header. POST expects JSON with:
+    - percent: percentage of /verify requests to profile
+    - duration_seconds: how long the window stays open
+    """
+    if not profiling.authorized(request.headers.get('X-Profile')):
+        return jsonify({"success": False, "error": "Forbidden"}), 403
+
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            status = profiling.start_window(data.get('percent', 0), data.get('duration_seconds', 0))
+        except (TypeError, ValueError):
+            return jsonify({
+                "success": False,
+                "error": "'percent' and 'duration_seconds' must be numbers"
+            }), 400
+    elif request.method == 'DELETE':
+        status = profiling.stop_window()
+    else:
+        status = profiling.window_status()
+
+    return jsonify({"success": True, "profiling": status})
+
+@app.route('/credentials/<said>/status', methods=['GET'])
+@admission_controlled(verify_admission)
+def credential_status(said):
+    """
+    Cacheable verification status of a seeded credential
 
-def verify_acdc_credential(credential, issuer_aid=None, expected_did=None):
+    The ETag is derived from the credential SAID and the trust generation, so
+    it changes exactly when the result could change. A matching If-None-Match
+    gets a 304 without any verification work.
+    """
+    refresh_verifier_state()
+    generation = trust_generation
+
+    credential = trust_store.get_credential(said)
+    if credential is None:
+        return jsonify({
+            "success": False,
+            "error": f"Unknown credential: {said}"
+        }), 404
+
+    etag = f"{said}.{generation}"
+    cache_control = f"public, max-age={STATUS_MAX_AGE_SECONDS}"
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+        return response
+
+    response = jsonify(credential_status_body(said, credential, generation))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def shard_request_error():
+    """Error response for a /shard request that sharding is off for or that lacks the cluster secret, or None"""
+    if sharding.ring is None:
+        return jsonify({"success": False, "error": "Sharding is not enabled"}), 404
+    if not sharding.authorized(request.headers.get(sharding.SECRET_HEADER)):
+        return jsonify({"success": False, "error": "Missing or invalid shard secret"}), 401
+    return None
+
+def shard_lookup_error(key):
+    """Error response for a /shard lookup this node cannot answer, or None"""
+    error = shard_request_error()
+    if error:
+        return error
+    if not sharding.owns(key):
+        # Shard lookups never forward, so a misrouted one is an error rather than a second hop
+        owner = sharding.ring.node_for(key)
+        return jsonify({"success": False, "error": f"{key} is owned by {owner}"}), 421
+    refresh_verifier_state()
+    return None
+
+@app.route('/shard/ring', methods=['GET'])
+def shard_ring():
+    """Hash ring membership and this node's partition"""
+    error = shard_request_error()
+    if error:
+        return error
+    return jsonify({"success": True, **trust_store.describe()})
+
+@app.route('/shard/key-states/<aid>', methods=['GET'])
+def shard_key_state(aid):
+    """Key state of an AID owned by this node"""
+    error = shard_lookup_error(aid)
+    if error:
+        return error
+    key_state = trust_store.local.get_key_state(aid)
+    if key_state is None:
+        return jsonify({"success": False, "error": f"Unknown AID: {aid}"}), 404
+    return jsonify(key_state)
+
+@app.route('/shard/credentials/<said>', methods=['GET'])
+def shard_credential(said):
+    """Stored serialization of a credential owned by this node"""
+    error = shard_lookup_error(said)
+    if error:
+        return error
+    raw = trust_store.local.get_credential_raw(said)
+    if raw is None:
+        return jsonify({"success": False, "error": f"Unknown credential: {said}"}), 404
+    return Response(raw, mimetype='application/json')
+
+@app.route('/shard/indexes/<index>/<path:key>', methods=['GET'])
+def shard_index(index, key):
+    """Credential SAIDs under a key owned by this node in a named index"""
+    if index not in sharding.INDEX_KEYS:
+        return jsonify({"success": False, "error": f"Unknown index: {index}"}), 404
+    error = shard_lookup_error(key)
+    if error:
+        return error
+    return jsonify(trust_store.local.lookup(index, key))
+
+def credential_status_body(said, credential, generation):
+    """Status body for a seeded credential, verified at most once per trust generation"""
+    cached = _status_cache.get(said)
+    if cached and cached[0] == generation:
+        result = cached[1]
+    else:
+        result = verify_acdc_credential(credential)
+        _status_cache[said] = (generation, result)
+
+    return {
+        "success": True,
+        "said": said,
+        "verified": result['verified'],
+        "trust_generation": generation,
+        "details": result
+    }
+
+def verify_acdc_credential(credential, issuer_aid=None, expected_did=None, serder=None, sigers=None):
     """
     Perform full cryptographic verification of KERI ACDC credential
 
     Args:
         credential: The ACDC credential object
         issuer_aid: Optional issuer AID override
+        expected_did: Optional DID that must appear in credential.a.alsoKnownAs
+        serder: Optional SerderACDC already parsed from the received bytes
+        sigers: Optional indexed signatures attached to the received bytes
 
     Returns:
         dict: Verification result with details
     """
     try:
+        # The SAID the credential was received or stored under (what results and receipts name)
+        credential_said = credential.get('d')
+
         # Step 1: Basic credential validation
-        logger.info("Step 1: Validating credential structure using keripy SerderACDC parsing")
-        validation_result = validate_credential_structure(credential)
+        with tracing.span('structure_validation'):
+            validation_result = validate_credential_structure(credential, serder)
         if not validation_result['valid']:
             return {
                 'verified': False,
@@ -255,9 +1045,12 @@ def verify_acdc_credential(credential, issuer_aid=None, expected_did=None):
                     'step': 'did_binding'
                 }
 
+        # The credential is parsed once; later steps reuse the serder
+        serder = validation_result['serder']
+
         # Step 2: Resolve credential and issuer
-        logger.info("Step 2: Resolving credential and issuer using keripy database queries and AID validation")
-        resolution_result = resolve_credential_and_issuer(credential, issuer_aid)
+        with tracing.span('resolution'):
+            resolution_result = resolve_credential_and_issuer(credential, issuer_aid, serder)
         if not resolution_result['resolved']:
             return {
                 'verified': False,
@@ -266,11 +1059,10 @@ def verify_acdc_credential(credential, issuer_aid=None, expected_did=None):
             }
 
         issuer_aid = resolution_result['issuer_aid']
-        logger.info(f"Resolved issuer AID: {issuer_aid}")
 
         # Step 3: Validate cryptographic signatures
-        logger.info("Step 3: Validating cryptographic signatures using keripy Siger and verfers")
-        signature_result = validate_signatures(credential, issuer_aid)
+        with tracing.span('signature_validation'):
+            signature_result = validate_signatures(credential, issuer_aid, serder, sigers)
         if not signature_result['valid']:
             return {
                 'verified': False,
@@ -279,8 +1071,8 @@ def verify_acdc_credential(credential, issuer_aid=None, expected_did=None):
             }
 
         # Step 4: Traverse issuance chain
-        logger.info("Step 4: Traversing issuance chain using keripy database credential queries")
-        chain_result = traverse_issuance_chain(credential, issuer_aid)
+        with tracing.span('chain_traversal'):
+            chain_result = traverse_issuance_chain(credential, issuer_aid)
         if not chain_result['valid']:
             return {
                 'verified': False,
@@ -289,8 +1081,8 @@ def verify_acdc_credential(credential, issuer_aid=None, expected_did=None):
             }
 
         # Step 5: Verify GLEIF root of trust
-        logger.info("Step 5: Verifying GLEIF root of trust using keripy key state verification")
-        gleif_result = verify_gleif_root(chain_result['chain'])
+        with tracing.span('gleif_verification'):
+            gleif_result = verify_gleif_root(chain_result['chain'])
         if not gleif_result['valid']:
             return {
                 'verified': False,
@@ -298,36 +1090,51 @@ def verify_acdc_credential(credential, issuer_aid=None, expected_did=None):
                 'step': 'gleif_verification'
             }
 
-        logger.info("All verification steps completed successfully")
+        logger.debug("All verification steps completed successfully")
         return {
             'verified': True,
-            'credential_said': credential.get('d'),
+            'credential_said': credential_said,
+            'subject_aid': credential_subject(credential),
             'issuer_aid': issuer_aid,
             'issuance_chain': chain_result['chain'],
             'gleif_verified': True
         }
 
     except Exception as e:
-        logger.error(f"Verification process error: {str(e)}", exc_info=True)
+        logger.error("Verification process error: %s", e, exc_info=True)
         return {
             'verified': False,
             'reason': f"Verification process error: {str(e)}",
             'step': 'process_error'
         }
 
-def validate_credential_structure(credential):
+def verify_domain_linkage(did, origin=None):
+    """
+    W3C domain-linkage verification of a DID (see domain_linkage.py)
+
+    Checks the DID configuration served by origin (or by the DID document's
+    LinkedDomains origin) instead of an ACDC chain. Results are cached per
+    (origin, DID) for DOMAIN_LINKAGE_TTL_SECONDS.
+    """
+    with tracing.span('domain_linkage'):
+        return domain_linkage.domain_linkage_verifier.verify(did, origin)
+
+def validate_credential_structure(credential, serder=None):
     """Validate basic ACDC credential structure using keripy Serder"""
     try:
-        # Try to parse the credential using keripy SerderACDC
+        # Try to parse the credential using keripy SerderACDC, unless it was already parsed from the received bytes.
+        # Serder rewrites 'v' (and with makify 'd') in the dict it is given, so it parses a copy: results
+        # and receipts must name the SAID the credential was received or stored under
         # First attempt without makify (for existing credentials)
-        try:
-            serder = serdering.SerderACDC(sad=credential)
-        except Exception:
-            # If parsing fails, try with makify (for credential creation/validation)
+        if serder is None:
             try:
-                serder = serdering.SerderACDC(sad=credential, makify=True)
+                serder = serdering.SerderACDC(sad=copy.deepcopy(credential))
             except Exception:
-                return {'valid': False, 'reason': "Invalid credential format"}
+                # If parsing fails, try with makify (for credential creation/validation)
+                try:
+                    serder = serdering.SerderACDC(sad=copy.deepcopy(credential), makify=True)
+                except Exception:
+                    return {'valid': False, 'reason': "Invalid credential format"}
 
         # Check required fields are present and valid
         required_fields = ['v', 'd', 'i', 's', 'a']
@@ -338,48 +1145,22 @@ def validate_credential_structure(credential):
         if not serder.sad['v'].startswith('ACDC'):
             return {'valid': False, 'reason': "Invalid ACDC version"}
 
-        logger.info(f"Credential structure validated using keripy SerderACDC. SAID: {serder.said}")
+        logger.debug("Credential structure validated using keripy SerderACDC. SAID: %s", serder.said)
         return {'valid': True, 'serder': serder}
     except Exception as e:
         return {'valid': False, 'reason': f"Structure validation error: {str(e)}"}
 
-def resolve_credential_and_issuer(credential, issuer_aid=None):
+def resolve_credential_and_issuer(credential, issuer_aid=None, serder=None):
     """Resolve credential and determine issuer AID using keripy"""
     try:
-        import json as _json
         # Parse the credential using keripy SerderACDC
-        serder = serdering.SerderACDC(sad=credential)
+        if serder is None:
+            serder = serdering.SerderACDC(sad=credential)
 
         # Determine issuer AID without falling back to subject ('i')
-        # Priority: explicit issuer_aid -> attestation issuer in 'a.issuer' -> habitats.json QVI AID (test-only)
-        def _load_habitats_qvi_aid():
-            try:
-                from pathlib import Path
-                habitats_path = Path(__file__).parent.parent / "gleif-frontend" / "public" / ".well-known" / "keri" / "habitats.json"
-                if habitats_path.exists():
-                    with open(habitats_path, 'r') as f:
-                        habitats = json.load(f)
-                    return habitats.get('qvi', {}).get('aid')
-            except Exception:
-                return None
-            return None
-
-        resolved_issuer_aid = (
-            issuer_aid
-            or credential.get('a', {}).get('issuer')
-        )
-        # PoC deterministic derivation: if not found, read QVI AID from generated qvi-credential.json
-        if not resolved_issuer_aid:
-            try:
-                from pathlib import Path
-                qvi_path = Path(__file__).parent.parent / "gleif-frontend" / "public" / ".well-known" / "keri" / "qvi-credential.json"
-                if qvi_path.exists():
-                    with open(qvi_path, 'r') as f:
-                        qvi_cred = _json.load(f)
-                    # Subject of QVI credential is the QVI AID, which is the issuer of the LE credential
-                    resolved_issuer_aid = qvi_cred.get('i')
-            except Exception as e:
-                logger.warning(f"Failed to derive issuer from qvi-credential.json: {str(e)}")
+        # Priority: explicit issuer_aid -> the credential's issuer (a.issuer, or 'i' in the vLEI layout)
+        # -> seeded QVI AID (test-only: the generated Legal Entity credential names no issuer)
+        resolved_issuer_aid = issuer_aid or credential_issuer(credential) or trust_habitats.get('qvi', {}).get('aid')
         if not resolved_issuer_aid:
             return {'resolved': False, 'reason': "Unable to determine issuer AID"}
 
@@ -389,33 +1170,23 @@ def resolve_credential_and_issuer(credential, issuer_aid=None):
         except Exception as e:
             return {'resolved': False, 'reason': f"Invalid issuer AID format: {str(e)}"}
 
-        # For testing purposes, accept known AIDs from habitats.json if present (no hard failure)
-        try:
-            from pathlib import Path
-            habitats_path = Path(__file__).parent.parent / "gleif-frontend" / "public" / ".well-known" / "keri" / "habitats.json"
-            if habitats_path.exists():
-                with open(habitats_path, 'r') as f:
-                    habitats = json.load(f)
-                known_aids = [habitats['gleif']['aid'], habitats['qvi']['aid'], habitats['legal_entity']['aid']]
-                if resolved_issuer_aid not in known_aids:
-                    logger.warning(f"Issuer AID {resolved_issuer_aid} not in known AIDs: {known_aids}")
-            else:
-                logger.warning("Habitats file not found, skipping AID validation")
-        except Exception:
-            logger.warning("Failed to load habitats for AID validation, continuing")
+        # For testing purposes, accept known AIDs from the seeded habitats (no hard failure)
+        if trust_habitats:
+            known_aids = [trust_habitats.get(name, {}).get('aid') for name in ('gleif', 'qvi', 'legal_entity')]
+            if resolved_issuer_aid not in known_aids:
+                logger.warning("Issuer AID %s not in known AIDs: %s", resolved_issuer_aid, known_aids)
+        else:
+            logger.warning("Habitats not seeded, skipping AID validation")
 
         # Query the KERI database to verify the issuer exists and has published key state
         try:
-            # Get the issuer's key state from the Baser database
-            if hasattr(verifier_baser, 'kevers') and verifier_baser.kevers:
-                issuer_state = verifier_baser.kevers.get(resolved_issuer_aid)
-                logger.info(f"Issuer state lookup: issuer={resolved_issuer_aid}, found_kever={(issuer_state is not None)}")
-                if not issuer_state:
-                    logger.warning(f"Issuer AID {resolved_issuer_aid} not found in database, but continuing for testing")
-            else:
-                logger.warning("Baser kevers not available, skipping database check")
+            # Check the issuer's key state in the trust store (zero-copy existence check)
+            issuer_known = trust_store.has_key_state(resolved_issuer_aid)
+            logger.debug("Issuer state lookup: issuer=%s, found_key_state=%s", resolved_issuer_aid, issuer_known)
+            if not issuer_known:
+                logger.warning("Issuer AID %s not found in database, but continuing for testing", resolved_issuer_aid)
 
-            logger.info(f"Resolved issuer AID: {resolved_issuer_aid} using keripy database query for key state verification")
+            logger.debug("Resolved issuer AID: %s using keripy database query for key state verification", resolved_issuer_aid)
         except Exception as e:
             logger.warning(f"Failed to query issuer key state: {str(e)}, but continuing for testing")
 
@@ -428,17 +1199,22 @@ def resolve_credential_and_issuer(credential, issuer_aid=None):
     except Exception as e:
         return {'resolved': False, 'reason': f"Resolution error: {str(e)}"}
 
-def validate_signatures(credential, issuer_aid):
+def validate_signatures(credential, issuer_aid, serder=None, sigers=None):
     """Validate cryptographic signatures using keripy and database key states"""
     try:
-        logger.info(f"Validating signatures for issuer: {issuer_aid}")
+        logger.debug("Validating signatures for issuer: %s", issuer_aid)
+
+        # Signatures attached to a CESR stream are checked against the exact received bytes
+        if sigers:
+            return verify_attached_signatures(serder, issuer_aid, sigers)
 
         # Check if credential has signature data
         if 'p' not in credential:
             return {'valid': False, 'reason': "No signature data found"}
 
         # Parse the credential using keripy SerderACDC
-        serder = serdering.SerderACDC(sad=credential)
+        if serder is None:
+            serder = serdering.SerderACDC(sad=credential)
 
         # Extract signatures from the credential
         signatures = credential.get('p', [])
@@ -447,66 +1223,134 @@ def validate_signatures(credential, issuer_aid):
 
         # Query the KERI database for the issuer's current key state
         try:
-            if hasattr(verifier_baser, 'kevers') and verifier_baser.kevers:
-                issuer_kevers = verifier_baser.kevers.get(issuer_aid)
-                if not issuer_kevers:
-                    logger.warning(f"No key state found for issuer {issuer_aid}, but continuing for testing")
-                else:
-                    # Get the current key state (latest kever)
-                    issuer_kever = issuer_kevers[-1]  # Most recent key state
-                    verfers = issuer_kever.verfers  # Public keys for verification
-                    logger.info(f"Retrieved {len(verfers)} public keys for issuer {issuer_aid} from keripy key state")
+            issuer_state = trust_store.get_key_state(issuer_aid)
+            if not issuer_state:
+                logger.warning("No key state found for issuer %s, but continuing for testing", issuer_aid)
             else:
-                logger.warning("Baser kevers not available, skipping key state check")
+                # Current signing keys (qb64) for verification
+                keys = issuer_state['k']
+                logger.debug("Retrieved %d public keys for issuer %s from key state", len(keys), issuer_aid)
         except Exception as e:
             logger.warning(f"Failed to retrieve issuer key state: {str(e)}, but continuing for testing")
 
         # For testing purposes, skip detailed cryptographic verification and assume valid
         # since we have confirmed the issuer exists in habitats.json
-        logger.info("Skipping detailed cryptographic verification - using simplified validation for testing")
-        logger.info(f"Cryptographic signature verification successful using keripy. Verified {len(signatures)} signatures")
+        logger.debug("Skipping detailed cryptographic verification - using simplified validation for testing")
+        logger.debug("Cryptographic signature verification successful using keripy. Verified %d signatures", len(signatures))
         return {'valid': True, 'signatures': signatures, 'verified_count': len(signatures)}
 
     except Exception as e:
         return {'valid': False, 'reason': f"Signature validation error: {str(e)}"}
 
-def traverse_issuance_chain(credential, issuer_aid):
-    """Traverse the issuance chain using the KERI credential registry."""
-    try:
-        chain = []
-        # The credential subject is the Legal Entity's AID
-        le_aid = credential['i']
-        # The credential issuer is the QVI's AID
-        qvi_aid = issuer_aid
-
-        chain.append({'level': 'Legal Entity', 'aid': le_aid})
-        chain.append({'level': 'QVI', 'aid': qvi_aid})
-
-        # Now, find the credential that authorized the QVI. Its issuer will be GLEIF.
-        gleif_aid = None
+def verify_attached_signatures(serder, issuer_aid, sigers):
+    """Verify indexed signatures over serder.raw against the issuer's current signing keys"""
+    issuer_state = trust_store.get_key_state(issuer_aid)
+    if not issuer_state:
+        return {'valid': False, 'reason': f"No key state found for issuer {issuer_aid}"}
+
+    keys = issuer_state['k']
+    for siger in sigers:
+        if siger.index >= len(keys):
+            return {'valid': False, 'reason': f"Signature index {siger.index} out of range for issuer keys"}
+        if not coring.Verfer(qb64=keys[siger.index]).verify(siger.raw, serder.raw):
+            return {'valid': False, 'reason': f"Invalid signature at index {siger.index}"}
+
+    logger.debug("Verified %d attached signatures for issuer %s", len(sigers), issuer_aid)
+    return {'valid': True, 'signatures': [siger.qb64 for siger in sigers], 'verified_count': len(sigers)}
+
+def chain_level(aid, default='Issuer'):
+    """Display level of an AID in the issuance chain, from the seeded habitats"""
+    for name, level in (('gleif', 'GLEIF'), ('qvi', 'QVI'), ('legal_entity', 'Legal Entity')):
+        if trust_habitats.get(name, {}).get('aid') == aid:
+            return level
+    return 'GLEIF' if aid == GLEIF_ROOT_AID else default
+
+def find_authorizing_credential(credential, aid):
+    """
+    Return (said, credential) of the seeded credential issued to aid that authorizes it, or (None, None)
 
-        # Resolve GLEIF AID deterministically from the two generated JSON credentials (PoC registry)
-        try:
-            from pathlib import Path
-            keri_dir = Path(__file__).parent.parent / "gleif-frontend" / "public" / ".well-known" / "keri"
-            qvi_cred_path = keri_dir / "qvi-credential.json"
-            if qvi_cred_path.exists():
-                with open(qvi_cred_path, 'r') as f:
-                    qvi_cred = json.load(f)
-                if qvi_cred.get('i') == qvi_aid:
-                    gleif_aid = qvi_cred.get('a', {}).get('issuer')
-        except Exception as e:
-            logger.warning(f"Failed to read PoC registry credentials: {str(e)}")
+    Credentials with an 'e' edge block are chained through their edges only:
+    the parent is the edge target ('n' SAID) whose subject is aid. Credentials
+    without edges fall back to the subject index. Each hop is one index lookup.
+    """
+    edges = credential.get('e')
+    targets = [edge['n'] for edge in edges.values() if isinstance(edge, dict) and edge.get('n')] if isinstance(edges, dict) else []
+    if targets:
+        for said in targets:
+            parent = trust_store.get_credential(said)
+            if parent is not None and credential_subject(parent) == aid:
+                return said, parent
+        return None, None
+
+    for said in trust_store.lookup('subjects', aid):
+        parent = trust_store.get_credential(said)
+        if parent:
+            return said, parent
+    return None, None
 
-        if not gleif_aid:
-            return {'valid': False, 'reason': f"Chain traversal failed: Could not find a credential issued to QVI {qvi_aid} in the database."}
+def traverse_issuance_chain(credential, issuer_aid):
+    """
+    Follow the issuance chain from the credential up to the GLEIF root AID
+
+    Each hop finds the credential authorizing the current issuer (see
+    find_authorizing_credential), checks its structure and signatures and
+    continues with its issuer, for at most MAX_CHAIN_DEPTH hops. An AID seen
+    twice is a cycle. Verified chain suffixes are cached per trust generation
+    by the SAID of their authorizing credential, so chains sharing a parent
+    (e.g. all Legal Entities under one QVI) only walk it once.
+    """
+    try:
+        generation = trust_generation
+        subject_aid = credential_subject(credential)
+        chain = [{'level': chain_level(subject_aid, 'Subject'), 'aid': subject_aid, 'credential_said': credential.get('d')}]
+        seen = {subject_aid}
+        aid, current = issuer_aid, credential
+
+        for _ in range(MAX_CHAIN_DEPTH):
+            if aid in seen:
+                return {'valid': False, 'reason': f"Chain traversal failed: cycle at AID {aid}"}
+            seen.add(aid)
+
+            if aid == GLEIF_ROOT_AID:
+                chain.append({'level': chain_level(aid), 'aid': aid})
+                break
+
+            said, parent = find_authorizing_credential(current, aid)
+            if parent is None:
+                return {'valid': False, 'reason': f"Chain traversal failed: Could not find a credential issued to {chain_level(aid)} {aid} in the database."}
+
+            cached = _chain_cache.get(said)
+            if cached and cached[0] == generation:
+                chain.extend(cached[1])
+                if len({entry['aid'] for entry in chain}) != len(chain):
+                    return {'valid': False, 'reason': f"Chain traversal failed: cycle through credential {said}"}
+                break
+
+            parent_issuer = credential_issuer(parent)
+            if not parent_issuer:
+                return {'valid': False, 'reason': f"Chain traversal failed: credential {said} issued to {aid} has no issuer"}
+            structure = validate_credential_structure(parent)
+            if not structure['valid']:
+                return {'valid': False, 'reason': f"Chain traversal failed: credential {said}: {structure['reason']}"}
+            signatures = validate_signatures(parent, parent_issuer, structure['serder'])
+            if not signatures['valid']:
+                return {'valid': False, 'reason': f"Chain traversal failed: credential {said}: {signatures['reason']}"}
+
+            chain.append({'level': chain_level(aid), 'aid': aid, 'credential_said': said})
+            aid, current = parent_issuer, parent
+        else:
+            return {'valid': False, 'reason': f"Chain traversal failed: no GLEIF root within {MAX_CHAIN_DEPTH} hops"}
 
-        chain.append({'level': 'GLEIF', 'aid': gleif_aid})
+        # Every suffix up to the root is now verified
+        for index in range(1, len(chain)):
+            said = chain[index].get('credential_said')
+            if said and said not in _chain_cache:
+                _chain_cache[said] = (generation, chain[index:])
 
-        logger.info(f"Successfully traversed issuance chain via database: {chain}")
+        logger.debug("Successfully traversed issuance chain via database: %s", chain)
         return {'valid': True, 'chain': chain}
     except Exception as e:
-        logger.error(f"Chain traversal error: {str(e)}", exc_info=True)
+        logger.error("Chain traversal error: %s", e, exc_info=True)
         return {'valid': False, 'reason': f"Chain traversal error: {str(e)}"}
 
 def verify_gleif_root(chain):
@@ -515,27 +1359,21 @@ def verify_gleif_root(chain):
         if not chain:
             return {'valid': False, 'reason': "Empty issuance chain"}
 
-        gleif_entry = chain[-1]  # Last entry should be GLEIF
-        if gleif_entry['level'] != 'GLEIF':
-            return {'valid': False, 'reason': "Chain does not end with GLEIF"}
-
-        if gleif_entry['aid'] != GLEIF_ROOT_AID:
-            return {'valid': False, 'reason': f"GLEIF AID mismatch. Expected: {GLEIF_ROOT_AID}, Got: {gleif_entry['aid']}"}
+        root_aid = chain[-1]['aid']
+        if root_aid != GLEIF_ROOT_AID:
+            return {'valid': False, 'reason': f"GLEIF AID mismatch. Expected: {GLEIF_ROOT_AID}, Got: {root_aid}"}
 
         # Verify that the GLEIF AID exists in the KERI database and has valid key state
         try:
-            gleif_kevers = verifier_baser.kevers.get(GLEIF_ROOT_AID)
-            if not gleif_kevers:
+            gleif_state = trust_store.get_key_state(GLEIF_ROOT_AID)
+            if not gleif_state:
                 return {'valid': False, 'reason': f"GLEIF AID {GLEIF_ROOT_AID} not found in database"}
 
-            # Get the current key state
-            gleif_kever = gleif_kevers[-1]  # Most recent key state
-
             # Verify the establishment event and key state
-            if not gleif_kever.verfers:
+            if not gleif_state['k']:
                 return {'valid': False, 'reason': "GLEIF AID has no public keys"}
 
-            logger.info(f"GLEIF root verification successful using keripy key state. AID: {GLEIF_ROOT_AID}, Keys: {len(gleif_kever.verfers)}")
+            logger.debug("GLEIF root verification successful using stored key state. AID: %s, Keys: %d", GLEIF_ROOT_AID, len(gleif_state['k']))
         except Exception as e:
             return {'valid': False, 'reason': f"GLEIF database verification failed: {str(e)}"}
 
@@ -543,6 +1381,11 @@ def verify_gleif_root(chain):
     except Exception as e:
         return {'valid': False, 'reason': f"GLEIF verification error: {str(e)}"}
 
+# Optional Unix domain socket listener for co-located callers
+rpc_server = None
+if rpc.VERIFIER_RPC_SOCKET and not workers.in_worker_process():
+    rpc_server = start_rpc_listener(rpc.VERIFIER_RPC_SOCKET)
+
 if __name__ == '__main__':
     logger.info(f"Starting KERI ACDC Verification Service on port {PORT}")
     app.run(host='0.0.0.0', port=PORT, debug=False)
\ No newline at end of file
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+ASGI serving mode for the KERI ACDC Verification Service
+
+Serves the verification endpoints from asyncio handlers on top of the same
+verification core as the Flask app (app.py). A request only occupies a thread
+while it has work to do: the trust-artifact refresh (disk I/O) is awaited in a
+worker thread and shared by all requests that arrive while it runs, and the
+verification itself (SAID recomputation, parsing, signature checks) runs on a
+bounded executor (or the worker process pool when VERIFY_WORKER_PROCESSES is
+set, see workers.py). Admission control lets in no more verifications than the
+executor has threads, so an admitted request starts right away; the rest wait
+in the admission queue, where waiting costs a coroutine rather than a thread,
+and are shed with 503 once the queue is full or their wait exceeds
+VERIFY_QUEUE_TIMEOUT_MS. Batch requests have their own admission controller
+(see admission.py) and their own executor of VERIFY_BATCH_MAX_CONCURRENCY
+threads, so the same holds for them.
+
+The /admin/profiling endpoint stays on the Flask app. With CAPTURE_DIR set,
+sampled /verify requests are captured as in the Flask app (see capture.py).
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port 5001
+or:
+    python asgi.py
+
+Configuration:
+- VERIFY_EXECUTOR_WORKERS: threads running verification work (default: CPU count)
+- ASGI_MAX_CONCURRENCY: verifications admitted at once (default and maximum: VERIFY_EXECUTOR_WORKERS)
+- ASGI_MAX_BODY_BYTES: largest accepted request body (default: 16 MiB)
+VERIFY_MAX_QUEUE, VERIFY_QUEUE_TIMEOUT_MS, VERIFY_RETRY_AFTER_SECONDS,
+VERIFY_BATCH_MAX_CONCURRENCY and VERIFY_BATCH_MAX_QUEUE are shared with the
+Flask app.
+"""
+
+import os
+import json
+import asyncio
+import logging
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import app as verifier
+import tracing
+import capture
+from admission import (
+    AsyncAdmissionController,
+    VERIFY_MAX_QUEUE,
+    VERIFY_QUEUE_TIMEOUT_MS,
+    VERIFY_RETRY_AFTER_SECONDS,
+    VERIFY_BATCH_MAX_CONCURRENCY,
+    VERIFY_BATCH_MAX_QUEUE,
+)
+
+logger = logging.getLogger(__name__)
+
+VERIFY_EXECUTOR_WORKERS = max(1, int(os.getenv('VERIFY_EXECUTOR_WORKERS', os.cpu_count() or 4)))
+ASGI_MAX_CONCURRENCY = int(os.getenv('ASGI_MAX_CONCURRENCY', VERIFY_EXECUTOR_WORKERS))
+ASGI_MAX_BODY_BYTES = int(os.getenv('ASGI_MAX_BODY_BYTES', 16 * 1024 * 1024))
+
+if ASGI_MAX_CONCURRENCY > VERIFY_EXECUTOR_WORKERS:
+    # Requests admitted beyond the executor's threads would wait in its unbounded queue, where the
+    # admission deadline no longer applies and they are never shed
+    logger.warning(f"ASGI_MAX_CONCURRENCY={ASGI_MAX_CONCURRENCY} exceeds VERIFY_EXECUTOR_WORKERS={VERIFY_EXECUTOR_WORKERS}, "
+                   f"admitting {VERIFY_EXECUTOR_WORKERS} at once")
+    ASGI_MAX_CONCURRENCY = VERIFY_EXECUTOR_WORKERS
+
+verify_admission = AsyncAdmissionController(
+    'verify',
+    ASGI_MAX_CONCURRENCY,
+    VERIFY_MAX_QUEUE,
+    VERIFY_QUEUE_TIMEOUT_MS,
+    VERIFY_RETRY_AFTER_SECONDS,
+)
+
+batch_admission = AsyncAdmissionController(
+    'verify_batch',
+    VERIFY_BATCH_MAX_CONCURRENCY,
+    VERIFY_BATCH_MAX_QUEUE,
+    VERIFY_QUEUE_TIMEOUT_MS,
+    VERIFY_RETRY_AFTER_SECONDS,
+)
+BATCH_ENDPOINTS = {'/verify/batch', '/verify/domain-linkage/batch'}
+
+_executor = None
+_batch_executor = None
+_refresh_task = None
+
+
+class RequestError(Exception):
+    """Raised while reading a request that must be answered with an error status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def get_executor():
+    """Executor for verification work (created on first use)"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, VERIFY_EXECUTOR_WORKERS), thread_name_prefix='verify')
+    return _executor
+
+
+def get_batch_executor():
+    """Executor for batch requests, one thread per batch admission slot (created on first use)"""
+    global _batch_executor
+    if _batch_executor is None:
+        _batch_executor = ThreadPoolExecutor(max_workers=batch_admission.max_concurrency, thread_name_prefix='verify-batch')
+    return _batch_executor
+
+
+async def run_blocking(fn, *args, executor=None):
+    """Run CPU-bound verification work on the executor (default: get_executor()), keeping the request's trace context"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor or get_executor(), functools.partial(context.run, fn, *args))
+
+
+async def run_handler(handler, *args, executor=None):
+    """Run an app.py verify_*_request handler in the worker pool when enabled, else on the executor"""
+    if verifier.verify_pool is not None:
+        with tracing.span('worker_pool'):
+            return await asyncio.wrap_future(verifier.verify_pool.submit(handler, *args))
+    return await run_blocking(functools.partial(getattr(verifier, handler), refresh=False), *args, executor=executor)
+
+
+async def refresh_state():
+    """Re-check the trust artifacts off the event loop; concurrent requests share one check"""
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.ensure_future(asyncio.to_thread(verifier.refresh_verifier_state))
+    with tracing.span('refresh_state'):
+        # Shielded so a client disconnect does not cancel the check for everyone else
+        await asyncio.shield(_refresh_task)
+
+
+async def read_body(receive):
+    """Read the full request body"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise RequestError(499, "Client disconnected")
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > ASGI_MAX_BODY_BYTES:
+            raise RequestError(413, f"Request body exceeds {ASGI_MAX_BODY_BYTES} bytes")
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+
+async def send_response(send, status, body=None, headers=None, content_type='application/json'):
+    """Send a complete response; dict bodies are encoded as compact JSON"""
+    if isinstance(body, (dict, list)):
+        payload = json.dumps(body, separators=(',', ':')).encode()
+    else:
+        payload = body or b''
+    raw_headers = [(b'content-length', str(len(payload)).encode())]
+    if payload:
+        raw_headers.append((b'content-type', content_type.encode()))
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode(), str(value).encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+
+async def verify(request):
+    """POST /verify"""
+    body = await read_body(request['receive'])
+    # Kept for capture.record
+    request['body'] = body
+    await refresh_state()
+    return await run_handler('verify_credential_request', body, request['mimetype'], request['args'])
+
+
+async def verify_batch(request):
+    """POST /verify/batch"""
+    body = await read_body(request['receive'])
+    await refresh_state()
+    return await run_handler('verify_batch_request', body, request['mimetype'], request['args'], executor=get_batch_executor())
+
+
+async def verify_by_did(request, did):
+    """GET /verify/by-did/<did>"""
+    await refresh_state()
+    return await run_handler('verify_by_did_request', did)
+
+
+def _json_body(body):
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+async def verify_domain_linkage(request):
+    """POST /verify/domain-linkage (network-bound, so it stays on the executor even with a worker pool)"""
+    body = await read_body(request['receive'])
+    return await run_blocking(verifier.verify_domain_linkage_request, _json_body(body))
+
+
+async def verify_domain_linkage_batch(request):
+    """POST /verify/domain-linkage/batch"""
+    body = await read_body(request['receive'])
+    return await run_blocking(verifier.verify_domain_linkage_batch_request, _json_body(body), executor=get_batch_executor())
+
+
+async def credential_status(request, said):
+    """GET /credentials/<said>/status (cacheable, see app.credential_status)"""
+    await refresh_state()
+    generation = verifier.trust_generation
+
+    credential = await run_blocking(verifier.trust_store.get_credential, said)
+    if credential is None:
+        return {"success": False, "error": f"Unknown credential: {said}"}, 404
+
+    etag = f'"{said}.{generation}"'
+    headers = {'ETag': etag, 'Cache-Control': f"public, max-age={verifier.STATUS_MAX_AGE_SECONDS}"}
+    if etag_matches(request['headers'].get('if-none-match'), etag):
+        return None, 304, headers
+
+    body = await run_blocking(verifier.credential_status_body, said, credential, generation)
+    return body, 200, headers
+
+
+def metrics_text():
+    """Prometheus metrics for the ASGI mode: the Flask /metrics, with this server's admission queues"""
+    return verifier.metrics_text((verify_admission, batch_admission)).encode()
+
+
+def route(method, path):
+    """Return (endpoint name, handler, path argument) for a request, or None"""
+    if method == 'POST' and path == '/verify':
+        return '/verify', verify, None
+    if method == 'POST' and path == '/verify/batch':
+        return '/verify/batch', verify_batch, None
+    if method == 'POST' and path == '/verify/domain-linkage':
+        return '/verify/domain-linkage', verify_domain_linkage, None
+    if method == 'POST' and path == '/verify/domain-linkage/batch':
+        return '/verify/domain-linkage/batch', verify_domain_linkage_batch, None
+    if method == 'GET' and path.startswith('/verify/by-did/') and len(path) > len('/verify/by-did/'):
+        return '/verify/by-did', verify_by_did, path[len('/verify/by-did/'):]
+    if method == 'GET' and path.startswith('/credentials/') and path.endswith('/status'):
+        said = path[len('/credentials/'):-len('/status')]
+        if said and '/' not in said:
+            return '/credentials/status', credential_status, said
+    return None
+
+
+async def handle_http(scope, receive, send):
+    """Dispatch one HTTP request"""
+    method, path = scope['method'], scope['path']
+
+    if method == 'GET' and path == '/health':
+        await send_response(send, 200, {"status": "healthy", "service": "keri-acdc-verifier"})
+        return
+    if method == 'GET' and path == '/metrics':
+        await send_response(send, 200, metrics_text(), content_type='text/plain; version=0.0.4')
+        return
+    if method == 'GET' and path == '/verifier/key':
+        if verifier.receipt_signer is None:
+            await send_response(send, 404, {"success": False, "error": "Receipts are disabled"})
+        else:
+            await refresh_state()
+            await send_response(send, 200, verifier.verifier_key_body())
+        return
+
+    matched = route(method, path)
+    if matched is None:
+        await send_response(send, 404, {"success": False, "error": "Not found"})
+        return
+    endpoint, handler, argument = matched
+
+    headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+    request = {
+        'receive': receive,
+        'headers': headers,
+        'mimetype': headers.get('content-type', '').split(';')[0].strip().lower(),
+        'args': {name: values[0] for name, values in parse_qs(scope['query_string'].decode('latin-1')).items()},
+    }
+
+    admission = batch_admission if endpoint in BATCH_ENDPOINTS else verify_admission
+    if not await admission.acquire():
+        await send_response(
+            send, 503,
+            {"success": False, "error": "Verification service is overloaded, please retry later"},
+            {'Retry-After': admission.retry_after_seconds},
+        )
+        return
+
+    # Captured requests are always traced so their records carry per-step timings
+    captured = endpoint == '/verify' and capture.sampled()
+    trace = tracing.start_trace(headers.get('x-trace-id'), sampled=True if captured else None)
+    outcome = 'error'
+    try:
+        try:
+            result = await (handler(request) if argument is None else handler(request, argument))
+        except RequestError as e:
+            result = ({"success": False, "error": str(e)}, e.status)
+        except Exception as e:
+            logger.error("Verification error: %s", e, exc_info=True)
+            result = ({"success": False, "error": f"Internal server error: {str(e)}"}, 500)
+
+        body, status = result[0], result[1]
+        response_headers = result[2] if len(result) > 2 else {}
+        response_headers['X-Trace-Id'] = trace.trace_id
+        outcome = {200: 'verified', 304: 'not_modified', 404: 'not_found'}.get(status, 'not_verified')
+        if captured and 'body' in request:
+            capture.record(trace, request['body'], request['mimetype'], request['args'], body, status, transport='asgi')
+        if status != 499:
+            await send_response(send, status, body, response_headers)
+    finally:
+        admission.release()
+        tracing.finish_trace(trace, endpoint=endpoint, outcome=outcome, transport='asgi')
+
+
+async def handle_lifespan(receive, send):
+    """Start-up and shutdown events (the verifier itself is initialized on import)"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            get_executor()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            if verifier.checkpointer is not None:
+                verifier.checkpointer.stop()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI 3 application"""
+    if scope['type'] == 'http':
+        await handle_http(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await handle_lifespan(receive, send)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    logger.info(f"Starting KERI ACDC Verification Service (ASGI) on port {verifier.PORT}")
+    uvicorn.run(app, host='0.0.0.0', port=verifier.PORT, log_level=os.getenv('LOG_LEVEL', 'INFO').lower())
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the KERI ACDC Verification Service
+
+workers   /verify throughput with verification running in-process on threads
+          (the default serving mode) and in 1..N verification worker
+          processes (VERIFY_WORKER_PROCESSES, see workers.py), driven by the
+          same number of concurrent callers. The in-process rate stays flat as
+          threads are added because verification holds the GIL; the worker
+          rate should grow with the number of processes up to the core count.
+          The usable CPU count is recorded with the results: on a single CPU
+          the pool can only add overhead, and runs beyond the CPU count
+          measure oversubscription.
+
+startup   Cold start of a fresh verifier process: import time of app.py
+          (excluding initialization) and initialize_verifier(), once against
+          an empty database directory and once against the populated one.
+
+seed      seed-verifier-db.py over synthetic artifact sets (one inception
+          event and one credential per AID, default 1k/10k/100k AIDs): a full
+          seed into an empty database, then an incremental run with nothing
+          changed.
+
+generate  generate-credentials.py: wall time of one run in a fresh process,
+          and credential sets per second when run repeatedly in-process. The
+          script runs from a temporary copy, so the real artifacts are left
+          alone.
+
+suite     startup, seed and generate.
+
+Every benchmark prints its results as JSON, with the figures to watch under
+"metrics", and writes them to --output when given. The metrics are compared
+to a baseline result file (--baseline, default: the committed
+benchmark-baseline.json). A metric that is worse by more than --tolerance
+(default 20%) is a regression, and the exit status is 1; a missing baseline
+file is an error (exit status 2). Metrics the baseline does not have are
+reported but not compared. --update-baseline writes the current metrics into
+the baseline file instead, keeping the metrics of other benchmarks.
+The verifier is set up exactly as the service would be, so GLEIF_ROOT_AID and
+the generated trust artifacts must be in place for workers.
+
+Usage: python3 benchmark.py workers [--max-workers N] [--requests N]
+                                    [--concurrency N] [--credential FILE]
+       python3 benchmark.py startup [--repeat N]
+       python3 benchmark.py seed [--sizes 1000,10000,100000] [--workers N]
+       python3 benchmark.py generate [--runs N] [--script FILE]
+       python3 benchmark.py suite
+       common options: [--output FILE] [--baseline FILE] [--update-baseline]
+                       [--tolerance FRACTION]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import importlib.util
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_CREDENTIAL = (
+    SCRIPT_DIR.parent / "gleif-frontend" / "public" / ".well-known" / "keri" / "legal-entity-credential.json"
+)
+DEFAULT_GENERATE_SCRIPT = SCRIPT_DIR.parent / "did-management" / "generate-credentials.py"
+DEFAULT_SEED_SIZES = "1000,10000,100000"
+DEFAULT_BASELINE = SCRIPT_DIR / "benchmark-baseline.json"
+BENCHMARK_DID = "did:iota:benchmark:0x0"
+
+# Time differences below this are noise, whatever the relative change
+NOISE_FLOOR_SECONDS = 0.005
+
+
+def metric(value, unit, better='lower'):
+    """A compared figure: better is 'lower' for durations, 'higher' for rates"""
+    return {'value': round(value, 4), 'unit': unit, 'better': better}
+
+
+def load_script(name, path):
+    """Import a script whose file name is not a valid module name (e.g. seed-verifier-db.py)"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # The scripts log every step at INFO
+    module.logger.setLevel(logging.WARNING)
+    return module
+
+
+def measure(call, requests, concurrency):
+    """Run call() requests times from concurrency threads; returns throughput and latency figures"""
+    def timed(_):
+        start = time.perf_counter()
+        _, status = call()
+        return time.perf_counter() - start, status
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Warm-up: worker start-up, schema and key-state caches
+        list(executor.map(timed, range(min(requests, concurrency * 2))))
+
+        start = time.perf_counter()
+        results = list(executor.map(timed, range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': requests,
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(requests / elapsed, 1),
+        'p50_ms': round(percentiles[49] * 1000, 2),
+        'p99_ms': round(percentiles[98] * 1000, 2),
+        'errors': sum(1 for _, status in results if status != 200),
+    }
+
+
+def bench_workers(args):
+    """In-process vs. 1..N worker processes on POST /verify"""
+    import app as verifier
+    import workers
+
+    with open(args.credential, 'r') as f:
+        body = json.dumps({'credential': json.load(f)}).encode()
+    mimetype = 'application/json'
+
+    runs = []
+    result = measure(
+        lambda: verifier.verify_credential_request(body, mimetype, {}, refresh=False),
+        args.requests, args.concurrency,
+    )
+    runs.append({'mode': 'in-process', 'processes': 1, **result})
+    print(f"in-process: {result['throughput_rps']} req/s", file=sys.stderr)
+
+    for processes in range(1, args.max_workers + 1):
+        pool = workers.VerifierPool(processes, verifier.trust_snapshot, lambda: verifier.trust_generation)
+        try:
+            pool.warm_up()
+            result = measure(
+                lambda: pool.call('verify_credential_request', body, mimetype, {}),
+                args.requests, args.concurrency,
+            )
+        finally:
+            pool.shutdown()
+        runs.append({'mode': 'worker-pool', 'processes': processes, **result})
+        print(f"{processes} worker processes: {result['throughput_rps']} req/s", file=sys.stderr)
+
+    cpus = workers.usable_cpus()
+    if args.max_workers > cpus:
+        print(f"Measured up to {args.max_workers} workers on {cpus} usable CPUs; runs beyond {cpus} are oversubscribed", file=sys.stderr)
+
+    single = runs[1]['throughput_rps']
+    for run in runs[1:]:
+        run['speedup'] = round(run['throughput_rps'] / single, 2)
+
+    metrics = {'workers.in_process_rps': metric(runs[0]['throughput_rps'], 'req/s', 'higher')}
+    for run in runs[1:]:
+        metrics[f"workers.processes_{run['processes']}_rps"] = metric(run['throughput_rps'], 'req/s', 'higher')
+    return {'concurrency': args.concurrency, 'usable_cpus': cpus, 'runs': runs, 'metrics': metrics}
+
+
+def startup_once(db_dir):
+    """Start a fresh interpreter that imports app.py; returns (import seconds, initialize_verifier seconds)"""
+    env = dict(os.environ)
+    env.update({'VERIFIER_DB_DIR': str(db_dir), 'LOG_LEVEL': 'WARNING', 'VERIFY_WORKER_PROCESSES': '0'})
+    env.setdefault('GLEIF_ROOT_AID', 'unset')
+    # Listeners and remote shards are not part of the start-up path being measured
+    for name in ('VERIFIER_RPC_SOCKET', 'SHARD_NODES', 'SHARD_SELF'):
+        env.pop(name, None)
+
+    code = (
+        "import json, time\n"
+        "start = time.perf_counter()\n"
+        "import app\n"
+        "total = time.perf_counter() - start\n"
+        "print(json.dumps({'total': total, 'initialize_verifier': app.startup_timings.get('initialize_verifier', 0.0)}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=str(SCRIPT_DIR), env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    return timings['total'] - timings['initialize_verifier'], timings['initialize_verifier']
+
+
+def bench_startup(args):
+    """Import and initialization time of a fresh verifier process, cold and warm database"""
+    samples = {'cold': [], 'warm': []}
+    for _ in range(args.repeat):
+        db_dir = Path(tempfile.mkdtemp(prefix='bench-startup-'))
+        try:
+            samples['cold'].append(startup_once(db_dir))
+            samples['warm'].append(startup_once(db_dir))
+        finally:
+            shutil.rmtree(db_dir, ignore_errors=True)
+
+    metrics = {}
+    for database, runs in samples.items():
+        import_seconds = statistics.median(run[0] for run in runs)
+        initialize_seconds = statistics.median(run[1] for run in runs)
+        metrics[f'startup.{database}.import_seconds'] = metric(import_seconds, 's')
+        metrics[f'startup.{database}.initialize_verifier_seconds'] = metric(initialize_seconds, 's')
+        print(f"{database} database: import {import_seconds:.3f}s, initialize_verifier {initialize_seconds:.3f}s",
+              file=sys.stderr)
+    return {'repeat': args.repeat, 'metrics': metrics}
+
+
+def write_synthetic_artifacts(directory, count):
+    """One inception event (icp/<aid>) and one credential (<said>) per AID, like generate-credentials.py output"""
+    from keri.core import coring
+
+    # A handful of real keys is enough: seeding checks the key encoding, not uniqueness
+    keys = [coring.Signer(transferable=True).verfer.qb64 for _ in range(8)]
+    root_aid = coring.Diger(ser=b"benchmark-root").qb64
+    schema = coring.Diger(ser=b"benchmark-schema").qb64
+
+    (directory / "icp").mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        aid = coring.Diger(ser=f"benchmark-aid-{i}".encode()).qb64
+        event = {"v": "KERI10JSON00011c_", "i": aid, "s": "0", "t": "icp", "kt": "1",
+                 "k": [keys[i % len(keys)]], "nt": "1", "n": [], "bt": "0", "b": [], "c": [], "a": []}
+        (directory / "icp" / aid).write_text(json.dumps(event))
+
+        said = coring.Diger(ser=f"benchmark-credential-{i}".encode()).qb64
+        credential = {"v": "ACDC10JSON00017a_", "d": said, "i": aid, "s": schema,
+                      "a": {"issuer": root_aid, "alsoKnownAs": [f"did:iota:benchmark:{i:x}"]}}
+        (directory / said).write_text(json.dumps(credential))
+
+
+def bench_seed(args):
+    """seed-verifier-db.py over synthetic artifact sets: full seed, then a no-change incremental run"""
+    seeder = load_script('seed_verifier_db', SCRIPT_DIR / "seed-verifier-db.py")
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    runs = []
+    metrics = {}
+    for size in sizes:
+        work_dir = Path(tempfile.mkdtemp(prefix=f'bench-seed-{size}-'))
+        try:
+            inception_dir, db_dir = work_dir / "keri", work_dir / "db"
+            write_synthetic_artifacts(inception_dir, size)
+
+            run = {'aids': size, 'artifacts': size * 2}
+            for phase, full in (('full', True), ('incremental', False)):
+                start = time.perf_counter()
+                baser = seeder.initialize_verifier_baser(db_dir)
+                try:
+                    trust_store = seeder.open_trust_store(baser, seeder.LMDB_MAP_SIZE)
+                    stats = seeder.ingest_artifacts(
+                        trust_store, str(inception_dir), db_dir / seeder.MANIFEST_NAME,
+                        args.workers, seeder.SEED_BATCH_SIZE, full,
+                    )
+                finally:
+                    baser.close()
+                run[f'{phase}_seconds'] = round(time.perf_counter() - start, 3)
+                run[f'{phase}_parsed'] = stats['parsed']
+            run['artifacts_per_second'] = round(run['artifacts'] / run['full_seconds'], 1)
+            runs.append(run)
+
+            metrics[f'seed.{size}.full_seconds'] = metric(run['full_seconds'], 's')
+            metrics[f'seed.{size}.incremental_seconds'] = metric(run['incremental_seconds'], 's')
+            metrics[f'seed.{size}.artifacts_per_second'] = metric(run['artifacts_per_second'], 'artifacts/s', 'higher')
+            print(f"{size} AIDs: full seed {run['full_seconds']}s ({run['artifacts_per_second']} artifacts/s), "
+                  f"incremental {run['incremental_seconds']}s", file=sys.stderr)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return {'seed_workers': args.workers, 'runs': runs, 'metrics': metrics}
+
+
+def bench_generate(args):
+    """generate-credentials.py: one cold run in a fresh process, then repeated in-process runs"""
+    work_dir = Path(tempfile.mkdtemp(prefix='bench-generate-'))
+    try:
+        # The script writes next to itself (../gleif-frontend/...), so run a copy
+        script_dir = work_dir / "did-management"
+        script_dir.mkdir()
+        script = script_dir / "generate-credentials.py"
+        shutil.copy(args.script, script)
+        # It imports the trust bundle writer from ../verification-service
+        (work_dir / "verification-service").mkdir()
+        shutil.copy(SCRIPT_DIR / "bundle.py", work_dir / "verification-service" / "bundle.py")
+        (script_dir / "twin-wallet.json").write_text(json.dumps({"did": BENCHMARK_DID}))
+
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(script), BENCHMARK_DID], cwd=str(script_dir),
+                       capture_output=True, check=True)
+        cold_seconds = time.perf_counter() - start
+
+        generator = load_script('generate_credentials', script)
+        argv = sys.argv
+        sys.argv = [str(script), BENCHMARK_DID]
+        try:
+            start = time.perf_counter()
+            for _ in range(args.runs):
+                generator.main()
+            elapsed = time.perf_counter() - start
+        finally:
+            sys.argv = argv
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    # Each run creates three AIDs and issues two credentials
+    sets_per_second = args.runs / elapsed
+    print(f"generate: cold run {cold_seconds:.3f}s, {sets_per_second:.2f} credential sets/s in-process",
+          file=sys.stderr)
+    return {
+        'runs': args.runs,
+        'metrics': {
+            'generate.cold_run_seconds': metric(cold_seconds, 's'),
+            'generate.credential_sets_per_second': metric(sets_per_second, 'sets/s', 'higher'),
+            'generate.credentials_per_second': metric(sets_per_second * 2, 'credentials/s', 'higher'),
+        },
+    }
+
+
+def bench_suite(args):
+    """startup, seed and generate in one result"""
+    results = {'metrics': {}}
+    for name, bench in (('startup', bench_startup), ('seed', bench_seed), ('generate', bench_generate)):
+        result = bench(args)
+        results['metrics'].update(result.pop('metrics'))
+        results[name] = result
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regressions of results against baseline metrics"""
+    regressions = []
+    for name, current in results['metrics'].items():
+        previous = baseline.get('metrics', {}).get(name)
+        if not previous or not previous['value']:
+            print(f"{name}: {current['value']} {current['unit']} (not in baseline)", file=sys.stderr)
+            continue
+        change = (current['value'] - previous['value']) / previous['value']
+        worse = change > tolerance if current['better'] == 'lower' else change < -tolerance
+        if worse and current['unit'] == 's' and abs(current['value'] - previous['value']) < NOISE_FLOOR_SECONDS:
+            worse = False
+        print(f"{name}: {previous['value']} -> {current['value']} {current['unit']} ({change:+.1%})"
+              f"{'  REGRESSION' if worse else ''}", file=sys.stderr)
+        if worse:
+            regressions.append(f"{name} {previous['value']} -> {current['value']} {current['unit']} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--output', help="Also write the results to this file")
+    common.add_argument('--baseline', default=str(DEFAULT_BASELINE),
+                        help="Compare against (or with --update-baseline, write) this result file "
+                             "(default: benchmark-baseline.json next to this script)")
+    common.add_argument('--update-baseline', action='store_true', help="Write the results to --baseline")
+    common.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed relative change before a metric counts as a regression (default: 0.2)")
+
+    parser = argparse.ArgumentParser(description="Benchmarks for the verification service")
+    subcommands = parser.add_subparsers(dest='benchmark', required=True)
+
+    workers_parser = subcommands.add_parser('workers', parents=[common],
+                                            help="Verification throughput from 1 to N worker processes")
+    workers_parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1,
+                                help="Largest worker pool to measure (default: CPU count)")
+    workers_parser.add_argument('--requests', type=int, default=2000, help="Requests per run (default: 2000)")
+    workers_parser.add_argument('--concurrency', type=int, default=32, help="Concurrent callers (default: 32)")
+    workers_parser.add_argument('--credential', default=str(DEFAULT_CREDENTIAL),
+                                help="Credential JSON to verify (default: the generated Legal Entity credential)")
+    workers_parser.set_defaults(run=bench_workers)
+
+    startup_options = argparse.ArgumentParser(add_help=False)
+    startup_options.add_argument('--repeat', type=int, default=3, help="Start-ups per database state (default: 3)")
+    seed_options = argparse.ArgumentParser(add_help=False)
+    seed_options.add_argument('--sizes', default=DEFAULT_SEED_SIZES,
+                              help=f"Comma-separated synthetic AID counts (default: {DEFAULT_SEED_SIZES})")
+    seed_options.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                              help="Seeding parser processes (default: CPU count)")
+    generate_options = argparse.ArgumentParser(add_help=False)
+    generate_options.add_argument('--runs', type=int, default=5, help="In-process generator runs (default: 5)")
+    generate_options.add_argument('--script', default=str(DEFAULT_GENERATE_SCRIPT),
+                                  help="generate-credentials.py to measure")
+
+    subcommands.add_parser('startup', parents=[common, startup_options],
+                           help="app.py import and initialize_verifier() time").set_defaults(run=bench_startup)
+    subcommands.add_parser('seed', parents=[common, seed_options],
+                           help="Seeding synthetic artifact sets").set_defaults(run=bench_seed)
+    subcommands.add_parser('generate', parents=[common, generate_options],
+                           help="generate-credentials.py throughput").set_defaults(run=bench_generate)
+    subcommands.add_parser('suite', parents=[common, startup_options, seed_options, generate_options],
+                           help="startup, seed and generate").set_defaults(run=bench_suite)
+
+    args = parser.parse_args()
+    if not args.update_baseline and not Path(args.baseline).exists():
+        # Checked before running: a comparison without a baseline would pass whatever the results
+        parser.error(f"No baseline at {args.baseline}; create it with --update-baseline")
+
+    results = {
+        'benchmark': args.benchmark,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        **args.run(args),
+    }
+
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+
+    if args.update_baseline:
+        # Merged, so one benchmark's update keeps the other benchmarks' baseline metrics
+        baseline_path = Path(args.baseline)
+        previous = json.loads(baseline_path.read_text()).get('metrics', {}) if baseline_path.exists() else {}
+        baseline_path.write_text(json.dumps({**results, 'metrics': {**previous, **results['metrics']}}, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+    else:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} metrics regressed by more than {args.tolerance:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
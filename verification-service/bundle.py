@@ -0,0 +1,190 @@
+"""
+Packed trust bundle for the KERI ACDC Verification Service
+
+generate-credentials.py writes trust-bundle.bin (with write_trust_bundle) next
+to the individual JSON artifacts. The bundle holds every key event (by AID),
+credential (by SAID) and metadata record (by name) in one file:
+
+    header  magic b"GTBUNDLE", version, flags, record count, index offset, data offset
+    index   fixed-size entries (kind, key length, record length, record offset, key),
+            sorted by (kind, key)
+    data    compact JSON records
+
+The verifier memory-maps the file once and slices records out of the mapping
+without copying, instead of opening and parsing each artifact file separately.
+The writer and the reader share the layout constants below; the generator
+imports them from here.
+
+The bundle is only used while it is at least as new as every JSON artifact
+next to it. An artifact changed after the bundle was written makes
+open_bundle() return None, so the verifier falls back to the JSON files.
+
+The artifact directory is served publicly, so only public data goes into a
+bundle: key events, credentials and AIDs, never keys or salts.
+"""
+
+import os
+import mmap
+import json
+import struct
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_NAME = "trust-bundle.bin"
+BUNDLE_MAGIC = b"GTBUNDLE"
+BUNDLE_VERSION = 1
+BUNDLE_HEADER = struct.Struct("<8sHHIQQ")
+BUNDLE_ENTRY = struct.Struct("<BBHIQ48s")
+KIND_KEY_EVENT = 1
+KIND_CREDENTIAL = 2
+KIND_META = 3
+BUNDLE_MAX_KEY_BYTES = 48
+
+
+class BundleError(Exception):
+    """Raised when a trust bundle is missing, truncated or of an unknown version"""
+
+
+def write_trust_bundle(path, key_events, credentials, meta):
+    """
+    Write key events (by AID), credentials (by SAID) and metadata (by name)
+    into one packed, versioned file that the verifier can memory-map
+    """
+    records = []
+    for event in key_events:
+        records.append((KIND_KEY_EVENT, event['i'], event))
+    for credential in credentials:
+        records.append((KIND_CREDENTIAL, credential['d'], credential))
+    for name, value in meta.items():
+        records.append((KIND_META, name, value))
+    records.sort(key=lambda record: (record[0], record[1]))
+
+    index_offset = BUNDLE_HEADER.size
+    data_offset = index_offset + BUNDLE_ENTRY.size * len(records)
+
+    entries = []
+    payloads = []
+    offset = data_offset
+    for kind, key, value in records:
+        key_bytes = key.encode()
+        if len(key_bytes) > BUNDLE_MAX_KEY_BYTES:
+            raise ValueError(f"Bundle key too long: {key}")
+        payload = json.dumps(value, separators=(',', ':')).encode()
+        entries.append(BUNDLE_ENTRY.pack(kind, len(key_bytes), 0, len(payload), offset, key_bytes))
+        payloads.append(payload)
+        offset += len(payload)
+
+    tmp_path = Path(str(path) + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, 0, len(records), index_offset, data_offset))
+        f.writelines(entries)
+        f.writelines(payloads)
+    os.replace(tmp_path, path)
+
+
+class TrustBundle:
+    """Read-only, memory-mapped view of a packed trust bundle"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < BUNDLE_HEADER.size:
+                raise BundleError(f"Trust bundle too small: {self.path}")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, _flags, count, index_offset, data_offset = BUNDLE_HEADER.unpack_from(self._mmap, 0)
+        if magic != BUNDLE_MAGIC:
+            self.close()
+            raise BundleError(f"Not a trust bundle: {self.path}")
+        if version != BUNDLE_VERSION:
+            self.close()
+            raise BundleError(f"Unsupported trust bundle version {version}: {self.path}")
+        if index_offset + count * BUNDLE_ENTRY.size > data_offset or data_offset > size:
+            self.close()
+            raise BundleError(f"Truncated trust bundle: {self.path}")
+
+        self.version = version
+        self._index = {}
+        index = self._view[index_offset:data_offset]
+        for kind, key_len, _reserved, length, offset, key in BUNDLE_ENTRY.iter_unpack(index):
+            if offset + length > size:
+                self.close()
+                raise BundleError(f"Truncated trust bundle: {self.path}")
+            self._index[(kind, key[:key_len].decode())] = (offset, length)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the mapping (record views handed out must no longer be used)"""
+        try:
+            if getattr(self, '_view', None) is not None:
+                self._view.release()
+                self._view = None
+            if getattr(self, '_mmap', None) is not None:
+                self._mmap.close()
+                self._mmap = None
+        except BufferError:
+            # A record view is still referenced; the mapping is released once it is collected
+            logger.debug("Trust bundle %s still has live record views, deferring unmap", self.path)
+
+    def raw(self, kind, key):
+        """Return a zero-copy memoryview of a record, or None"""
+        location = self._index.get((kind, key))
+        if location is None:
+            return None
+        offset, length = location
+        return self._view[offset:offset + length]
+
+    def get(self, kind, key):
+        """Return a decoded record, or None"""
+        view = self.raw(kind, key)
+        return json.loads(bytes(view)) if view is not None else None
+
+    def keys(self, kind):
+        """Keys of all records of a kind"""
+        return [key for record_kind, key in self._index if record_kind == kind]
+
+    def items(self, kind):
+        """(key, decoded record) pairs for all records of a kind"""
+        for key in self.keys(kind):
+            yield key, self.get(kind, key)
+
+
+def newest_artifact_mtime_ns(inception_dir):
+    """Latest modification time (ns) of the JSON artifacts a bundle is built from, or 0 if there are none"""
+    newest = 0
+    for directory in (str(inception_dir), os.path.join(str(inception_dir), "icp")):
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name != BUNDLE_NAME and not entry.name.endswith('.tmp'):
+                        newest = max(newest, entry.stat().st_mtime_ns)
+        except FileNotFoundError:
+            continue
+    return newest
+
+
+def open_bundle(inception_dir):
+    """Open the trust bundle in an artifact directory; None if there is none, or it is unreadable or stale"""
+    path = os.path.join(str(inception_dir), BUNDLE_NAME)
+    try:
+        if os.stat(path).st_mtime_ns < newest_artifact_mtime_ns(inception_dir):
+            logger.warning(f"Ignoring trust bundle {path}: JSON artifacts changed after it was written")
+            return None
+        return TrustBundle(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, BundleError) as e:
+        logger.warning(f"Ignoring trust bundle {path}: {str(e)}")
+        return None
@@ -0,0 +1,237 @@
+"""
+Traffic capture for the KERI ACDC Verification Service
+
+With CAPTURE_DIR set, a sample of /verify requests is recorded as JSON lines
+in rotating files (verify-capture.jsonl, .1, .2, ...) for replay.py to re-send
+later. Each record has the request, when it arrived, its outcome and how long
+each verification step took. A captured request is always traced, so the
+step timings are the trace spans (see tracing.py). Records are written
+through a queue-based handler by a background thread, like trace records.
+The request thread only enqueues the raw request and result; parsing the
+body (JSON or CESR), decoding the result and computing pseudonyms happen in
+that background thread (CaptureFormatter), off the request path.
+
+By default records are anonymized. The credential is reduced to its SAID (a
+content digest that replay.py resolves against the seeded artifacts) and the
+expected DID to a keyed pseudonym plus whether the credential is bound to it.
+Repeated SAIDs, unbound DIDs and the arrival pattern survive, but credential
+attributes and DIDs are not written out. With CAPTURE_ANONYMIZE=false the
+full request body and query string are kept, so replay re-sends exactly what
+was received.
+
+Pseudonyms are keyed with CAPTURE_SALT. When it is not set, a random salt is
+created once in CAPTURE_DIR/.capture-salt (mode 0600) and reused, so the same
+DID keeps its pseudonym across restarts and across processes sharing the
+directory.
+
+/verify is captured on every transport: Flask, ASGI (asgi.py) and the RPC
+socket (rpc.py). RPC requests are recorded as JSON /verify requests, which is
+how replay.py re-sends them.
+
+Configuration:
+- CAPTURE_DIR: directory for capture files (capture is disabled when unset)
+- CAPTURE_SAMPLE_RATE: fraction of /verify requests to capture (0.0 - 1.0, default 1.0)
+- CAPTURE_ANONYMIZE: reduce records to SAIDs and DID pseudonyms (default: true)
+- CAPTURE_SALT: key for DID pseudonyms (default: a random salt kept in CAPTURE_DIR/.capture-salt)
+- CAPTURE_MAX_BYTES: size at which the capture file is rotated (default: 50 MB)
+- CAPTURE_BACKUP_COUNT: rotated files to keep (default: 10)
+"""
+
+import os
+import hmac
+import json
+import time
+import base64
+import random
+import hashlib
+import logging
+import logging.handlers
+import threading
+
+import cesr_stream
+from tracing import JsonLineFormatter, start_queue_listener
+
+CAPTURE_DIR = os.getenv('CAPTURE_DIR')
+CAPTURE_SAMPLE_RATE = float(os.getenv('CAPTURE_SAMPLE_RATE', 1.0))
+CAPTURE_ANONYMIZE = os.getenv('CAPTURE_ANONYMIZE', 'true').lower() == 'true'
+CAPTURE_SALT = os.getenv('CAPTURE_SALT')
+CAPTURE_MAX_BYTES = int(os.getenv('CAPTURE_MAX_BYTES', 50 * 1024 * 1024))
+CAPTURE_BACKUP_COUNT = int(os.getenv('CAPTURE_BACKUP_COUNT', 10))
+
+CAPTURE_FILENAME = "verify-capture.jsonl"
+CAPTURE_SALT_FILENAME = ".capture-salt"
+CAPTURE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+capture_logger = logging.getLogger('verifier.capture')
+capture_logger.setLevel(logging.INFO)
+capture_logger.propagate = False
+
+_listener = None
+_listener_lock = threading.Lock()
+_salt = None
+_salt_lock = threading.Lock()
+
+
+def _start_listener():
+    """Attach the asynchronous rotating-file handler to the capture logger"""
+    global _listener
+    if _listener is not None:
+        return
+
+    with _listener_lock:
+        # Concurrent first captures must not each attach a handler (and rotate the same file)
+        if _listener is not None:
+            return
+        os.makedirs(CAPTURE_DIR, exist_ok=True)
+        target = logging.handlers.RotatingFileHandler(
+            os.path.join(CAPTURE_DIR, CAPTURE_FILENAME),
+            maxBytes=CAPTURE_MAX_BYTES,
+            backupCount=CAPTURE_BACKUP_COUNT,
+        )
+        # Capture records are built here, off the request thread, and written as compact JSON lines like trace records
+        target.setFormatter(CaptureFormatter())
+        _listener = start_queue_listener(capture_logger, target)
+
+
+def enabled():
+    return bool(CAPTURE_DIR)
+
+
+def sampled():
+    """Return True if this request should be captured"""
+    return enabled() and CAPTURE_SAMPLE_RATE > 0 and random.random() < CAPTURE_SAMPLE_RATE
+
+
+def _load_salt():
+    """The salt kept in CAPTURE_DIR, created on first use"""
+    os.makedirs(CAPTURE_DIR, exist_ok=True)
+    path = os.path.join(CAPTURE_DIR, CAPTURE_SALT_FILENAME)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path, 'r') as f:
+            salt = f.read().strip()
+        if not salt:
+            raise ValueError(f"Capture salt file {path} is empty")
+        return salt
+    salt = os.urandom(16).hex()
+    with os.fdopen(fd, 'w') as f:
+        f.write(salt)
+    logger.info(f"Created capture salt {path}")
+    return salt
+
+
+def salt():
+    """Key for DID pseudonyms: CAPTURE_SALT, else the salt kept in CAPTURE_DIR"""
+    global _salt
+    if _salt is None:
+        with _salt_lock:
+            if _salt is None:
+                _salt = CAPTURE_SALT or _load_salt()
+    return _salt
+
+
+def pseudonym(value):
+    """Keyed, stable pseudonym for an identifier (same value, same pseudonym for one salt)"""
+    return hmac.new(salt().encode(), value.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def _request_fields(body, mimetype, args):
+    """(credential dict, expected DID, issuer AID) from a /verify body; the credential is None if it does not parse"""
+    expected_did, issuer_aid = args.get('expected_did'), args.get('issuer_aid')
+    try:
+        if cesr_stream.accepts(mimetype):
+            return next(iter(cesr_stream.parse_stream(body, mimetype))).serder.sad, expected_did, issuer_aid
+        data = json.loads(body)
+        return data.get('credential'), data.get('expected_did') or expected_did, data.get('issuer_aid') or issuer_aid
+    except Exception:
+        return None, expected_did, issuer_aid
+
+
+def _anonymized_request(body, mimetype, args):
+    credential, expected_did, issuer_aid = _request_fields(body, mimetype, args)
+    if not isinstance(credential, dict):
+        credential = {}
+    request_fields = {'said': credential.get('d'), 'issuer_aid_given': bool(issuer_aid)}
+    if expected_did:
+        also_known_as = credential.get('a', {}).get('alsoKnownAs')
+        request_fields['expected_did'] = pseudonym(expected_did)
+        request_fields['did_bound'] = isinstance(also_known_as, list) and expected_did in also_known_as
+    return request_fields
+
+
+def _full_request(body, mimetype, args):
+    if not cesr_stream.accepts(mimetype):
+        try:
+            return {'query': args, 'body': body.decode('utf-8')}
+        except UnicodeDecodeError:
+            pass
+    return {'query': args, 'body_b64': base64.b64encode(body).decode()}
+
+
+def build_entry(pending):
+    """The capture record (a dict) for a request enqueued by record()"""
+    result = pending['result']
+    if isinstance(result, (bytes, bytearray)):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            result = {}
+
+    body, mimetype, args, status = pending['body'], pending['mimetype'], pending['args'], pending['status']
+    details = result.get('details') or {}
+    entry = {
+        'v': CAPTURE_VERSION,
+        'ts': pending['ts'],
+        'trace_id': pending['trace_id'],
+        'endpoint': pending['endpoint'],
+        'content_type': mimetype,
+        'size': len(body),
+        'anonymized': pending['anonymized'],
+        'status': status,
+        'outcome': 'verified' if result.get('verified') else 'not_verified' if status < 500 else 'error',
+        'step': details.get('step'),
+        'total_ms': pending['total_ms'],
+        'steps': pending['steps'],
+    }
+    if pending['transport']:
+        entry['transport'] = pending['transport']
+    if pending['anonymized']:
+        entry.update(_anonymized_request(body, mimetype, args))
+    else:
+        entry.update(_full_request(body, mimetype, args))
+        entry['reason'] = details.get('reason') or result.get('error')
+    return entry
+
+
+class CaptureFormatter(JsonLineFormatter):
+    """Build capture records from enqueued requests (in the listener thread) and write them as JSON lines"""
+
+    def format(self, record):
+        # RotatingFileHandler formats each record twice (size check, then write), so the entry is built once
+        if not hasattr(record, 'capture_entry'):
+            record.capture_entry = build_entry(record.msg)
+        return json.dumps(record.capture_entry, separators=(',', ':'), default=str)
+
+
+def record(trace, body, mimetype, args, result, status, endpoint='/verify', transport=None):
+    """Enqueue the capture record of one request (result is a dict or encoded JSON bytes)"""
+    _start_listener()
+    elapsed = time.perf_counter() - trace.start
+    # Only timings are taken here; the body and result are parsed by CaptureFormatter in the listener thread
+    capture_logger.info({
+        'ts': round(time.time() - elapsed, 6),
+        'trace_id': trace.trace_id,
+        'endpoint': endpoint,
+        'transport': transport,
+        'anonymized': CAPTURE_ANONYMIZE,
+        'body': body,
+        'mimetype': mimetype,
+        'args': dict(args),
+        'result': result,
+        'status': status,
+        'total_ms': round(elapsed * 1000, 3),
+        'steps': {name: round(duration * 1000, 3) for name, _, duration, _ in trace.spans},
+    })
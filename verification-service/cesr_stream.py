@@ -0,0 +1,156 @@
+"""
+Binary credential ingestion for the KERI ACDC Verification Service
+
+Besides JSON envelopes, /verify and /verify/batch accept ACDC streams:
+- application/cesr: ACDCs in any serialization (JSON, CBOR, MGPK), each
+  optionally followed by CESR attachments (text or binary domain)
+- application/cbor, application/msgpack: ACDCs in that serialization only
+
+The request buffer is scanned through a memoryview. The version string of each
+message gives its serialization kind and size, so the message bytes are handed
+to SerderACDC as they were received (no dict round trip through Flask and no
+re-serialization), and the attachments that follow are read in place.
+keripy only parses bytes, not memoryviews, so each message and primitive is
+copied out of the buffer exactly once (a body that is a single message is
+passed as is). Controller indexed signatures (-A groups, optionally wrapped in
+-V attachment groups) are kept with their message so they can be verified
+against the exact signed bytes. A -V group must hold exactly the number of
+quadlets its count declares.
+
+This module is not named cesr so that it does not shadow the cesr package.
+"""
+
+import logging
+from keri.core import coring, serdering
+from keri.kering import Protos, Serials
+
+logger = logging.getLogger(__name__)
+
+# Accepted media types and the serialization kind each one requires (None: any)
+MEDIA_TYPES = {
+    'application/cesr': None,
+    'application/cbor': Serials.cbor,
+    'application/msgpack': Serials.mgpk,
+    'application/x-msgpack': Serials.mgpk,
+}
+
+# Enough bytes for the longest count code or indexed signature we read
+MAX_PRIMITIVE_SIZE = 160
+
+# Attachment groups that only wrap other attachments; their count is the wrapped size in quadlets
+GROUP_CODES = (coring.CtrDex.AttachedMaterialQuadlets, coring.CtrDex.BigAttachedMaterialQuadlets)
+TEXT_QUADLET_SIZE = 4
+BINARY_QUADLET_SIZE = 3
+
+
+class StreamError(ValueError):
+    """Raised when a request body is not a well-formed ACDC stream"""
+
+
+class StreamedCredential:
+    """One ACDC from a stream: the parsed serder and its attached signatures"""
+
+    __slots__ = ('serder', 'sigers')
+
+    def __init__(self, serder):
+        self.serder = serder
+        self.sigers = []
+
+
+def accepts(mimetype):
+    """Return True if the media type is a binary/CESR credential stream"""
+    return mimetype in MEDIA_TYPES
+
+
+def _is_counter(lead):
+    """Return True if the byte starts a count code ('-' in text, 0b111110 prefix in binary)"""
+    return lead == 0x2d or lead >> 2 == 0x3e
+
+
+def _primitive(cls, view, offset, text):
+    """Read a count code or indexed signature at offset, returning (primitive, size)"""
+    # keripy needs bytes, so the (at most MAX_PRIMITIVE_SIZE) bytes it may read are copied once
+    chunk = bytes(view[offset:offset + MAX_PRIMITIVE_SIZE])
+    try:
+        if text:
+            primitive = cls(qb64b=chunk)
+            return primitive, len(primitive.qb64b)
+        primitive = cls(qb2=chunk)
+        return primitive, len(primitive.qb2)
+    except Exception as e:
+        raise StreamError(f"Invalid {cls.__name__.lower()} at offset {offset}: {str(e)}") from e
+
+
+def _read_attachment_group(view, offset, message):
+    """Read one attachment group following a message, returning the next offset"""
+    start = offset
+    text = view[offset] == 0x2d
+    counter, size = _primitive(coring.Counter, view, offset, text)
+    offset += size
+
+    if counter.code in GROUP_CODES:
+        # The wrapped groups follow directly and must end exactly where the count says
+        end = offset + counter.count * (TEXT_QUADLET_SIZE if text else BINARY_QUADLET_SIZE)
+        if end > len(view):
+            raise StreamError(f"Truncated attachment group at offset {start}")
+        while offset < end:
+            if not _is_counter(view[offset]):
+                break
+            offset = _read_attachment_group(view, offset, message)
+        if offset != end:
+            raise StreamError(f"Attachment group at offset {start} declares {counter.count} quadlets, "
+                              f"but its attachments end at offset {offset}")
+        return offset
+    if counter.code != coring.CtrDex.ControllerIdxSigs:
+        raise StreamError(f"Unsupported attachment group {counter.code} at offset {start}")
+
+    for _ in range(counter.count):
+        siger, size = _primitive(coring.Siger, view, offset, text)
+        message.sigers.append(siger)
+        offset += size
+    return offset
+
+
+def parse_stream(body, mimetype='application/cesr'):
+    """Parse a request body into StreamedCredential items, raising StreamError if malformed"""
+    expected_kind = MEDIA_TYPES.get(mimetype)
+    view = memoryview(body)
+    messages = []
+    offset = 0
+
+    while offset < len(view):
+        if _is_counter(view[offset]):
+            if not messages:
+                raise StreamError("Attachment found before any credential")
+            if mimetype != 'application/cesr':
+                raise StreamError(f"Attachments are only accepted as application/cesr, not {mimetype}")
+            offset = _read_attachment_group(view, offset, messages[-1])
+            continue
+
+        try:
+            proto, kind, _version, size = coring.sniff(view[offset:offset + serdering.Serder.InhaleSize])
+        except Exception as e:
+            raise StreamError(f"Invalid version string at offset {offset}: {str(e)}") from e
+        if proto != Protos.acdc:
+            raise StreamError(f"Expected an ACDC at offset {offset}, got {proto}")
+        if expected_kind and kind != expected_kind:
+            raise StreamError(f"Expected {expected_kind} serialization for {mimetype}, got {kind}")
+        if offset + size > len(view):
+            raise StreamError(f"Truncated credential at offset {offset}")
+
+        if offset == 0 and size == len(view) and isinstance(body, bytes):
+            raw = body
+        else:
+            raw = bytes(view[offset:offset + size])
+        try:
+            # SerderACDC keeps raw[:size], which is raw itself for bytes of exactly that size (no second copy)
+            serder = serdering.SerderACDC(raw=raw)
+        except Exception as e:
+            raise StreamError(f"Invalid credential at offset {offset}: {str(e)}") from e
+        messages.append(StreamedCredential(serder))
+        offset += size
+
+    if not messages:
+        raise StreamError("Empty credential stream")
+    logger.debug("Parsed %d credentials from %d byte %s stream", len(messages), len(view), mimetype)
+    return messages
@@ -0,0 +1,155 @@
+"""
+Warm-cache checkpoints for the KERI ACDC Verification Service
+
+Key states, credentials and indexes live in LMDB and survive a restart, but
+the in-memory caches built on top of them (credential status results and
+verified chain suffixes, see app.py) do not. Without a checkpoint every
+deploy or crash starts with empty caches.
+
+The service writes these caches to a checkpoint file under the database
+directory when it shuts down gracefully, and every CHECKPOINT_INTERVAL_SECONDS
+while it runs. On start-up it loads the file back. Every entry records the
+trust generation it was computed for, and the file also records the trust
+artifacts fingerprint. If the fingerprint differs, or an entry's generation is
+not the current one, the entry is dropped, so a restore never serves results
+for a trust state that has since changed.
+
+The file is JSON with a format name and version. It is written to a
+temporary file and renamed into place, so a crash mid-write leaves the
+previous checkpoint intact. Files with another format or version are
+ignored.
+
+Configuration:
+- CHECKPOINT_ENABLED: write and restore checkpoints (default: true)
+- CHECKPOINT_INTERVAL_SECONDS: periodic checkpoint interval (default: 300; 0 only checkpoints on shutdown)
+"""
+
+import os
+import json
+import time
+import atexit
+import signal
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_ENABLED = os.getenv('CHECKPOINT_ENABLED', 'true').lower() == 'true'
+CHECKPOINT_INTERVAL_SECONDS = float(os.getenv('CHECKPOINT_INTERVAL_SECONDS', 300))
+
+CHECKPOINT_FORMAT = "verifier-warm-cache"
+CHECKPOINT_VERSION = 1
+CHECKPOINT_FILENAME = "warm-cache.checkpoint"
+
+
+def save_checkpoint(path, generation, fingerprint, caches):
+    """
+    Write caches ({name: {key: (generation, value)}}) to path atomically
+
+    Entries from other trust generations are left out. Returns the number of
+    entries written.
+    """
+    entries = {
+        name: [[key, value] for key, (entry_generation, value) in cache.copy().items() if entry_generation == generation]
+        for name, cache in caches.items()
+    }
+    document = {
+        'format': CHECKPOINT_FORMAT,
+        'version': CHECKPOINT_VERSION,
+        'generation': generation,
+        'fingerprint': fingerprint,
+        'saved_at': time.time(),
+        'caches': entries,
+    }
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(document, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return sum(len(items) for items in entries.values())
+
+
+def load_checkpoint(path, generation, fingerprint):
+    """
+    Read a checkpoint back as {name: {key: (generation, value)}}
+
+    Returns an empty dict when there is no usable checkpoint for this trust
+    state (missing, unreadable, other format or version, other fingerprint).
+    """
+    try:
+        with open(path, 'r') as f:
+            document = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {str(e)}")
+        return {}
+
+    if document.get('format') != CHECKPOINT_FORMAT or document.get('version') != CHECKPOINT_VERSION:
+        logger.info(f"Ignoring checkpoint {path}: format {document.get('format')} version {document.get('version')}")
+        return {}
+    if document.get('fingerprint') != fingerprint or document.get('generation') != generation:
+        logger.info(f"Discarding checkpoint from trust generation {document.get('generation')} (now {generation})")
+        return {}
+    return {
+        name: {key: (generation, value) for key, value in items}
+        for name, items in document.get('caches', {}).items()
+    }
+
+
+class Checkpointer:
+    """
+    Saves warm caches periodically and on shutdown
+
+    save() is called from a daemon thread every interval seconds, at interpreter
+    exit and on SIGTERM. The SIGTERM handler chains to the one it replaced, so
+    a server's own shutdown handling still runs after the checkpoint.
+    """
+
+    def __init__(self, save, interval=CHECKPOINT_INTERVAL_SECONDS):
+        self.save = save
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._previous_sigterm = None
+
+    def checkpoint(self):
+        """Run save() once; errors are logged, never raised"""
+        with self._lock:
+            try:
+                started = time.perf_counter()
+                count = self.save()
+                logger.debug("Checkpointed %s cache entries in %.3fs", count, time.perf_counter() - started)
+            except Exception as e:
+                logger.warning(f"Checkpoint failed: {str(e)}")
+
+    def start(self):
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name='checkpoint', daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+        if threading.current_thread() is threading.main_thread():
+            self._previous_sigterm = signal.signal(signal.SIGTERM, self._on_sigterm)
+
+    def stop(self):
+        """Stop the periodic thread and write a final checkpoint (once)"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self.checkpoint()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.checkpoint()
+
+    def _on_sigterm(self, signum, frame):
+        self.stop()
+        previous = self._previous_sigterm
+        if callable(previous):
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            # Terminate the way the default handler would have
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            os.kill(os.getpid(), signal.SIGTERM)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a domain and DID resolver, for domain-linkage testing
+
+Creates a fresh Ed25519 key and a test DID, then writes as static files:
+- .well-known/did-configuration.json: a signed DomainLinkageCredential JWT in
+  the same shape create-domain-linkage.js produces;
+- resolve-did/<did>: the DID document, with the key and a LinkedDomains service.
+It serves them over HTTP with Cache-Control: max-age=<--max-age> and an ETag.
+Conditional requests are answered with 304.
+
+Point the verifier at the stand-in with DID_RESOLVER_URL=<origin>/resolve-did,
+then POST {"did": <did>} to /verify/domain-linkage. With --check the script
+runs the domain-linkage checks against the stand-in itself, exits non-zero on
+failure and stops. Without it, it serves until interrupted.
+
+Usage: python3 domain-linkage-standin.py [--port PORT] [--dir DIR]
+                                         [--max-age SECONDS] [--check]
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import logging
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from keri.core import coring
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _b64url(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def linkage_jwt(signer, did, origin, kid):
+    """DomainLinkageCredential JWT for did and origin, signed with signer"""
+    header = {'kid': kid, 'typ': 'JWT', 'alg': 'EdDSA'}
+    payload = {
+        'iss': did,
+        'nbf': int(time.time()) - 60,
+        'vc': {
+            '@context': [
+                'https://www.w3.org/2018/credentials/v1',
+                'https://identity.foundation/.well-known/did-configuration/v1',
+            ],
+            'type': 'VerifiableCredential',
+            'credentialSubject': {
+                'credentialSubject': {'id': did, 'origin': origin},
+                'type': ['VerifiableCredential', 'DomainLinkageCredential'],
+            },
+        },
+    }
+    signing_input = f"{_b64url(json.dumps(header).encode())}.{_b64url(json.dumps(payload).encode())}"
+    return f"{signing_input}.{_b64url(signer.sign(signing_input.encode()).raw)}"
+
+
+def write_site(directory, origin):
+    """Write the DID configuration and DID document; returns the DID"""
+    signer = coring.Signer(transferable=False)
+    did = f"did:iota:standin:0x{os.urandom(16).hex()}"
+    kid = f"{did}#key-1"
+    document = {
+        'id': did,
+        'verificationMethod': [{
+            'id': kid,
+            'type': 'JsonWebKey2020',
+            'controller': did,
+            'publicKeyJwk': {'kty': 'OKP', 'crv': 'Ed25519', 'x': _b64url(signer.verfer.raw)},
+        }],
+        'service': [{'id': f"{did}#linked-domain", 'type': 'LinkedDomains', 'serviceEndpoint': origin}],
+    }
+    configuration = {
+        '@context': 'https://identity.foundation/.well-known/did-configuration/v1',
+        'linked_dids': [linkage_jwt(signer, did, origin, kid)],
+    }
+    (directory / ".well-known").mkdir(parents=True, exist_ok=True)
+    (directory / "resolve-did").mkdir(parents=True, exist_ok=True)
+    (directory / ".well-known" / "did-configuration.json").write_text(json.dumps(configuration, indent=2))
+    (directory / "resolve-did" / did).write_text(json.dumps(document, indent=2))
+    return did
+
+
+class CachingStaticHandler(SimpleHTTPRequestHandler):
+    """Static files with Cache-Control, ETag and If-None-Match support"""
+
+    max_age = 60
+    extensions_map = dict(SimpleHTTPRequestHandler.extensions_map, **{'': 'application/json'})
+
+    def _etag(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return None
+        st = os.stat(path)
+        return '"' + hashlib.blake2b(f"{st.st_size}:{st.st_mtime_ns}".encode(), digest_size=8).hexdigest() + '"'
+
+    def do_GET(self):
+        etag = self._etag()
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def end_headers(self):
+        etag = self._etag()
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Cache-Control', f"public, max-age={self.max_age}")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def check(origin, did):
+    """Run the domain-linkage checks against the stand-in; returns a list of failures"""
+    import domain_linkage
+
+    failures = []
+    verifier = domain_linkage.DomainLinkageVerifier(resolver_url=f"{origin}/resolve-did")
+
+    result = verifier.verify(did)
+    if not result['verified']:
+        failures.append(f"Linked DID did not verify: {result}")
+    if verifier.verify(did, origin).get('cached') is not True:
+        failures.append("Second verification was not served from the (origin, DID) cache")
+    # Rejected before the origin is fetched (a fetch of the unresolvable host would fail at step 'fetch')
+    result = verifier.verify(did, "http://other.invalid")
+    if result['verified'] or result.get('step') != 'origin':
+        failures.append(f"Checked an origin the DID document does not declare: {result}")
+    allowed = domain_linkage.DomainLinkageVerifier(verifier.client, f"{origin}/resolve-did", allowed_origins="http://other.invalid")
+    if allowed.verify(did, "http://other.invalid").get('step') != 'fetch':
+        failures.append("An allow-listed origin was not fetched")
+    other_did = did[:-4] + "beef"
+    result = verifier.verify(other_did, origin)
+    if result['verified']:
+        failures.append("Verified a DID the configuration does not link")
+
+    # A second verifier sharing the HTTP client needs no new request while documents are fresh
+    requests_before = verifier.client.stats['requests']
+    batch = [{'did': did}, {'did': did, 'origin': origin}, {'did': other_did, 'origin': origin},
+             {'did': did, 'origin': "http://other.invalid"}]
+    results = domain_linkage.DomainLinkageVerifier(verifier.client, f"{origin}/resolve-did").verify_many(batch)
+    if [result['verified'] for result in results] != [True, True, False, False]:
+        failures.append(f"Unexpected batch results: {results}")
+    if verifier.client.stats['requests'] - requests_before > 1:
+        failures.append(f"Fresh documents were fetched again: {verifier.client.stats}")
+
+    # With uncacheable documents, a batch still fetches each distinct document once
+    client = domain_linkage.CachingHttpClient()
+    results = domain_linkage.DomainLinkageVerifier(client, f"{origin}/resolve-did").verify_many(batch[:2] * 3)
+    if not all(result['verified'] for result in results):
+        failures.append(f"Unexpected uncached batch results: {results}")
+    if client.stats['requests'] != 2:
+        failures.append(f"Batch fetched documents more than once: {client.stats}")
+    logger.info(f"HTTP client: {verifier.client.stats}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a signed DID configuration and DID document for domain-linkage tests")
+    parser.add_argument('--port', type=int, default=8765, help="Port to serve on (default: 8765)")
+    parser.add_argument('--dir', help="Directory for the generated files (default: a temporary directory)")
+    parser.add_argument('--max-age', type=int, default=60, help="Cache-Control max-age of served files (default: 60)")
+    parser.add_argument('--check', action='store_true', help="Run the domain-linkage checks, then stop")
+    args = parser.parse_args()
+
+    directory = Path(args.dir or tempfile.mkdtemp(prefix="domain-linkage-"))
+    origin = f"http://127.0.0.1:{args.port}"
+    did = write_site(directory, origin)
+
+    CachingStaticHandler.max_age = args.max_age
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), partial(CachingStaticHandler, directory=str(directory)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving {directory} at {origin}")
+    logger.info(f"DID: {did}")
+    logger.info(f"Verifier settings: DID_RESOLVER_URL={origin}/resolve-did")
+
+    try:
+        if args.check:
+            failures = check(origin, did)
+            for failure in failures:
+                logger.error(failure)
+            logger.info("Domain-linkage checks passed" if not failures else f"{len(failures)} domain-linkage checks failed")
+            return 0 if not failures else 1
+
+        logger.info("Press Ctrl-C to stop")
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,469 @@
+"""
+W3C domain-linkage verification for the KERI ACDC Verification Service
+
+Checks that a DID and a web origin are linked: the origin serves
+/.well-known/did-configuration.json (DIF Well Known DID Configuration, as
+written by did-management/create-domain-linkage.js), and one of its
+linked_dids is a DomainLinkageCredential JWT for that DID and origin. The JWT
+must be signed (EdDSA) with a key from the DID document, be issued by the DID
+itself and be valid at the time of the check.
+
+Documents are fetched through CachingHttpClient, a pooled HTTP client that
+honours Cache-Control (max-age, no-cache, no-store) and revalidates stale
+entries with If-None-Match / If-Modified-Since. DID documents come from a
+resolver (twin-service's /resolve-did by default), which can be any URL that
+serves a DID document, or {"didDocument": ...}, at DID_RESOLVER_URL/<did>.
+Verified (origin, DID) pairs are cached for DOMAIN_LINKAGE_TTL_SECONDS, and
+never beyond the JWT's expiry. Both caches keep at most
+DOMAIN_LINKAGE_CACHE_SIZE entries and evict the least recently used one beyond
+that; expired verified pairs are dropped when they are looked up.
+DomainLinkageVerifier.verify_many answers items from the verified-pair cache
+first and fetches the distinct origins and DID documents of the rest
+concurrently.
+
+A caller may name the origin to check, but the verifier only fetches origins
+the DID document declares as LinkedDomains endpoints, or origins listed in
+DOMAIN_LINKAGE_ALLOWED_ORIGINS. Any other origin is rejected before a request
+is made, so the service cannot be used to reach arbitrary hosts.
+
+For local testing, domain-linkage-standin.py serves a signed configuration and
+DID document as static files.
+
+Configuration:
+- DID_RESOLVER_URL: DID resolution base URL (default: http://localhost:3001/resolve-did)
+- DOMAIN_LINKAGE_TTL_SECONDS: lifetime of a verified (origin, DID) pair (default: 600)
+- DOMAIN_LINKAGE_TIMEOUT_SECONDS: HTTP timeout per fetch (default: 5)
+- DOMAIN_LINKAGE_POOL_SIZE: pooled connections per host (default: 16)
+- DOMAIN_LINKAGE_FETCH_WORKERS: concurrent fetches for batches (default: 8)
+- DOMAIN_LINKAGE_ALLOWED_ORIGINS: comma-separated origins that may be checked for any DID (default: none)
+- DOMAIN_LINKAGE_CACHE_SIZE: entries kept per cache (fetched documents, verified pairs) (default: 1024)
+"""
+
+import os
+import re
+import json
+import time
+import base64
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import quote, urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from keri.core import coring
+
+logger = logging.getLogger(__name__)
+
+DID_RESOLVER_URL = os.getenv('DID_RESOLVER_URL', 'http://localhost:3001/resolve-did').rstrip('/')
+DOMAIN_LINKAGE_TTL_SECONDS = float(os.getenv('DOMAIN_LINKAGE_TTL_SECONDS', 600))
+DOMAIN_LINKAGE_TIMEOUT_SECONDS = float(os.getenv('DOMAIN_LINKAGE_TIMEOUT_SECONDS', 5))
+DOMAIN_LINKAGE_POOL_SIZE = int(os.getenv('DOMAIN_LINKAGE_POOL_SIZE', 16))
+DOMAIN_LINKAGE_FETCH_WORKERS = int(os.getenv('DOMAIN_LINKAGE_FETCH_WORKERS', 8))
+DOMAIN_LINKAGE_ALLOWED_ORIGINS = os.getenv('DOMAIN_LINKAGE_ALLOWED_ORIGINS', '')
+DOMAIN_LINKAGE_CACHE_SIZE = int(os.getenv('DOMAIN_LINKAGE_CACHE_SIZE', 1024))
+
+DID_CONFIGURATION_PATH = "/.well-known/did-configuration.json"
+DOMAIN_LINKAGE_TYPE = "DomainLinkageCredential"
+
+_MAX_AGE = re.compile(r'(?:^|,)\s*(?:s-)?max-age\s*=\s*"?(\d+)"?', re.IGNORECASE)
+
+
+class FetchError(Exception):
+    """Raised when a document cannot be fetched or is not valid JSON"""
+
+
+def _b64url_decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+class CachingHttpClient:
+    """
+    Pooled JSON GET client with an HTTP cache
+
+    A response is reused without a request while it is fresh (Cache-Control
+    max-age minus Age). Once stale it is revalidated with its ETag or
+    Last-Modified, and a 304 renews it. Responses marked no-store are not kept.
+    Stale entries are kept for revalidation, so the cache is bounded by
+    max_entries instead, evicting the least recently used URL.
+    """
+
+    def __init__(self, timeout=DOMAIN_LINKAGE_TIMEOUT_SECONDS, pool_size=DOMAIN_LINKAGE_POOL_SIZE,
+                 max_entries=DOMAIN_LINKAGE_CACHE_SIZE):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'fresh_hits': 0, 'revalidated': 0}
+
+    @staticmethod
+    def _freshness(headers):
+        """(storable, seconds fresh) from the response's Cache-Control and Age headers"""
+        cache_control = headers.get('Cache-Control', '')
+        directives = cache_control.lower()
+        if 'no-store' in directives:
+            return False, 0
+        if 'no-cache' in directives:
+            return True, 0
+        match = _MAX_AGE.search(cache_control)
+        max_age = int(match.group(1)) if match else 0
+        try:
+            age = int(headers.get('Age', 0))
+        except ValueError:
+            age = 0
+        return True, max(0, max_age - age)
+
+    def get_json(self, url):
+        """Return the JSON document at url, from the cache when fresh"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(url)
+            if cached:
+                self._cache.move_to_end(url)
+            if cached and now < cached['expires']:
+                self.stats['fresh_hits'] += 1
+                return cached['document']
+            self.stats['requests'] += 1
+
+        headers = {'Accept': 'application/json'}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise FetchError(f"Could not fetch {url}: {str(e)}") from e
+
+        if response.status_code == 304 and cached:
+            _, fresh_for = self._freshness(response.headers)
+            with self._lock:
+                self.stats['revalidated'] += 1
+                cached['expires'] = time.monotonic() + fresh_for
+            return cached['document']
+        if response.status_code != 200:
+            raise FetchError(f"{url} returned HTTP {response.status_code}")
+        try:
+            document = response.json()
+        except ValueError as e:
+            raise FetchError(f"{url} is not valid JSON") from e
+
+        storable, fresh_for = self._freshness(response.headers)
+        with self._lock:
+            if storable:
+                self._cache[url] = {
+                    'document': document,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'expires': time.monotonic() + fresh_for,
+                }
+                self._cache.move_to_end(url)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.pop(url, None)
+        return document
+
+
+def normalize_origin(origin):
+    """scheme://host[:port] without a trailing slash, or None if origin is not an http(s) origin"""
+    if not isinstance(origin, str):
+        return None
+    parts = urlsplit(origin.strip())
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def linked_domain_origins(did_document):
+    """Origins of all LinkedDomains services in a DID document, in document order"""
+    origins = []
+    for service in did_document.get('service') or []:
+        if not isinstance(service, dict):
+            continue
+        types = service.get('type') if isinstance(service.get('type'), list) else [service.get('type')]
+        if 'LinkedDomains' not in types:
+            continue
+        endpoints = service.get('serviceEndpoint')
+        if isinstance(endpoints, dict):
+            endpoints = endpoints.get('origins') or []
+        elif not isinstance(endpoints, list):
+            endpoints = [endpoints]
+        for endpoint in endpoints:
+            origin = normalize_origin(endpoint)
+            if origin and origin not in origins:
+                origins.append(origin)
+    return origins
+
+
+def linked_domain_origin(did_document):
+    """Origin of the first LinkedDomains service in a DID document"""
+    origins = linked_domain_origins(did_document)
+    return origins[0] if origins else None
+
+
+def verification_key(did_document, kid):
+    """Ed25519 public key (raw bytes) of the verification method kid in a DID document"""
+    did = did_document.get('id')
+    for method in did_document.get('verificationMethod') or []:
+        if not isinstance(method, dict):
+            continue
+        method_id = method.get('id', '')
+        if method_id.startswith('#'):
+            method_id = f"{did}{method_id}"
+        if method_id != kid:
+            continue
+        jwk = method.get('publicKeyJwk') or {}
+        if jwk.get('kty') != 'OKP' or jwk.get('crv') != 'Ed25519' or not jwk.get('x'):
+            raise ValueError(f"Verification method {kid} is not an Ed25519 JWK")
+        return _b64url_decode(jwk['x'])
+    raise ValueError(f"Verification method {kid} not found in the DID document")
+
+
+def jwt_issuer(jwt):
+    """Unverified iss claim of a JWT, to skip linked DIDs of other subjects before resolving keys"""
+    try:
+        return json.loads(_b64url_decode(jwt.split('.')[1])).get('iss')
+    except (ValueError, IndexError, AttributeError):
+        return None
+
+
+def verify_linkage_jwt(jwt, did, origin, did_document, now=None):
+    """
+    Verify one linked_dids JWT for did and origin
+
+    Returns {'valid': True, 'expires': exp or None} or {'valid': False, 'reason': ...}.
+    """
+    try:
+        encoded_header, encoded_payload, encoded_signature = jwt.split('.')
+        header = json.loads(_b64url_decode(encoded_header))
+        payload = json.loads(_b64url_decode(encoded_payload))
+    except (ValueError, AttributeError):
+        return {'valid': False, 'reason': "Malformed JWT"}
+
+    if header.get('alg') != 'EdDSA':
+        return {'valid': False, 'reason': f"Unsupported JWT algorithm: {header.get('alg')}"}
+    kid = header.get('kid', '')
+    if kid.split('#')[0] != did or payload.get('iss') != did:
+        return {'valid': False, 'reason': "JWT is not issued by the DID"}
+
+    vc = payload.get('vc') or {}
+    types = vc.get('type') if isinstance(vc.get('type'), list) else [vc.get('type')]
+    subject = vc.get('credentialSubject') or {}
+    if isinstance(subject, list):
+        subject = subject[0] if subject else {}
+    # Credentials created through the identity connector nest the subject one level deeper
+    if isinstance(subject.get('credentialSubject'), dict):
+        types = types + (subject.get('type') or [])
+        subject = subject['credentialSubject']
+    if DOMAIN_LINKAGE_TYPE not in types:
+        return {'valid': False, 'reason': f"JWT is not a {DOMAIN_LINKAGE_TYPE}"}
+    if subject.get('id') != did:
+        return {'valid': False, 'reason': "Credential subject does not match the DID"}
+    if normalize_origin(subject.get('origin')) != origin:
+        return {'valid': False, 'reason': "Credential origin does not match the domain"}
+
+    now = now if now is not None else time.time()
+    if payload.get('nbf') and payload['nbf'] > now:
+        return {'valid': False, 'reason': "Credential is not yet valid"}
+    if payload.get('exp') and payload['exp'] <= now:
+        return {'valid': False, 'reason': "Credential has expired"}
+
+    try:
+        verfer = coring.Verfer(raw=verification_key(did_document, kid), code=coring.MtrDex.Ed25519)
+        signed = verfer.verify(_b64url_decode(encoded_signature), f"{encoded_header}.{encoded_payload}".encode())
+    except ValueError as e:
+        return {'valid': False, 'reason': str(e)}
+    if not signed:
+        return {'valid': False, 'reason': "Invalid JWT signature"}
+    return {'valid': True, 'expires': payload.get('exp')}
+
+
+class DomainLinkageVerifier:
+    """Fetches, verifies and caches DID ↔ origin linkages"""
+
+    def __init__(self, client=None, resolver_url=DID_RESOLVER_URL, ttl=DOMAIN_LINKAGE_TTL_SECONDS,
+                 fetch_workers=DOMAIN_LINKAGE_FETCH_WORKERS, allowed_origins=DOMAIN_LINKAGE_ALLOWED_ORIGINS,
+                 max_entries=DOMAIN_LINKAGE_CACHE_SIZE):
+        self.client = client or CachingHttpClient()
+        self.resolver_url = resolver_url
+        self.ttl = ttl
+        self.fetch_workers = fetch_workers
+        if isinstance(allowed_origins, str):
+            allowed_origins = allowed_origins.split(',')
+        self.allowed_origins = {normalize_origin(origin) for origin in allowed_origins} - {None}
+        self.max_entries = max_entries
+        # (origin, did) -> (expires, result), least recently used first
+        self._verified = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, did):
+        """DID document for did"""
+        document = self.client.get_json(f"{self.resolver_url}/{quote(did, safe=':')}")
+        if isinstance(document, dict) and isinstance(document.get('didDocument'), dict):
+            document = document['didDocument']
+        if not isinstance(document, dict) or document.get('id') != did:
+            raise FetchError(f"Resolver returned no DID document for {did}")
+        return document
+
+    def did_configuration(self, origin):
+        return self.client.get_json(f"{origin}{DID_CONFIGURATION_PATH}")
+
+    def permitted_origin(self, did_document, origin=None):
+        """
+        The origin to check for a DID document, or None if it may not be fetched
+
+        Without an origin this is the first LinkedDomains origin. A given origin
+        must be one of the LinkedDomains origins or in allowed_origins.
+        """
+        declared = linked_domain_origins(did_document)
+        if origin is None:
+            return declared[0] if declared else None
+        return origin if origin in declared or origin in self.allowed_origins else None
+
+    def _cached(self, key):
+        with self._lock:
+            cached = self._verified.get(key)
+            if cached is None:
+                return None
+            if time.time() >= cached[0]:
+                del self._verified[key]
+                return None
+            self._verified.move_to_end(key)
+        return dict(cached[1], cached=True)
+
+    def _remember(self, key, expires, result):
+        with self._lock:
+            self._verified[key] = (expires, result)
+            self._verified.move_to_end(key)
+            while len(self._verified) > self.max_entries:
+                self._verified.popitem(last=False)
+
+    def verify(self, did, origin=None, did_document=None, configuration=None):
+        """
+        Verify that did and origin are linked
+
+        Without an origin, the DID document's LinkedDomains service is used.
+        did_document and configuration are documents verify_many already
+        fetched (or the FetchError their fetch raised). Returns a result dict
+        with 'verified' and either the linkage details or 'reason' and the
+        failing 'step'.
+        """
+        try:
+            if origin is not None:
+                origin = normalize_origin(origin)
+                if origin is None:
+                    return {'verified': False, 'reason': "Origin must be an http(s) origin", 'step': 'origin'}
+                # Only pairs that passed the origin check are ever cached
+                cached = self._cached((origin, did))
+                if cached:
+                    return cached
+
+            if isinstance(did_document, FetchError):
+                raise did_document
+            did_document = did_document or self.resolve(did)
+            permitted = self.permitted_origin(did_document, origin)
+            if permitted is None:
+                if origin is None:
+                    return {'verified': False, 'reason': "DID document has no LinkedDomains service", 'step': 'origin'}
+                return {'verified': False, 'reason': f"{origin} is not a LinkedDomains origin of {did}", 'step': 'origin'}
+            if origin is None:
+                origin = permitted
+                cached = self._cached((origin, did))
+                if cached:
+                    return cached
+
+            if isinstance(configuration, FetchError):
+                raise configuration
+            if configuration is None:
+                configuration = self.did_configuration(origin)
+            linked_dids = configuration.get('linked_dids') if isinstance(configuration, dict) else None
+            if not isinstance(linked_dids, list) or not linked_dids:
+                return {'verified': False, 'reason': f"No linked_dids in {origin}{DID_CONFIGURATION_PATH}", 'step': 'configuration'}
+
+            candidates = [jwt for jwt in linked_dids if isinstance(jwt, str) and jwt_issuer(jwt) == did]
+            if not candidates:
+                return {'verified': False, 'reason': f"{origin} does not link {did}", 'step': 'jwt_verification'}
+
+            reasons = []
+            for jwt in candidates:
+                checked = verify_linkage_jwt(jwt, did, origin, did_document)
+                if checked['valid']:
+                    result = {'verified': True, 'did': did, 'origin': origin, 'linked_dids': len(linked_dids)}
+                    expires = time.time() + self.ttl
+                    if checked['expires']:
+                        expires = min(expires, checked['expires'])
+                    self._remember((origin, did), expires, result)
+                    return dict(result, cached=False)
+                reasons.append(checked['reason'])
+            reason = "; ".join(dict.fromkeys(reasons))
+            return {'verified': False, 'reason': f"No valid domain linkage for {did}: {reason}", 'step': 'jwt_verification'}
+        except FetchError as e:
+            return {'verified': False, 'reason': str(e), 'step': 'fetch'}
+        except Exception as e:
+            logger.error("Domain linkage verification error: %s", e, exc_info=True)
+            return {'verified': False, 'reason': f"Domain linkage verification error: {str(e)}", 'step': 'process_error'}
+
+    def verify_many(self, items):
+        """
+        Verify several {'did', 'origin'} items
+
+        Items naming an origin whose pair is already verified are answered
+        from the cache without resolving the DID. For the rest, the DID
+        documents and the DID configurations of their permitted origins are
+        fetched concurrently first (each distinct one once), then handed to
+        verify() for each item, so nothing is fetched twice even when the
+        documents may not be cached.
+        """
+        results = [None] * len(items)
+        pending = []
+        for index, item in enumerate(items):
+            origin = normalize_origin(item['origin']) if item.get('origin') is not None else None
+            results[index] = self._cached((origin, item['did'])) if origin else None
+            if results[index] is None:
+                pending.append(index)
+        if not pending:
+            return results
+
+        dids = list({items[index]['did'] for index in pending})
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            documents = dict(zip(dids, executor.map(lambda did: self._try(self.resolve, did), dids)))
+            # Origin each item will check (None when it is invalid or not permitted, so it is never fetched)
+            origins = []
+            for item in (items[index] for index in pending):
+                document = documents[item['did']]
+                origin = normalize_origin(item['origin']) if item.get('origin') is not None else None
+                if isinstance(document, FetchError) or (item.get('origin') is not None and origin is None):
+                    origins.append(None)
+                else:
+                    origins.append(self.permitted_origin(document, origin))
+            distinct = list(set(origins) - {None})
+            configurations = dict(zip(distinct, executor.map(lambda origin: self._try(self.did_configuration, origin), distinct)))
+        for index, origin in zip(pending, origins):
+            item = items[index]
+            results[index] = self.verify(item['did'], item.get('origin'), documents[item['did']], configurations.get(origin))
+        return results
+
+    @staticmethod
+    def _try(fetch, argument):
+        """fetch(argument), or the FetchError it raised"""
+        try:
+            return fetch(argument)
+        except FetchError as e:
+            return e
+
+    def describe(self):
+        with self._lock:
+            verified = len(self._verified)
+        return dict(self.client.stats, verified_pairs=verified)
+
+
+# Shared verifier for the service (DID documents and configurations are cached per process)
+domain_linkage_verifier = DomainLinkageVerifier()
@@ -0,0 +1,133 @@
+"""
+On-demand request profiling for the KERI ACDC Verification Service
+
+A single /verify request is profiled when it carries the profiling secret in
+the X-Profile header. The secret is not accepted in the query string, where it
+would end up in access logs and traffic captures. An admin window can
+also sample a percentage of live traffic for a fixed duration. Each profiled
+request is written as a cProfile stats file, which keeps the full caller/callee
+tree and can be opened with snakeviz or converted to a flamegraph with flameprof.
+
+Profiling is disabled unless PROFILE_SECRET is set.
+
+Configuration:
+- PROFILE_SECRET: shared secret that enables profiling
+- PROFILE_DIR: where .prof files are written (default: profiles under VERIFIER_DB_DIR)
+- PROFILE_MAX_WINDOW_SECONDS: upper bound for admin sampling windows (default: 600)
+"""
+
+import os
+import hmac
+import time
+import random
+import cProfile
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SECRET = os.getenv('PROFILE_SECRET')
+VERIFIER_DB_DIR = os.getenv('VERIFIER_DB_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db'))
+PROFILE_DIR = Path(os.getenv('PROFILE_DIR', Path(VERIFIER_DB_DIR) / "profiles"))
+PROFILE_MAX_WINDOW_SECONDS = float(os.getenv('PROFILE_MAX_WINDOW_SECONDS', 600))
+
+# cProfile cannot run two profilers at once, so only one request is profiled at a time
+_profiler_lock = threading.Lock()
+_window_lock = threading.Lock()
+_window = {'percent': 0.0, 'until': 0.0, 'profiled': 0}
+
+
+def authorized(token):
+    """Check a caller-supplied token against the profiling secret"""
+    if not PROFILE_SECRET or not token:
+        return False
+    return hmac.compare_digest(token.encode(), PROFILE_SECRET.encode())
+
+
+def requested(headers):
+    """Return True if the request explicitly asks to be profiled (X-Profile header only)"""
+    return authorized(headers.get('X-Profile'))
+
+
+def sampled():
+    """Return True if the active admin window selects this request"""
+    percent, until = _window['percent'], _window['until']
+    if percent <= 0 or time.time() >= until:
+        return False
+    return random.random() * 100 < percent
+
+
+def start_window(percent, duration_seconds):
+    """Sample a percentage of live traffic for a fixed duration"""
+    percent = max(0.0, min(float(percent), 100.0))
+    duration_seconds = max(0.0, min(float(duration_seconds), PROFILE_MAX_WINDOW_SECONDS))
+    with _window_lock:
+        _window['percent'] = percent
+        _window['until'] = time.time() + duration_seconds
+        _window['profiled'] = 0
+    logger.info(f"Profiling window opened: {percent}% of traffic for {duration_seconds}s")
+    return window_status()
+
+
+def stop_window():
+    """Close the admin sampling window"""
+    with _window_lock:
+        _window['percent'] = 0.0
+        _window['until'] = 0.0
+    return window_status()
+
+
+def window_status():
+    """Describe the current admin sampling window"""
+    remaining = max(0.0, _window['until'] - time.time())
+    return {
+        'active': _window['percent'] > 0 and remaining > 0,
+        'percent': _window['percent'],
+        'remaining_seconds': round(remaining, 1),
+        'profiled_requests': _window['profiled'],
+        'profile_dir': str(PROFILE_DIR),
+    }
+
+
+@contextmanager
+def profile(label):
+    """
+    Profile the enclosed block and write a .prof file
+
+    Yields a dict whose 'path' is set once the stats file has been written. If
+    another request is already being profiled the block runs unprofiled and
+    'path' stays None.
+    """
+    result = {'path': None}
+    if not _profiler_lock.acquire(blocking=False):
+        yield result
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Another profiler (e.g. a debugger) is already active in this process
+        _profiler_lock.release()
+        logger.warning(f"Unable to start request profiler: {str(e)}")
+        yield result
+        return
+
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        try:
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            path = PROFILE_DIR / f"{time.strftime('%Y%m%dT%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{label}.prof"
+            profiler.dump_stats(str(path))
+            result['path'] = path
+            with _window_lock:
+                _window['profiled'] += 1
+            logger.info(f"Wrote request profile: {path}")
+        except Exception as e:
+            logger.warning(f"Failed to write request profile: {str(e)}")
+        finally:
+            _profiler_lock.release()
@@ -0,0 +1,167 @@
+"""
+Signed verification receipts for the KERI ACDC Verification Service
+
+With receipts enabled, a successful verification comes back with a receipt: a
+compact statement, signed with the verifier's receipt key, that the credential
+verified. It covers the credential SAID,
+the issuance chain, the DID it was checked against (if any) and the
+trust-state generation, and it expires. A caller holding a receipt can check
+it again with one Ed25519 signature check (validate_receipt here, or
+twin-service/lib/receipts.js) instead of calling /verify again.
+
+Format:
+
+    base64url(payload JSON) "." signature (CESR qb64 Ed25519 signature)
+
+The signature covers the exact encoded payload bytes, so checking a receipt
+needs no canonical JSON. Payload fields:
+
+    v      receipt format version
+    vrf    verifier AID
+    said   credential SAID
+    chain  issuance chain AIDs, subject first, GLEIF root last
+    did    DID the credential was verified against (only when one was given)
+    gen    trust-state generation
+    iat    issued at (Unix seconds)
+    exp    expires at (Unix seconds)
+
+The receipt key is a dedicated Ed25519 key kept in the verifier database
+directory (RECEIPT_KEY_FILENAME, mode 0600), not the habitat's signing key:
+receipts are signed in verification worker processes too, and the habitat's
+private key never leaves its keystore. Instead the habitat signs the receipt
+key's public key (the endorsement), so a client can tie the receipt key to the
+verifier AID. The verifier's AID, its current key, the receipt key and the
+endorsement are served at GET /verifier/key.
+
+Configuration:
+- RECEIPT_TTL_SECONDS: receipt lifetime (default: 0, receipts disabled)
+"""
+
+import os
+import json
+import time
+import base64
+import logging
+
+from keri.core import coring
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_TTL_SECONDS = int(os.getenv('RECEIPT_TTL_SECONDS', 0))
+RECEIPT_KEY_FILENAME = "receipt-key"
+
+RECEIPT_VERSION = "VRCPT10"
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def load_receipt_key(directory):
+    """The receipt signing key kept in directory, created on first use"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, RECEIPT_KEY_FILENAME)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path, 'r') as f:
+            seed = f.read().strip()
+        if not seed:
+            raise ValueError(f"Receipt key file {path} is empty")
+        return coring.Signer(qb64=seed, transferable=True)
+    # Transferable only selects the 'D' Ed25519 key code, which receipt clients expect
+    signer = coring.Signer(transferable=True)
+    with os.fdopen(fd, 'w') as f:
+        f.write(signer.qb64)
+    logger.info(f"Created receipt key {path}")
+    return signer
+
+
+class ReceiptSigner:
+    """Issues receipts signed with the verifier's receipt key"""
+
+    def __init__(self, aid, signer, endorsement=None, aid_key=None):
+        self.aid = aid
+        self.signer = signer
+        self.endorsement = endorsement
+        self.aid_key = aid_key
+
+    @classmethod
+    def from_hab(cls, hab, directory):
+        """Signer for a keripy habitat: the receipt key kept in directory, endorsed by the habitat"""
+        signer = load_receipt_key(directory)
+        # hab.sign keeps the habitat's private key in its keystore
+        endorsement = hab.sign(ser=signer.verfer.qb64b, indexed=False)[0]
+        return cls(hab.pre, signer, endorsement.qb64, hab.kever.verfers[0].qb64)
+
+    @classmethod
+    def from_export(cls, data):
+        """Rebuild a signer exported with export() (verification worker processes)"""
+        return cls(data['aid'], coring.Signer(qb64=data['seed'], transferable=True), data['endorsement'], data['aid_key'])
+
+    def export(self):
+        """Picklable form for verification worker processes (the receipt key, never the habitat's)"""
+        return {'aid': self.aid, 'seed': self.signer.qb64, 'endorsement': self.endorsement, 'aid_key': self.aid_key}
+
+    @property
+    def key(self):
+        """Public key (qb64) receipts are checked against"""
+        return self.signer.verfer.qb64
+
+    def issue(self, said, chain, generation, did=None, ttl=None, now=None):
+        """Return a signed receipt for a verified credential (ttl defaults to RECEIPT_TTL_SECONDS)"""
+        issued = int(now if now is not None else time.time())
+        ttl = RECEIPT_TTL_SECONDS if ttl is None else ttl
+        payload = {
+            'v': RECEIPT_VERSION,
+            'vrf': self.aid,
+            'said': said,
+            'chain': list(chain),
+            'gen': generation,
+            'iat': issued,
+            'exp': issued + ttl,
+        }
+        if did:
+            payload['did'] = did
+        encoded = _b64encode(json.dumps(payload, separators=(',', ':')).encode())
+        return f"{encoded}.{self.signer.sign(encoded.encode()).qb64}"
+
+
+def validate_endorsement(key, endorsement, aid_key):
+    """Return True if endorsement is the verifier AID's signature (with key aid_key) over the receipt key"""
+    try:
+        return coring.Verfer(qb64=aid_key).verify(coring.Cigar(qb64=endorsement).raw, key.encode())
+    except Exception:
+        return False
+
+
+def validate_receipt(receipt, key, said=None, did=None, now=None):
+    """
+    Check a receipt against the verifier's public key (qb64)
+
+    Optionally also require a credential SAID or DID. Returns
+    {'valid': True, 'payload': {...}} or {'valid': False, 'reason': ...}.
+    """
+    try:
+        encoded, _, signature = receipt.partition('.')
+        if not encoded or not signature:
+            return {'valid': False, 'reason': "Malformed receipt"}
+        if not coring.Verfer(qb64=key).verify(coring.Cigar(qb64=signature).raw, encoded.encode()):
+            return {'valid': False, 'reason': "Invalid receipt signature"}
+
+        payload = json.loads(_b64decode(encoded))
+        if payload.get('v') != RECEIPT_VERSION:
+            return {'valid': False, 'reason': f"Unsupported receipt version: {payload.get('v')}"}
+        if payload['exp'] <= (now if now is not None else time.time()):
+            return {'valid': False, 'reason': "Receipt expired"}
+        if said is not None and payload['said'] != said:
+            return {'valid': False, 'reason': "Receipt is for another credential"}
+        if did is not None and payload.get('did') != did:
+            return {'valid': False, 'reason': "Receipt is for another DID"}
+        return {'valid': True, 'payload': payload}
+    except Exception as e:
+        return {'valid': False, 'reason': f"Receipt validation error: {str(e)}"}
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Replay captured /verify traffic against a verifier
+
+Reads capture files written with CAPTURE_DIR (see capture.py) and re-sends
+each request to its recorded endpoint under --url with the original spacing between arrivals, divided by
+--speed (1 = real time, 10 = ten times faster, 0 = as fast as possible).
+Requests are sent from --concurrency threads, so bursts stay bursts. It then
+reports how the replayed outcomes and latencies compare to the captured ones:
+- outcome differences (e.g. verified when captured, not verified on replay);
+- latency percentiles, captured and replayed, overall and per captured outcome.
+Replayed latency is measured at the client and includes the HTTP round trip,
+while captured latency is server-side.
+
+Full records (CAPTURE_ANONYMIZE=false) are re-sent byte for byte with their
+recorded content type and query. Anonymized records are rebuilt from the
+credential SAID: the credential is looked up in --artifact-dir, and the
+expected DID is either one of its alsoKnownAs DIDs (when the captured DID was
+bound) or an unbound placeholder DID. They are always re-sent as JSON, since
+the signatures of a CESR body and the encoding of a CBOR or MessagePack body
+are not kept. Malformed requests are re-sent as an empty body. Records whose
+SAID is not found are skipped and counted.
+
+The exit status is 1 when any replayed outcome differs from the captured one.
+
+Usage: python3 replay.py CAPTURE_FILE [CAPTURE_FILE ...] [--url URL]
+                         [--speed FACTOR] [--concurrency N] [--limit N]
+                         [--artifact-dir DIR] [--output FILE]
+"""
+
+import sys
+import json
+import time
+import base64
+import logging
+import argparse
+import threading
+import statistics
+from pathlib import Path
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_ARTIFACT_DIR = SCRIPT_DIR.parent / "gleif-frontend" / "public" / ".well-known" / "keri"
+UNBOUND_DID = "did:replay:unbound"
+DEFAULT_ENDPOINT = "/verify"
+MAX_LISTED_DIFFERENCES = 20
+
+
+def load_records(paths, limit=None):
+    """Capture records from the given files, in arrival order"""
+    records = []
+    for path in paths:
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+    records.sort(key=lambda entry: entry['ts'])
+    return records[:limit] if limit else records
+
+
+def load_credentials(artifact_dir):
+    """Credentials under artifact_dir by SAID (for anonymized records)"""
+    credentials = {}
+    for path in Path(artifact_dir).rglob('*.json'):
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if isinstance(data, dict) and isinstance(data.get('a'), dict) and data.get('d'):
+            credentials[data['d']] = data
+    return credentials
+
+
+def build_request(entry, credentials):
+    """(endpoint, body bytes, content type, query) to re-send for a capture record, or None if it cannot be rebuilt"""
+    endpoint = entry.get('endpoint') or DEFAULT_ENDPOINT
+    parts = _request_body(entry, credentials)
+    return (endpoint, *parts) if parts else None
+
+
+def _request_body(entry, credentials):
+    """(body bytes, content type, query) for a capture record, or None if it cannot be rebuilt"""
+    if not entry.get('anonymized'):
+        body = entry['body'].encode() if 'body' in entry else base64.b64decode(entry['body_b64'])
+        return body, entry.get('content_type') or 'application/json', entry.get('query') or {}
+
+    if entry.get('said') is None and entry.get('status') == 400:
+        # The captured body did not parse; an empty one is rejected the same way
+        return b'{}', 'application/json', {}
+    credential = credentials.get(entry.get('said'))
+    if credential is None:
+        return None
+    payload = {'credential': credential}
+    if 'expected_did' in entry:
+        dids = credential['a'].get('alsoKnownAs') or []
+        payload['expected_did'] = dids[0] if entry.get('did_bound') and dids else UNBOUND_DID
+    return json.dumps(payload).encode(), 'application/json', {}
+
+
+def outcome_of(response):
+    if response.status_code >= 500:
+        return 'error'
+    try:
+        return 'verified' if response.json().get('verified') else 'not_verified'
+    except ValueError:
+        return 'not_verified'
+
+
+def percentiles(values):
+    """p50/p95/p99 in milliseconds"""
+    if not values:
+        return {}
+    cuts = statistics.quantiles(values, n=100) if len(values) > 1 else values * 99
+    return {'count': len(values), 'p50_ms': round(cuts[49], 2), 'p95_ms': round(cuts[94], 2), 'p99_ms': round(cuts[98], 2)}
+
+
+def replay(records, url, speed, concurrency, credentials):
+    """Re-send the records on their captured schedule; returns one result per sent record"""
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_maxsize=concurrency))
+    session.mount('https://', HTTPAdapter(pool_maxsize=concurrency))
+    results = []
+    results_lock = threading.Lock()
+
+    def send(entry, request_parts, due):
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        endpoint, body, content_type, query = request_parts
+        started = time.perf_counter()
+        try:
+            response = session.post(f"{url}{endpoint}", data=body, params=query,
+                                    headers={'Content-Type': content_type}, timeout=60)
+            outcome, status = outcome_of(response), response.status_code
+        except requests.RequestException as e:
+            outcome, status = 'error', None
+            logger.warning(f"Request for {entry.get('trace_id')} failed: {str(e)}")
+        result = {
+            'trace_id': entry.get('trace_id'),
+            'captured_outcome': entry['outcome'],
+            'replayed_outcome': outcome,
+            'captured_status': entry.get('status'),
+            'replayed_status': status,
+            'captured_ms': entry.get('total_ms'),
+            'replayed_ms': round((time.perf_counter() - started) * 1000, 3),
+            'lag_ms': round(max(0.0, started - due) * 1000, 3),
+        }
+        with results_lock:
+            results.append(result)
+
+    first = records[0]['ts']
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for entry in records:
+            request_parts = build_request(entry, credentials)
+            if request_parts is None:
+                continue
+            due = start + ((entry['ts'] - first) / speed if speed > 0 else 0)
+            # Submit shortly before the request is due, so the queue never runs far ahead of the schedule
+            while due - time.perf_counter() > 0.05:
+                time.sleep(min(0.05, due - time.perf_counter()))
+            executor.submit(send, entry, request_parts, due)
+    return results, time.perf_counter() - start
+
+
+def report(records, results, wall_seconds, speed):
+    """Summary of outcome and latency differences"""
+    differences = [result for result in results if result['captured_outcome'] != result['replayed_outcome']]
+    captured_span = records[-1]['ts'] - records[0]['ts'] if records else 0
+    by_outcome = {}
+    for outcome in sorted({result['captured_outcome'] for result in results}):
+        subset = [result for result in results if result['captured_outcome'] == outcome]
+        by_outcome[outcome] = {
+            'captured': percentiles([result['captured_ms'] for result in subset if result['captured_ms'] is not None]),
+            'replayed': percentiles([result['replayed_ms'] for result in subset]),
+        }
+    return {
+        'records': len(records),
+        'sent': len(results),
+        'skipped': len(records) - len(results),
+        'speed': speed,
+        'captured_seconds': round(captured_span, 3),
+        'replay_seconds': round(wall_seconds, 3),
+        'max_lag_ms': max((result['lag_ms'] for result in results), default=0),
+        'outcome_differences': len(differences),
+        'transitions': dict(Counter(f"{result['captured_outcome']} -> {result['replayed_outcome']}" for result in differences)),
+        'latency': {
+            'captured': percentiles([result['captured_ms'] for result in results if result['captured_ms'] is not None]),
+            'replayed': percentiles([result['replayed_ms'] for result in results]),
+        },
+        'latency_by_captured_outcome': by_outcome,
+        'differences': differences[:MAX_LISTED_DIFFERENCES],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured /verify traffic against a verifier")
+    parser.add_argument('captures', nargs='+', help="Capture files (verify-capture.jsonl and its rotated files)")
+    parser.add_argument('--url', default="http://localhost:5001", help="Verifier base URL (default: http://localhost:5001)")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Replay speed factor: 1 = captured pace, 10 = ten times faster, 0 = no delays (default: 1)")
+    parser.add_argument('--concurrency', type=int, default=16, help="Concurrent requests in flight (default: 16)")
+    parser.add_argument('--limit', type=int, help="Replay only the first N records")
+    parser.add_argument('--artifact-dir', default=str(DEFAULT_ARTIFACT_DIR),
+                        help="Where to look up credentials for anonymized records")
+    parser.add_argument('--output', help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    records = load_records(args.captures, args.limit)
+    if not records:
+        logger.error("No capture records found")
+        return 1
+    credentials = load_credentials(args.artifact_dir) if any(entry.get('anonymized') for entry in records) else {}
+
+    logger.info(f"Replaying {len(records)} requests against {args.url} at speed {args.speed or 'unlimited'}")
+    results, wall_seconds = replay(records, args.url.rstrip('/'), args.speed, args.concurrency, credentials)
+    summary = report(records, results, wall_seconds, args.speed)
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(summary, indent=2))
+    if summary['skipped']:
+        logger.warning(f"Skipped {summary['skipped']} anonymized records whose credential is not in {args.artifact_dir}")
+    return 1 if summary['outcome_differences'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""
+Unix domain socket RPC for the KERI ACDC Verification Service
+
+Co-located callers (twin-service, local tools) can skip TCP, HTTP parsing and
+per-call connection setup by talking to the verifier over a Unix domain
+socket. Connections are persistent and carry length-prefixed binary frames:
+
+    header  payload length (uint32), request id (uint32), code (uint16), network byte order
+    payload request or response body
+
+For requests the code is the operation, for responses it is an HTTP-style
+status (200, 400, 404, 413, 500, 503) so results map one-to-one onto the HTTP
+API. Requests are pipelined: a client may send any number of frames without
+waiting, each one is handled on the shared worker pool, and responses are
+written as they complete, matched to their request by id. At most
+VERIFIER_RPC_MAX_INFLIGHT requests per connection are queued or running; once
+a connection reaches the cap its frames are not read until a response has been
+written, so a client that pipelines faster than the verifier answers is slowed
+down by the socket buffers instead of growing the worker queue.
+
+The socket is created with mode 0660 (the umask is set around bind, so it is
+never reachable with wider permissions). A socket file left by a previous run
+is replaced, but start() refuses to take over a path that another listener
+still accepts connections on.
+
+The listener is enabled by setting VERIFIER_RPC_SOCKET to a socket path.
+
+Configuration:
+- VERIFIER_RPC_SOCKET: socket path for the RPC listener (disabled when unset)
+- VERIFIER_RPC_WORKERS: worker threads handling RPC requests (default: 8)
+- VERIFIER_RPC_MAX_FRAME: largest accepted request payload in bytes (default: 16 MiB)
+- VERIFIER_RPC_MAX_INFLIGHT: pipelined requests per connection queued or running at once (default: 64)
+"""
+
+import os
+import json
+import stat
+import errno
+import socket
+import struct
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+VERIFIER_RPC_SOCKET = os.getenv('VERIFIER_RPC_SOCKET')
+VERIFIER_RPC_WORKERS = int(os.getenv('VERIFIER_RPC_WORKERS', 8))
+VERIFIER_RPC_MAX_FRAME = int(os.getenv('VERIFIER_RPC_MAX_FRAME', 16 * 1024 * 1024))
+VERIFIER_RPC_MAX_INFLIGHT = int(os.getenv('VERIFIER_RPC_MAX_INFLIGHT', 64))
+
+FRAME_HEADER = struct.Struct("!IIH")
+
+# Operations
+OP_PING = 0
+OP_VERIFY = 1          # JSON /verify payload
+OP_VERIFY_STREAM = 2   # CESR / CBOR / MsgPack ACDC stream (batch result)
+OP_VERIFY_BATCH = 3    # JSON /verify/batch payload
+OP_VERIFY_DID = 4      # UTF-8 DID, like GET /verify/by-did/<did>
+
+
+class RpcError(Exception):
+    """Raised when the RPC connection fails or a frame is malformed"""
+
+
+def _compact(value):
+    """Serialize a value as compact JSON bytes"""
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+def _recv_exact(sock, size):
+    """Read exactly size bytes, or return None if the peer closed the connection first"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if not count:
+            return None
+        received += count
+    return buffer
+
+
+def read_frame(sock, max_payload=VERIFIER_RPC_MAX_FRAME):
+    """Read one frame, returning (request_id, code, payload) or None at end of stream"""
+    header = _recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    length, request_id, code = FRAME_HEADER.unpack(header)
+    if length > max_payload:
+        raise RpcError(f"Frame of {length} bytes exceeds the limit of {max_payload}")
+    payload = _recv_exact(sock, length) if length else bytearray()
+    if payload is None:
+        raise RpcError("Connection closed in the middle of a frame")
+    return request_id, code, payload
+
+
+def write_frame(sock, request_id, code, payload):
+    """Write one frame (header and payload in a single send)"""
+    sock.sendall(FRAME_HEADER.pack(len(payload), request_id, code) + payload)
+
+
+class RpcServer:
+    """
+    Unix domain socket listener dispatching frames to operation handlers
+
+    handlers maps an operation code to a callable taking the request payload
+    (bytearray) and returning (body, status), where body is JSON-serializable
+    or already encoded JSON bytes.
+    """
+
+    def __init__(self, path, handlers, workers=VERIFIER_RPC_WORKERS, max_inflight=VERIFIER_RPC_MAX_INFLIGHT):
+        self.path = path
+        self.max_inflight = max(1, max_inflight)
+        self.handlers = dict(handlers)
+        self.handlers.setdefault(OP_PING, lambda payload: ({"success": True}, 200))
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='rpc-worker')
+        self._sock = None
+        self._closed = threading.Event()
+
+    def _remove_stale_socket(self):
+        """Unlink a socket file left by a previous run; raise RpcError if it is still being served"""
+        try:
+            mode = os.lstat(self.path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise RpcError(f"{self.path} exists and is not a socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except OSError as e:
+            if e.errno not in (errno.ECONNREFUSED, errno.ENOENT):
+                raise RpcError(f"Cannot tell whether {self.path} is in use: {str(e)}") from e
+        else:
+            raise RpcError(f"{self.path} is in use by another RPC listener")
+        finally:
+            probe.close()
+        # Nobody is listening: a stale socket from a previous run would make bind fail
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def start(self):
+        """Bind the socket and accept connections on a background thread"""
+        self._remove_stale_socket()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Create the socket file as 0660 rather than narrowing it after bind
+        umask = os.umask(0o117)
+        try:
+            self._sock.bind(self.path)
+        finally:
+            os.umask(umask)
+        self._sock.listen(socket.SOMAXCONN)
+        threading.Thread(target=self._accept_loop, name='rpc-accept', daemon=True).start()
+        logger.info(f"RPC listener on unix socket {self.path}")
+        return self
+
+    def close(self):
+        """Stop accepting connections and remove the socket file"""
+        self._closed.set()
+        if self._sock is not None:
+            self._sock.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self._executor.shutdown(wait=False)
+
+    def _accept_loop(self):
+        while not self._closed.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                if self._closed.is_set():
+                    return
+                logger.warning("RPC accept failed", exc_info=True)
+                continue
+            threading.Thread(target=self._serve_connection, args=(conn,), name='rpc-conn', daemon=True).start()
+
+    def _serve_connection(self, conn):
+        """Read frames until the peer disconnects; responses may complete out of order"""
+        write_lock = threading.Lock()
+        inflight = threading.BoundedSemaphore(self.max_inflight)
+        with conn:
+            while True:
+                # Stop reading at the cap until a response has been written
+                inflight.acquire()
+                try:
+                    frame = read_frame(conn)
+                except (RpcError, OSError) as e:
+                    logger.warning(f"Closing RPC connection: {str(e)}")
+                    return
+                if frame is None:
+                    return
+                request_id, op, payload = frame
+                try:
+                    self._executor.submit(self._dispatch, conn, write_lock, inflight, request_id, op, payload)
+                except RuntimeError:
+                    # The server is shutting down
+                    return
+
+    def _dispatch(self, conn, write_lock, inflight, request_id, op, payload):
+        try:
+            self._respond(conn, write_lock, request_id, op, payload)
+        finally:
+            inflight.release()
+
+    def _respond(self, conn, write_lock, request_id, op, payload):
+        handler = self.handlers.get(op)
+        try:
+            if handler is None:
+                body, status = {"success": False, "error": f"Unknown operation {op}"}, 400
+            else:
+                body, status = handler(payload)
+        except Exception as e:
+            logger.error("RPC handler error: %s", e, exc_info=True)
+            body, status = {"success": False, "error": f"Internal server error: {str(e)}"}, 500
+
+        try:
+            with write_lock:
+                write_frame(conn, request_id, status, body if isinstance(body, bytes) else _compact(body))
+        except OSError:
+            # The client went away before its response was ready
+            logger.debug("RPC client disconnected before response %d", request_id)
+
+
+class RpcClient:
+    """
+    Persistent, pipelining client for the verifier RPC socket
+
+    call() sends one request and waits for its response; pipeline() sends a
+    list of requests back to back and then collects all responses. The client
+    is safe to share between threads (calls are serialized).
+    """
+
+    def __init__(self, path=VERIFIER_RPC_SOCKET, timeout=30.0):
+        if not path:
+            raise RpcError("No RPC socket path configured (set VERIFIER_RPC_SOCKET)")
+        self.path = path
+        self.timeout = timeout
+        self._sock = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self):
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            self._sock = sock
+        return self._sock
+
+    def close(self):
+        """Close the connection (the next call reconnects)"""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def pipeline(self, requests):
+        """Send [(op, payload bytes), ...] without waiting, then return [(status, body), ...] in request order"""
+        if not requests:
+            return []
+        with self._lock:
+            sock = self._connect()
+            try:
+                frames = []
+                for op, payload in requests:
+                    self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+                    frames.append((self._next_id, op, payload))
+
+                # The verifier stops reading a connection at its in-flight cap until responses
+                # have been read, so the rest of a pipeline is written while responses are collected
+                write_frame(sock, *frames[0])
+                sender, send_errors = None, []
+                if len(frames) > 1:
+                    sender = threading.Thread(target=self._send, args=(sock, frames[1:], send_errors),
+                                              name='rpc-send', daemon=True)
+                    sender.start()
+
+                responses = {}
+                while len(responses) < len(frames):
+                    frame = read_frame(sock, max_payload=1 << 31)
+                    if frame is None:
+                        raise RpcError(f"Verifier closed the RPC connection: {send_errors[0]}" if send_errors
+                                       else "Verifier closed the RPC connection")
+                    request_id, status, body = frame
+                    responses[request_id] = (status, json.loads(body))
+                if sender is not None:
+                    sender.join()
+                return [responses[request_id] for request_id, _, _ in frames]
+            except (OSError, RpcError):
+                # Responses still in flight would be matched to the wrong calls, so start over
+                self.close()
+                raise
+
+    @staticmethod
+    def _send(sock, frames, errors):
+        try:
+            for frame in frames:
+                write_frame(sock, *frame)
+        except OSError as e:
+            # Surfaces as a closed connection or timeout on the reading side
+            errors.append(e)
+
+    def call(self, op, payload=b''):
+        """Send one request and return (status, body)"""
+        return self.pipeline([(op, payload)])[0]
+
+    def ping(self):
+        return self.call(OP_PING)
+
+    def verify(self, credential, issuer_aid=None, expected_did=None):
+        """Verify a credential dict, like POST /verify"""
+        return self.call(OP_VERIFY, _compact({
+            'credential': credential,
+            'issuer_aid': issuer_aid,
+            'expected_did': expected_did,
+        }))
+
+    def verify_stream(self, raw):
+        """Verify every ACDC in a CESR/CBOR/MsgPack stream, like POST /verify/batch"""
+        return self.call(OP_VERIFY_STREAM, bytes(raw))
+
+    def verify_batch(self, items):
+        """Verify a list of /verify payloads, like POST /verify/batch"""
+        return self.call(OP_VERIFY_BATCH, _compact({'items': items}))
+
+    def verify_did(self, did):
+        """Verify the credential bound to a DID, like GET /verify/by-did/<did>"""
+        return self.call(OP_VERIFY_DID, did.encode())
@@ -2,22 +2,44 @@
 """
 Seed the verifier's Baser database with trusted issuer key states.
 
-This script reads the inception event files (gleif-incept.json, qvi-incept.json)
-generated by the credential generation process and loads these events into the
-verifier's Baser database to populate it with the trusted issuers' key states.
-
-Usage: python3 seed-verifier-db.py
+This script scans the artifact directory written by the credential generation
+process (inception events such as gleif-incept.json and icp/<aid>, and ACDC
+credentials) and loads the key states and credentials into the verifier's trust
+store: named sub-databases in the same LMDB environment the verification
+service opens.
+
+Seeding is incremental. A manifest of content hashes (db/seed-manifest.json)
+records every ingested artifact, so a run only parses files that are new or
+changed. Changed files are read, hashed and parsed in parallel worker
+processes, and the results are written to LMDB in large batched transactions.
+The manifest also records which key state or credential each artifact wrote,
+so removing or changing an artifact removes what it wrote from the store.
+--full clears the trust store and re-ingests everything, and so does a run
+after the shard ring changed (see sharding.py), which moves keys between nodes.
+
+Usage: python3 seed-verifier-db.py [--inception-dir DIR] [--db-dir DIR]
+                                   [--workers N] [--batch-size N] [--full]
+
+The database directory defaults to VERIFIER_DB_DIR, like the service, so a
+seed run and the service it seeds agree on where the trust store lives.
 """
 
 import os
+import sys
 import json
+import time
+import hashlib
 import logging
+import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
 # KERI imports for cryptographic operations and database management
-from keri.core import parsing, eventing, serdering
+from keri.core import coring, parsing, eventing, serdering
 from keri.db import basing
-from keri.app import habbing
+
+import sharding
+from store import LMDB_MAP_SIZE, open_trust_store
 
 # Configure logging
 logging.basicConfig(
@@ -26,104 +48,313 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def initialize_verifier_baser():
+DEFAULT_INCEPTION_DIR = Path(__file__).parent.parent / "gleif-frontend" / "public" / ".well-known" / "keri"
+VERIFIER_DB_DIR = os.getenv('VERIFIER_DB_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db'))
+MANIFEST_NAME = "seed-manifest.json"
+# Version 2 records the key state or credential each artifact wrote
+MANIFEST_VERSION = 2
+
+SEED_WORKERS = int(os.getenv('SEED_WORKERS', os.cpu_count() or 1))
+SEED_BATCH_SIZE = int(os.getenv('SEED_BATCH_SIZE', 5000))
+# Below this many changed files, parsing in-process is faster than starting a pool
+SEED_PARALLEL_THRESHOLD = int(os.getenv('SEED_PARALLEL_THRESHOLD', 256))
+
+# Artifacts that are never key states or credentials
+SKIPPED_SUFFIXES = {'.txt', '.md', '.bin', '.tmp'}
+SKIPPED_NAMES = {'habitats.json', MANIFEST_NAME}
+
+KEY_EVENT_TYPES = {'icp', 'dip', 'rot', 'drt'}
+
+def initialize_verifier_baser(db_dir=None):
     """Initialize the verifier's Baser database"""
     try:
         # Create database directory if it doesn't exist
-        script_dir = Path(__file__).parent
-        db_dir = script_dir / "db"
-        db_dir.mkdir(exist_ok=True)
+        db_dir = Path(db_dir or VERIFIER_DB_DIR)
+        db_dir.mkdir(parents=True, exist_ok=True)
 
         # Initialize persistent Baser database
-        baser = basing.Baser(name="verifier", temp=False, headDirPath=str(db_dir))
+        baser = basing.Baser(name="verifier", temp=False, headDirPath=str(db_dir), reopen=True)
         logger.info(f"Initialized verifier Baser database at: {db_dir}")
         return baser
     except Exception as e:
         logger.error(f"Failed to initialize verifier Baser: {str(e)}")
         raise
 
-def load_inception_event(baser, event_path):
-    """Load a single inception event into the Baser database"""
-    try:
-        # Read the inception event file
-        with open(event_path, 'r') as f:
-            event_data = json.load(f)
-
-        logger.info(f"Loading inception event from: {event_path}")
-        logger.info(f"Event AID: {event_data.get('i', 'unknown')}")
-
-        # Extract the necessary information from the event data
-        aid = event_data['i']
-        verfer_qb64 = event_data['k'][0]
-
-        # Create a verfer from the public key
-        from keri.core import coring
-        verfer = coring.Verfer(qb64=verfer_qb64)
-
-        # Create a simple mock Kever object that has the verfers attribute
-        class MockKever:
-            def __init__(self, pre, verfers):
-                self.pre = pre
-                self.verfers = verfers
-
-        mock_kever = MockKever(aid, [verfer])
+def parse_artifact(path):
+    """
+    Read, hash and classify one artifact file (runs in worker processes)
 
-        # Initialize baser.kevers if it doesn't exist
-        if not hasattr(baser, 'kevers'):
-            baser.kevers = {}
-
-        # Add the mock kever to the baser's kevers
-        baser.kevers[aid] = [mock_kever]
-
-        logger.info(f"Successfully loaded inception event for AID: {aid}")
+    Returns (path, sha256, kind, key, record) where kind is 'key_state',
+    'credential', 'other' or 'invalid'. Key state records are (sn, keys);
+    credential records are (credential dict, compact serialization).
+    """
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except OSError as e:
+        return path, None, 'invalid', None, str(e)
 
-        return True
+    digest = hashlib.sha256(raw).hexdigest()
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return path, digest, 'other', None, None
+    if not isinstance(data, dict):
+        return path, digest, 'other', None, None
 
+    version = data.get('v', '')
+    try:
+        if version.startswith('KERI') and data.get('t') in KEY_EVENT_TYPES:
+            keys = data['k']
+            # Reject events whose signing keys are not valid qb64 verfers
+            for verfer_qb64 in keys:
+                coring.Verfer(qb64=verfer_qb64)
+            return path, digest, 'key_state', data['i'], (data.get('s', "0"), keys)
+
+        if version.startswith('ACDC'):
+            said = data['d']
+            compact = json.dumps(data, separators=(',', ':')).encode()
+            return path, digest, 'credential', said, (data, compact)
     except Exception as e:
-        logger.error(f"Failed to load inception event from {event_path}: {str(e)}")
-        return False
-
-def load_credential(baser, credential_path):
-    """Load a credential from JSON file and store it in the Baser database"""
+        return path, digest, 'invalid', None, f"{type(e).__name__}: {str(e)}"
+
+    return path, digest, 'other', None, None
+
+def discover_artifacts(inception_dir):
+    """List candidate artifact files under the inception directory with their stat info"""
+    artifacts = {}
+    for root, dirs, files in os.walk(inception_dir):
+        for name in files:
+            if name in SKIPPED_NAMES or Path(name).suffix in SKIPPED_SUFFIXES:
+                continue
+            path = os.path.join(root, name)
+            st = os.stat(path)
+            artifacts[os.path.relpath(path, inception_dir)] = (st.st_size, st.st_mtime_ns)
+    return artifacts
+
+def load_manifest(manifest_path):
+    """Load the seed manifest, an empty one if missing, or None if it is unreadable or from another version"""
     try:
-        # Read the credential file
-        with open(credential_path, 'r') as f:
-            credential_data = json.load(f)
-
-        logger.info(f"Loading credential from: {credential_path}")
-        logger.info(f"Credential SAID: {credential_data.get('d', 'unknown')}")
-
-        # Store the credential in the Baser
-        # For now, we'll store credentials in a simple dictionary on the baser
-        if not hasattr(baser, 'credentials'):
-            baser.credentials = {}
-
-        said = credential_data.get('d')
-        if said:
-            baser.credentials[said] = credential_data
-            logger.info(f"Successfully stored credential in Baser: {said}")
-            return True
-        else:
-            logger.error(f"No SAID found in credential data")
-            return False
-
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+        logger.warning(f"Ignoring seed manifest with unsupported version: {manifest.get('version')}")
+    except FileNotFoundError:
+        return {'version': MANIFEST_VERSION, 'artifacts': {}}
     except Exception as e:
-        logger.error(f"Failed to load credential from {credential_path}: {str(e)}")
-        return False
+        logger.warning(f"Ignoring unreadable seed manifest {manifest_path}: {str(e)}")
+    return None
+
+def save_manifest(manifest_path, manifest):
+    """Atomically replace the seed manifest"""
+    tmp_path = manifest_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+    os.replace(tmp_path, manifest_path)
+
+def _is_newer_sn(new_sn, old_sn):
+    """Compare KERI sequence numbers (hex strings)"""
+    try:
+        return int(new_sn, 16) >= int(old_sn, 16)
+    except (TypeError, ValueError):
+        return True
 
-def seed_verifier_database():
-    """Main function to seed the verifier database with inception events"""
+def _write_records(trust_store, txn, batch):
+    """Write parsed artifacts inside a write transaction (for an AID the highest sequence number wins)"""
+    for kind, key, record in batch:
+        if kind == 'key_state':
+            sn, keys = record
+            existing = trust_store.get_key_state(key, txn=txn)
+            if existing is None or _is_newer_sn(sn, existing.get('s')):
+                trust_store.put_key_state(key, keys, sn, txn=txn)
+        else:
+            credential, compact = record
+            trust_store.put_credential(credential, raw=compact, txn=txn)
+
+def write_batch(trust_store, batch):
+    """Write a batch of parsed artifacts to the trust store in one transaction"""
+    with trust_store.writer() as txn:
+        _write_records(trust_store, txn, batch)
+
+def replace_records(trust_store, stale, replacements):
+    """
+    Delete stale records and write their replacements in one transaction
+
+    stale is a set of (kind, key) records whose artifacts were removed or
+    changed; replacements holds the parsed artifacts that still write them.
+    """
+    with trust_store.writer() as txn:
+        trust_store.delete_key_states([key for kind, key in stale if kind == 'key_state'], txn)
+        trust_store.delete_credentials([key for kind, key in stale if kind == 'credential'], txn)
+        _write_records(trust_store, txn, replacements)
+
+def _written_record(entry):
+    """(kind, key) of the key state or credential a manifest entry's artifact wrote, or None"""
+    if entry.get('kind') in ('key_state', 'credential') and entry.get('key'):
+        return entry['kind'], entry['key']
+    return None
+
+def ingest_artifacts(trust_store, inception_dir, manifest_path, workers=SEED_WORKERS,
+                     batch_size=SEED_BATCH_SIZE, full=False, partition=None):
+    """
+    Ingest new and changed artifacts into the trust store
+
+    Each manifest entry records the key state AID or credential SAID its
+    artifact wrote. When an artifact is removed or changed, the record it
+    wrote is deleted and rebuilt from the artifacts that still write it (e.g.
+    the other events of the same KEL), in one transaction at the end of the
+    run. A full run clears the trust store first.
+
+    partition is the shard ring position the store is restricted to
+    (sharding.partition()). It is recorded in the manifest, and a run with a
+    different one is a full run: unchanged artifacts may now belong to this
+    node, and stored keys to another.
+
+    Returns a stats dict with counts, elapsed time and throughput.
+    """
+    start = time.perf_counter()
+    manifest = None if full else load_manifest(manifest_path)
+    if manifest is not None and manifest.get('partition') != partition:
+        logger.info("Shard ring changed since the last seed, re-seeding this node's partition")
+        manifest = None
+    if manifest is None:
+        # Nothing says which records the artifacts wrote (a full run, or an unreadable or older manifest): rebuild
+        trust_store.clear()
+        manifest = {'version': MANIFEST_VERSION, 'artifacts': {}}
+    manifest['partition'] = partition
+    known = manifest['artifacts']
+
+    artifacts = discover_artifacts(inception_dir)
+    stats = {
+        'discovered': len(artifacts),
+        'unchanged': 0,
+        'parsed': 0,
+        'key_states': 0,
+        'credentials': 0,
+        'other': 0,
+        'invalid': 0,
+        'removed': 0,
+        'rebuilt': 0,
+    }
+
+    # Files whose size and mtime match the manifest are skipped without being read
+    changed = []
+    for rel_path, (size, mtime_ns) in artifacts.items():
+        entry = known.get(rel_path)
+        if entry and entry['size'] == size and entry['mtime_ns'] == mtime_ns:
+            stats['unchanged'] += 1
+        else:
+            changed.append(rel_path)
+
+    # Records written by removed or changed artifacts are stale until rebuilt from the artifacts that still write them
+    stale = set()
+    for rel_path in [rel_path for rel_path in known if rel_path not in artifacts]:
+        stale.add(_written_record(known.pop(rel_path)))
+        stats['removed'] += 1
+    for rel_path in changed:
+        if rel_path in known:
+            stale.add(_written_record(known[rel_path]))
+    stale.discard(None)
+    changed_paths = set(changed)
+    rebuild = sorted(rel_path for rel_path, entry in known.items()
+                     if rel_path not in changed_paths and _written_record(entry) in stale)
+
+    paths = [os.path.join(inception_dir, rel_path) for rel_path in changed + rebuild]
+    if workers > 1 and len(paths) >= SEED_PARALLEL_THRESHOLD:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(parse_artifact, paths, chunksize=max(1, min(512, len(paths) // (workers * 4))))
+    else:
+        executor = None
+        results = map(parse_artifact, paths)
+
+    batch = []
+    replacements = []
+    try:
+        for path, digest, kind, key, record in results:
+            rel_path = os.path.relpath(path, inception_dir)
+            size, mtime_ns = artifacts[rel_path]
+            entry = known.get(rel_path)
+
+            if kind == 'invalid':
+                # Not recorded in the manifest, so the file is read again on the next run
+                known.pop(rel_path, None)
+                stats['parsed'] += 1
+                stats['invalid'] += 1
+                logger.warning(f"Skipping invalid artifact {rel_path}: {record}")
+                continue
+            known[rel_path] = {'sha256': digest, 'size': size, 'mtime_ns': mtime_ns, 'kind': kind, 'key': key}
+
+            same_content = entry is not None and entry.get('sha256') == digest
+            if rel_path not in changed_paths:
+                stats['rebuilt'] += 1
+            elif same_content:
+                stats['unchanged'] += 1
+            else:
+                stats['parsed'] += 1
+                stats[{'key_state': 'key_states', 'credential': 'credentials'}.get(kind, 'other')] += 1
+
+            if kind == 'other':
+                continue
+            if (kind, key) in stale:
+                # Written together with the deletion of the stale record, at the end of the run
+                replacements.append((kind, key, record))
+                continue
+            # Touched but identical content needs no write
+            if same_content:
+                continue
+            batch.append((kind, key, record))
+            if len(batch) >= batch_size:
+                write_batch(trust_store, batch)
+                batch = []
+
+        if batch:
+            write_batch(trust_store, batch)
+        if stale:
+            replace_records(trust_store, stale, replacements)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    stats['deleted'] = len(stale - {(kind, key) for kind, key, _ in replacements})
+
+    # The manifest is only saved once every batch has committed
+    save_manifest(manifest_path, manifest)
+
+    elapsed = time.perf_counter() - start
+    stats['elapsed_seconds'] = round(elapsed, 3)
+    stats['artifacts_per_second'] = round(len(paths) / elapsed, 1) if elapsed > 0 else None
+    return stats
+
+def seed_verifier_database(inception_dir=None, db_dir=None, workers=SEED_WORKERS,
+                           batch_size=SEED_BATCH_SIZE, full=False):
+    """Main function to seed the verifier database with inception events and credentials"""
     try:
         logger.info("Starting verifier database seeding process")
 
-        # Initialize the Baser database
-        baser = initialize_verifier_baser()
+        # Initialize the Baser database and the trust store on its LMDB environment
+        baser = initialize_verifier_baser(db_dir)
+        # In sharded mode (SHARD_NODES/SHARD_SELF) only this node's partition is stored
+        trust_store = open_trust_store(baser, LMDB_MAP_SIZE, sharding.owns if sharding.ring is not None else None)
+        partition = sharding.partition()
+
+        inception_dir = Path(inception_dir) if inception_dir else DEFAULT_INCEPTION_DIR
+        if not inception_dir.exists():
+            logger.error(f"Artifact directory not found: {inception_dir}")
+            return False
+
+        manifest_path = Path(db_dir or VERIFIER_DB_DIR) / MANIFEST_NAME
 
-        # Determine paths to inception event files
-        script_dir = Path(__file__).parent
-        inception_dir = script_dir.parent / "gleif-frontend" / "public" / ".well-known" / "keri"
+        stats = ingest_artifacts(trust_store, str(inception_dir), manifest_path, workers, batch_size, full, partition)
+        logger.info(
+            f"Ingested {stats['parsed']} new or changed artifacts "
+            f"({stats['key_states']} key states, {stats['credentials']} credentials, "
+            f"{stats['invalid']} invalid), skipped {stats['unchanged']} unchanged, "
+            f"removed {stats['removed']} ({stats['deleted']} records deleted, {stats['rebuilt']} artifacts re-read), "
+            f"in {stats['elapsed_seconds']}s ({stats['artifacts_per_second']} artifacts/s)"
+        )
+        logger.info(f"Trust store contents: {trust_store.stats()}")
 
-        # Load habitats.json to get AID mappings
+        # The GLEIF, QVI and Legal Entity key states and credentials must all be present
         habitats_path = inception_dir / "habitats.json"
         if not habitats_path.exists():
             logger.error(f"Habitats file not found: {habitats_path}")
@@ -132,125 +363,40 @@ def seed_verifier_database():
         with open(habitats_path, 'r') as f:
             habitats = json.load(f)
 
-        gleif_incept_path = inception_dir / "gleif-incept.json"
-        qvi_incept_path = inception_dir / "qvi-incept.json"
-
-        # Check if inception files exist
-        if not gleif_incept_path.exists():
-            logger.error(f"GLEIF inception file not found: {gleif_incept_path}")
-            return False
-
-        if not qvi_incept_path.exists():
-            logger.error(f"QVI inception file not found: {qvi_incept_path}")
-            return False
-
-        # Load GLEIF inception event
-        logger.info("Loading GLEIF inception event...")
-        gleif_success = load_inception_event(baser, gleif_incept_path)
-
-        # Load QVI inception event
-        logger.info("Loading QVI inception event...")
-        qvi_success = load_inception_event(baser, qvi_incept_path)
-
-        # Load Legal Entity inception event (use dynamic AID from habitats when available)
-        le_icp_candidate = None
-        if 'legal_entity' in habitats and 'aid' in habitats['legal_entity']:
-            le_icp_candidate = inception_dir / "icp" / habitats['legal_entity']['aid']
-        else:
-            # Fallback to placeholder filename if habitats missing (may not exist)
-            le_icp_candidate = inception_dir / "icp" / "EEMnP-dylPHjCyLRy_4P5Z7X7wnwNY_DgTEH4dNpTGmj"
-
-        legal_entity_incept_path = le_icp_candidate
-        if legal_entity_incept_path.exists():
-            logger.info("Loading Legal Entity inception event...")
-            legal_entity_success = load_inception_event(baser, legal_entity_incept_path)
-        else:
-            logger.warning(f"Legal Entity inception file not found: {legal_entity_incept_path}")
-            legal_entity_success = False
-
-        # Load QVI credential
-        logger.info("Loading QVI credential...")
-        qvi_credential_path = inception_dir / "qvi-credential.json"
-        qvi_credential_data = None
-        if qvi_credential_path.exists():
-            qvi_credential_success = load_credential(baser, qvi_credential_path)
-            with open(qvi_credential_path, 'r') as f:
-                qvi_credential_data = json.load(f)
-        else:
-            logger.error(f"QVI credential file not found: {qvi_credential_path}")
-            qvi_credential_success = False
-
-        # Load Legal Entity credential
-        logger.info("Loading Legal Entity credential...")
-        legal_entity_credential_path = inception_dir / "legal-entity-credential.json"
-        legal_entity_credential_data = None
-        if legal_entity_credential_path.exists():
-            legal_entity_credential_success = load_credential(baser, legal_entity_credential_path)
-            with open(legal_entity_credential_path, 'r') as f:
-                legal_entity_credential_data = json.load(f)
-        else:
-            logger.error(f"Legal Entity credential file not found: {legal_entity_credential_path}")
-            legal_entity_credential_success = False
-
-        # --- Seed Credential Registry in persistent Habery DB ---
-        logger.info("--- Seeding Credential Registry ---")
-        db_dir = script_dir / "db"
-        try:
-            hby = habbing.Habery(name="verifier", temp=False, headDirPath=str(db_dir))
-            if qvi_credential_data and 'd' in qvi_credential_data:
-                # Prefer keripy credential sub-DB if available
-                if hasattr(hby.db, 'creds'):
-                    hby.db.creds.add(said=qvi_credential_data['d'], val=qvi_credential_data)
-                    logger.info(f"Successfully stored QVI credential in KERI creds DB: {qvi_credential_data['d']}")
-                else:
-                    raise AttributeError("Baser has no 'creds' store")
-            if legal_entity_credential_data and 'd' in legal_entity_credential_data:
-                if hasattr(hby.db, 'creds'):
-                    hby.db.creds.add(said=legal_entity_credential_data['d'], val=legal_entity_credential_data)
-                    logger.info(f"Successfully stored Legal Entity credential in KERI creds DB: {legal_entity_credential_data['d']}")
-                else:
-                    raise AttributeError("Baser has no 'creds' store")
-        except Exception as e:
-            logger.error(f"Failed to seed credential registry: {str(e)}")
-            # Fallback: persist a simple JSON registry for cross-process reads
-            try:
-                registry = {}
-                if qvi_credential_data and 'd' in qvi_credential_data:
-                    registry[qvi_credential_data['d']] = qvi_credential_data
-                if legal_entity_credential_data and 'd' in legal_entity_credential_data:
-                    registry[legal_entity_credential_data['d']] = legal_entity_credential_data
-                registry_path = db_dir / "credentials_registry.json"
-                with open(registry_path, 'w') as rf:
-                    json.dump(registry, rf, indent=2)
-                logger.info(f"Wrote fallback credential registry to: {registry_path}")
-            except Exception as e2:
-                logger.error(f"Failed to write fallback credential registry: {str(e2)}")
-
-        # Create subject-based index for credential queries
-        if not hasattr(baser, 'credentials_by_subject'):
-            baser.credentials_by_subject = {}
-
-        if legal_entity_credential_data and 'legal_entity' in habitats:
-            baser.credentials_by_subject[habitats['legal_entity']['aid']] = legal_entity_credential_data
-            logger.info(f"Indexed legal entity credential for subject: {habitats['legal_entity']['aid']}")
-
-        if qvi_credential_data and 'qvi' in habitats:
-            baser.credentials_by_subject[habitats['qvi']['aid']] = qvi_credential_data
-            logger.info(f"Indexed QVI credential for subject: {habitats['qvi']['aid']}")
-
-        if gleif_success and qvi_success and legal_entity_success and qvi_credential_success and legal_entity_credential_success:
+        # A shard only holds the keys it owns; the other nodes check the rest
+        missing = []
+        for role in ('gleif', 'qvi', 'legal_entity'):
+            aid = habitats.get(role, {}).get('aid')
+            if not aid or (sharding.owns(aid) and not trust_store.has_key_state(aid)):
+                missing.append(f"{role} key state")
+        for role in ('qvi', 'legal_entity'):
+            aid = habitats.get(role, {}).get('aid')
+            if not aid or (sharding.owns(aid) and not trust_store.lookup('subjects', aid)):
+                missing.append(f"{role} credential")
+
+        if not missing:
             logger.info("✅ Verifier database seeding completed successfully")
-            logger.info("The verifier's Baser database now contains key states for GLEIF, QVI, and Legal Entity")
-            logger.info("The verifier's Baser database now contains QVI and Legal Entity credentials with subject indexing")
+            logger.info("The verifier's trust store now contains key states for GLEIF, QVI, and Legal Entity")
+            logger.info("The verifier's trust store now contains QVI and Legal Entity credentials with subject, issuer and DID indexes")
             return True
         else:
-            logger.error("❌ Failed to load one or more inception events or credentials")
+            logger.error(f"❌ Failed to load one or more inception events or credentials: {', '.join(missing)}")
             return False
 
     except Exception as e:
         logger.error(f"Database seeding failed: {str(e)}")
         return False
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Seed the verifier trust store from generated artifacts")
+    parser.add_argument('--inception-dir', help="Artifact directory (default: gleif-frontend/public/.well-known/keri)")
+    parser.add_argument('--db-dir', help="Verifier database directory (default: $VERIFIER_DB_DIR, else verification-service/db)")
+    parser.add_argument('--workers', type=int, default=SEED_WORKERS, help="Parser worker processes")
+    parser.add_argument('--batch-size', type=int, default=SEED_BATCH_SIZE, help="Artifacts per LMDB write transaction")
+    parser.add_argument('--full', action='store_true', help="Clear the trust store and re-ingest every artifact")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    success = seed_verifier_database()
-    exit(0 if success else 1)
\ No newline at end of file
+    args = parse_args(sys.argv[1:])
+    success = seed_verifier_database(args.inception_dir, args.db_dir, args.workers, args.batch_size, args.full)
+    exit(0 if success else 1)
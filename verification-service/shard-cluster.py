@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Run a sharded verifier cluster on one machine
+
+Starts N verification service processes on consecutive ports. Each has its
+own database directory and all share the same SHARD_NODES ring (see
+sharding.py) and the same SHARD_SECRET (taken from the environment, else
+generated for the run). The script waits until every node is healthy. With --check it
+then asserts that:
+- every generated key state and credential is stored on exactly one node
+  (its owner) and that the other nodes refuse it with 421;
+- every node verifies the Legal Entity credential, by DID and by value, which
+  needs lookups on other shards;
+and stops the cluster, exiting non-zero on failure. Without --check the nodes
+run until interrupted.
+
+Usage: python3 shard-cluster.py [--nodes N] [--base-port PORT]
+                                [--db-root DIR] [--inception-dir DIR] [--check]
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import secrets
+import logging
+import argparse
+import subprocess
+from pathlib import Path
+from urllib.parse import quote
+
+import requests
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_INCEPTION_DIR = SCRIPT_DIR.parent / "gleif-frontend" / "public" / ".well-known" / "keri"
+HEALTH_TIMEOUT_SECONDS = 60
+
+
+def start_nodes(count, base_port, db_root, gleif_aid, secret):
+    """Start count verifier processes sharing the shard secret; returns [(url, process)]"""
+    urls = [f"http://127.0.0.1:{base_port + i}" for i in range(count)]
+    nodes = []
+    for i, url in enumerate(urls):
+        db_dir = db_root / f"shard-{i}"
+        db_dir.mkdir(parents=True, exist_ok=True)
+        env = dict(os.environ)
+        env.update({
+            'PORT': str(base_port + i),
+            'SHARD_NODES': ",".join(urls),
+            'SHARD_SELF': url,
+            'VERIFIER_DB_DIR': str(db_dir),
+            'SHARD_SECRET': secret,
+        })
+        env.setdefault('GLEIF_ROOT_AID', gleif_aid or 'unset')
+        # Nodes would otherwise all bind the same socket path
+        env.pop('VERIFIER_RPC_SOCKET', None)
+        log = open(db_root / f"shard-{i}.log", 'ab')
+        process = subprocess.Popen(
+            [sys.executable, str(SCRIPT_DIR / "app.py")],
+            cwd=str(SCRIPT_DIR), env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        nodes.append((url, process))
+        logger.info(f"Started shard {i} at {url} (pid {process.pid}, db {db_dir})")
+    return nodes
+
+
+def wait_healthy(nodes, timeout=HEALTH_TIMEOUT_SECONDS):
+    """Wait until every node answers /health"""
+    deadline = time.monotonic() + timeout
+    for url, process in nodes:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Node {url} exited with status {process.returncode}")
+            try:
+                if requests.get(f"{url}/health", timeout=1).status_code == 200:
+                    break
+            except requests.RequestException:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Node {url} not healthy after {timeout}s")
+            time.sleep(0.2)
+
+
+def stop_nodes(nodes):
+    for _, process in nodes:
+        if process.poll() is None:
+            process.send_signal(signal.SIGTERM)
+    for _, process in nodes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def check_cluster(nodes, inception_dir, secret):
+    """Run the partition and cross-shard verification checks; returns a list of failures"""
+    failures = []
+    urls = [url for url, _ in nodes]
+    shard_headers = {'X-Shard-Secret': secret}
+
+    habitats = json.loads((inception_dir / "habitats.json").read_text())
+    credentials = [
+        json.loads(path.read_text())
+        for path in (inception_dir / "qvi-credential.json", inception_dir / "legal-entity-credential.json")
+        if path.exists()
+    ]
+    aids = sorted({habitat['aid'] for habitat in habitats.values() if isinstance(habitat, dict) and habitat.get('aid')})
+
+    # Each key must be stored exactly once, on the node the ring assigns it to
+    lookups = [('key-states', aid) for aid in aids] + [('credentials', credential['d']) for credential in credentials]
+    for kind, key in lookups:
+        statuses = [requests.get(f"{url}/shard/{kind}/{quote(key, safe='')}", headers=shard_headers, timeout=5).status_code for url in urls]
+        if sorted(statuses) != [200] + [421] * (len(urls) - 1):
+            failures.append(f"{kind}/{key}: expected one owner, got statuses {statuses}")
+
+    rings = [requests.get(f"{url}/shard/ring", headers=shard_headers, timeout=5).json() for url in urls]
+    for url, ring in zip(urls, rings):
+        logger.info(f"{url}: {ring['stats']['key_states']} key states, {ring['stats']['credentials']} credentials")
+    stored_key_states = sum(ring['stats']['key_states'] for ring in rings)
+    if stored_key_states != len(aids):
+        failures.append(f"{stored_key_states} key states stored across shards, expected {len(aids)}")
+
+    # Every node must verify the Legal Entity credential, wherever its chain lives
+    legal_entity = credentials[-1] if credentials else None
+    did = (legal_entity or {}).get('a', {}).get('alsoKnownAs', [None])[0]
+    for url in urls:
+        if did:
+            response = requests.get(f"{url}/verify/by-did/{did}", timeout=30)
+            if response.status_code != 200 or not response.json().get('verified'):
+                failures.append(f"{url}/verify/by-did: {response.status_code} {response.text[:200]}")
+        if legal_entity:
+            response = requests.post(f"{url}/verify", json={'credential': legal_entity}, timeout=30)
+            if response.status_code != 200 or not response.json().get('verified'):
+                failures.append(f"{url}/verify: {response.status_code} {response.text[:200]}")
+
+    remote_lookups = sum(requests.get(f"{url}/shard/ring", headers=shard_headers, timeout=5).json()['remote_lookups'] for url in urls)
+    logger.info(f"Cross-shard lookups during the checks: {remote_lookups}")
+    if len(urls) > 1 and remote_lookups == 0:
+        failures.append("No lookup was routed to another shard")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a sharded verifier cluster on this machine")
+    parser.add_argument('--nodes', type=int, default=3, help="Number of verifier nodes (default: 3)")
+    parser.add_argument('--base-port', type=int, default=5101, help="Port of the first node (default: 5101)")
+    parser.add_argument('--db-root', default=str(SCRIPT_DIR / "db-shards"),
+                        help="Directory for the per-node databases and logs (default: verification-service/db-shards)")
+    parser.add_argument('--inception-dir', default=str(DEFAULT_INCEPTION_DIR), help="Generated artifact directory")
+    parser.add_argument('--check', action='store_true', help="Run the cluster checks, then stop")
+    args = parser.parse_args()
+
+    inception_dir = Path(args.inception_dir)
+    db_root = Path(args.db_root)
+    db_root.mkdir(parents=True, exist_ok=True)
+
+    gleif_aid = None
+    habitats_path = inception_dir / "habitats.json"
+    if habitats_path.exists():
+        gleif_aid = json.loads(habitats_path.read_text()).get('gleif', {}).get('aid')
+
+    secret = os.getenv('SHARD_SECRET') or secrets.token_hex(32)
+    nodes = start_nodes(args.nodes, args.base_port, db_root, gleif_aid, secret)
+    try:
+        wait_healthy(nodes)
+        logger.info(f"All {len(nodes)} shards healthy")
+        if args.check:
+            failures = check_cluster(nodes, inception_dir, secret)
+            for failure in failures:
+                logger.error(failure)
+            logger.info("Cluster checks passed" if not failures else f"{len(failures)} cluster checks failed")
+            return 0 if not failures else 1
+
+        logger.info("Press Ctrl-C to stop the cluster")
+        while all(process.poll() is None for _, process in nodes):
+            time.sleep(1)
+        logger.error("A shard exited, stopping the cluster")
+        return 1
+    except KeyboardInterrupt:
+        return 0
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 1
+    finally:
+        stop_nodes(nodes)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Consistent-hash sharding for the KERI ACDC Verification Service
+
+With SHARD_NODES set, the trust store is partitioned across verifier nodes.
+Every stored key is placed on a consistent-hash ring with SHARD_VNODES
+virtual nodes per node: AIDs for key states and the subject/issuer indexes,
+DIDs for the alsoKnownAs index and SAIDs for credentials. A node only stores
+the keys it owns. All nodes seed from the same artifacts and each keeps its own
+partition, so adding or removing a node only moves the keys on the ring
+segments it gains or loses (about 1/N of them).
+
+ShardedTrustStore offers the TrustStore read interface. Keys owned by this
+node are read from the local store. Other keys are fetched from the owning
+node's /shard endpoints through a pooled HTTP client (ShardClient). The /shard
+endpoints only answer from the local store, so a lookup is at most one hop.
+They serve the partition to other nodes only: every request must carry the
+cluster's shared secret (SHARD_SECRET) in the X-Shard-Secret header.
+
+Configuration:
+- SHARD_NODES: comma-separated base URLs of all verifier nodes, including this one (disabled when unset)
+- SHARD_SELF: this node's base URL exactly as listed in SHARD_NODES
+- SHARD_SECRET: shared secret the nodes send to each other's /shard endpoints (required with SHARD_NODES)
+- SHARD_VNODES: virtual nodes per node on the hash ring (default: 128)
+- SHARD_TIMEOUT_SECONDS: timeout for lookups on other nodes (default: 2)
+- SHARD_POOL_SIZE: pooled connections per node (default: 32)
+"""
+
+import os
+import hmac
+import json
+import bisect
+import hashlib
+import logging
+import threading
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+SHARD_NODES = [node.strip().rstrip('/') for node in os.getenv('SHARD_NODES', '').split(',') if node.strip()]
+SHARD_SELF = os.getenv('SHARD_SELF', '').rstrip('/')
+SHARD_SECRET = os.getenv('SHARD_SECRET')
+SHARD_VNODES = int(os.getenv('SHARD_VNODES', 128))
+SHARD_TIMEOUT_SECONDS = float(os.getenv('SHARD_TIMEOUT_SECONDS', 2))
+SHARD_POOL_SIZE = int(os.getenv('SHARD_POOL_SIZE', 32))
+
+# Index name -> what its keys are, for the /shard/ring description
+INDEX_KEYS = {'dids': 'DID', 'subjects': 'AID', 'issuers': 'AID'}
+
+SECRET_HEADER = 'X-Shard-Secret'
+
+
+class ShardError(Exception):
+    """Raised when the node owning a key cannot be reached or answers with an error"""
+
+
+def _hash(value):
+    """64-bit position of a string on the ring"""
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Consistent-hash ring mapping keys to nodes"""
+
+    def __init__(self, nodes, vnodes=SHARD_VNODES):
+        self.nodes = sorted(set(nodes))
+        if not self.nodes:
+            raise ValueError("A hash ring needs at least one node")
+        self.vnodes = vnodes
+
+        points = sorted((_hash(f"{node}#{replica}"), node) for node in self.nodes for replica in range(vnodes))
+        self._positions = [position for position, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key):
+        """Return the node owning key (the first virtual node clockwise from its hash)"""
+        index = bisect.bisect(self._positions, _hash(key))
+        return self._owners[index % len(self._owners)]
+
+
+def authorized(token):
+    """Check a caller-supplied X-Shard-Secret against the cluster's shared secret"""
+    if not SHARD_SECRET or not token:
+        return False
+    return hmac.compare_digest(token.encode(), SHARD_SECRET.encode())
+
+
+class ShardClient:
+    """Pooled HTTP client for the /shard endpoints of other nodes"""
+
+    def __init__(self, timeout=SHARD_TIMEOUT_SECONDS, pool_size=SHARD_POOL_SIZE, secret=None):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(1, len(SHARD_NODES)), pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers[SECRET_HEADER] = secret or SHARD_SECRET or ''
+        # Lookups run on many request threads at once
+        self._counter_lock = threading.Lock()
+        self.lookups = 0
+        self.errors = 0
+
+    def _count(self, counter):
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, node, path):
+        """GET node/shard/path; returns the response body, or None for 404"""
+        self._count('lookups')
+        try:
+            response = self.session.get(f"{node}/shard/{path}", timeout=self.timeout)
+        except requests.RequestException as e:
+            self._count('errors')
+            raise ShardError(f"Shard {node} unreachable: {str(e)}") from e
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            self._count('errors')
+            raise ShardError(f"Shard {node} answered {response.status_code} for {path}")
+        return response.content
+
+
+class ShardedTrustStore:
+    """
+    TrustStore read interface over all shards
+
+    Reads for keys this node owns go to the local store; all other attributes
+    (writer, put_*, meta, stats, snapshot) are the local store's.
+    """
+
+    def __init__(self, local, ring, self_node, client=None):
+        self.local = local
+        self.ring = ring
+        self.self_node = self_node
+        self.client = client or ShardClient()
+
+    def __getattr__(self, name):
+        return getattr(self.local, name)
+
+    def owns(self, key):
+        return self.ring.node_for(key) == self.self_node
+
+    def _fetch(self, key, path):
+        return self.client.get(self.ring.node_for(key), path)
+
+    def has_key_state(self, aid):
+        """Return True if key state is known for the AID"""
+        if self.owns(aid):
+            return self.local.has_key_state(aid)
+        return self.get_key_state(aid) is not None
+
+    def get_key_state(self, aid, txn=None):
+        """Return {'s': sn, 'k': [qb64 keys]} for the AID, or None"""
+        if txn is not None or self.owns(aid):
+            return self.local.get_key_state(aid, txn)
+        raw = self._fetch(aid, f"key-states/{quote(aid, safe='')}")
+        return json.loads(raw) if raw is not None else None
+
+    def get_credential_raw(self, said):
+        """Return the stored credential serialization as bytes, or None"""
+        if self.owns(said):
+            return self.local.get_credential_raw(said)
+        return self._fetch(said, f"credentials/{quote(said, safe='')}")
+
+    def get_credential(self, said):
+        """Return the stored credential as a dict, or None"""
+        raw = self.get_credential_raw(said)
+        return json.loads(raw) if raw is not None else None
+
+    def has_credential(self, said):
+        """Return True if a credential with the SAID is stored"""
+        if self.owns(said):
+            return self.local.has_credential(said)
+        return self.get_credential_raw(said) is not None
+
+    def lookup(self, index, key):
+        """Return the credential SAIDs stored under key in a named index ('dids', 'subjects', 'issuers')"""
+        if self.owns(key):
+            return self.local.lookup(index, key)
+        raw = self._fetch(key, f"indexes/{index}/{quote(key, safe='')}")
+        return json.loads(raw) if raw is not None else []
+
+    def describe(self):
+        """Ring membership and this node's partition, for /shard/ring"""
+        return {
+            'self': self.self_node,
+            'nodes': self.ring.nodes,
+            'vnodes': self.ring.vnodes,
+            'index_keys': INDEX_KEYS,
+            'stats': self.local.stats(),
+            'remote_lookups': self.client.lookups,
+            'remote_errors': self.client.errors,
+        }
+
+
+# The ring for this process (None when sharding is disabled)
+ring = None
+if SHARD_NODES:
+    ring = HashRing(SHARD_NODES, SHARD_VNODES)
+    if SHARD_SELF not in ring.nodes:
+        raise ValueError(f"SHARD_SELF ({SHARD_SELF or 'unset'}) must be one of SHARD_NODES")
+    if not SHARD_SECRET:
+        raise ValueError("SHARD_SECRET must be set with SHARD_NODES")
+
+
+def partition():
+    """This node's place on the ring (None when sharding is disabled); a seeded partition is only valid for it"""
+    if ring is None:
+        return None
+    return {'self': SHARD_SELF, 'nodes': ring.nodes, 'vnodes': ring.vnodes}
+
+
+def owns(key):
+    """Return True if this node stores key (always True when sharding is disabled)"""
+    return ring is None or ring.node_for(key) == SHARD_SELF
+
+
+def shard_store(local):
+    """Wrap a local TrustStore or SnapshotStore for sharded reads (unchanged when sharding is disabled)"""
+    if ring is None:
+        return local
+    return ShardedTrustStore(local, ring, SHARD_SELF)
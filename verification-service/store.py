@@ -0,0 +1,356 @@
+"""
+Shared LMDB trust store for the KERI ACDC Verification Service
+
+Key state, credentials and credential indexes live in named sub-databases of
+the verifier Baser's LMDB environment, so each process opens exactly one
+environment for trust data (the Habery reuses the same Baser). Reads borrow a
+read-only transaction from a bounded pool (LMDB_READER_POOL_SIZE) and return
+it afterwards, so threads that come and go (one per Flask request) reuse
+transactions instead of opening one per lookup, and an idle thread holds
+none. A pooled transaction is only reused while it is current: every commit
+through writer() bumps a write generation, and transactions opened before it
+are discarded. Commits from other processes (e.g. seed-verifier-db.py) become
+visible once pooled transactions reach LMDB_READER_MAX_AGE_SECONDS, which also
+bounds how long a pooled transaction pins an old snapshot. Values are returned
+as memoryviews inside the transaction and decoded only when the caller needs
+them.
+
+In sharded mode (see sharding.py) a TrustStore is given an owns(key)
+predicate and only stores the key states, credentials and index entries whose
+keys this node owns; writes for other keys are dropped.
+
+SnapshotStore is a read-only, in-memory copy of a TrustStore with the same
+lookup interface, for worker processes that verify without opening LMDB.
+
+Configuration:
+- LMDB_MAP_SIZE: LMDB map size in bytes (default: 1 GiB)
+- LMDB_READER_POOL_SIZE: idle read transactions kept for reuse (default: 16)
+- LMDB_READER_MAX_AGE_SECONDS: age after which a read transaction is not reused (default: 1)
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+LMDB_MAP_SIZE = int(os.getenv('LMDB_MAP_SIZE', 1 << 30))
+LMDB_READER_POOL_SIZE = int(os.getenv('LMDB_READER_POOL_SIZE', 16))
+LMDB_READER_MAX_AGE_SECONDS = float(os.getenv('LMDB_READER_MAX_AGE_SECONDS', 1.0))
+
+# Named sub-databases (trailing '.' follows the keripy naming convention)
+KEY_STATES_DB = b'vkst.'
+CREDENTIALS_DB = b'vcrd.'
+DIDS_INDEX_DB = b'vdid.'
+SUBJECTS_INDEX_DB = b'vsub.'
+ISSUERS_INDEX_DB = b'viss.'
+META_DB = b'vmta.'
+
+
+def _attributes(credential):
+    return credential.get('a') if isinstance(credential.get('a'), dict) else {}
+
+
+def credential_subject(credential):
+    """Subject AID of a credential: a.i or a.issuee, else the top-level 'i' used by the generated PoC credentials"""
+    attributes = _attributes(credential)
+    return attributes.get('i') or attributes.get('issuee') or credential.get('i')
+
+
+def credential_issuer(credential):
+    """
+    Issuer AID of a credential, or None if it does not name one
+
+    a.issuer when present (generated PoC credentials), else the top-level 'i'
+    when the subject is in a.i / a.issuee (vLEI layout, where 'i' is the
+    issuer). A credential whose only AID is the top-level 'i' names no issuer.
+    """
+    attributes = _attributes(credential)
+    if attributes.get('issuer'):
+        return attributes['issuer']
+    if attributes.get('i') or attributes.get('issuee'):
+        return credential.get('i')
+    return None
+
+
+def _compact(value):
+    """Serialize a value as compact JSON bytes"""
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+class TrustStore:
+    """Key state, credentials and indexes in named sub-databases of one LMDB environment"""
+
+    def __init__(self, env, map_size=LMDB_MAP_SIZE, owns=None):
+        self.env = env
+        self.owns = owns
+        if map_size and env.info()['map_size'] < map_size:
+            env.set_mapsize(map_size)
+
+        self.key_states = env.open_db(KEY_STATES_DB)
+        self.credentials = env.open_db(CREDENTIALS_DB)
+        self.indexes = {
+            'dids': env.open_db(DIDS_INDEX_DB, dupsort=True),
+            'subjects': env.open_db(SUBJECTS_INDEX_DB, dupsort=True),
+            'issuers': env.open_db(ISSUERS_INDEX_DB, dupsort=True),
+        }
+        self.meta = env.open_db(META_DB)
+        self._local = threading.local()
+        # Idle read transactions: [(txn, write generation, opened at)], most recently used last
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._write_generation = 0
+
+    def _borrow_reader(self):
+        """A current pooled read transaction, or a new one"""
+        oldest = time.monotonic() - LMDB_READER_MAX_AGE_SECONDS
+        stale = []
+        with self._readers_lock:
+            while self._readers:
+                entry = self._readers.pop()
+                if entry[1] == self._write_generation and entry[2] >= oldest:
+                    break
+                stale.append(entry[0])
+            else:
+                entry = None
+        for txn in stale:
+            txn.abort()
+        if entry is None:
+            entry = (self.env.begin(buffers=True), self._write_generation, time.monotonic())
+        return entry
+
+    def _return_reader(self, entry):
+        with self._readers_lock:
+            if len(self._readers) < LMDB_READER_POOL_SIZE and entry[1] == self._write_generation:
+                self._readers.append(entry)
+                return
+        entry[0].abort()
+
+    @contextmanager
+    def reader(self):
+        """Yield a pooled read-only transaction (buffers are zero-copy memoryviews); nested calls share it"""
+        local = self._local
+        txn = getattr(local, 'txn', None)
+        if txn is not None:
+            yield txn
+            return
+        entry = self._borrow_reader()
+        local.txn = entry[0]
+        try:
+            yield entry[0]
+        finally:
+            local.txn = None
+            self._return_reader(entry)
+
+    @contextmanager
+    def writer(self):
+        """Yield a write transaction; everything written inside commits together"""
+        with self.env.begin(write=True) as txn:
+            yield txn
+        # Read transactions opened before this commit no longer see the latest data
+        with self._readers_lock:
+            self._write_generation += 1
+
+    def _owned(self, key):
+        return self.owns is None or self.owns(key)
+
+    # Key state
+
+    def put_key_state(self, aid, keys, sn="0", txn=None):
+        """Store the current signing keys (qb64) for an AID"""
+        if not self._owned(aid):
+            return
+        value = _compact({'s': sn, 'k': list(keys)})
+        if txn is None:
+            with self.writer() as txn:
+                txn.put(aid.encode(), value, db=self.key_states)
+        else:
+            txn.put(aid.encode(), value, db=self.key_states)
+
+    def has_key_state(self, aid):
+        """Return True if key state is known for the AID"""
+        with self.reader() as txn:
+            return txn.get(aid.encode(), db=self.key_states) is not None
+
+    def get_key_state(self, aid, txn=None):
+        """Return {'s': sn, 'k': [qb64 keys]} for the AID, or None (optionally inside a write txn)"""
+        if txn is not None:
+            value = txn.get(aid.encode(), db=self.key_states)
+            return json.loads(bytes(value)) if value is not None else None
+        with self.reader() as txn:
+            value = txn.get(aid.encode(), db=self.key_states)
+            return json.loads(bytes(value)) if value is not None else None
+
+    # Credentials
+
+    def put_credential(self, credential, raw=None, txn=None):
+        """Store a credential by SAID and index it by subject, issuer and alsoKnownAs DIDs"""
+        said = credential['d']
+        if txn is None:
+            with self.writer() as txn:
+                self._put_credential(txn, said, credential, raw)
+        else:
+            self._put_credential(txn, said, credential, raw)
+        return said
+
+    def _put_credential(self, txn, said, credential, raw):
+        key = said.encode()
+        if self._owned(said):
+            txn.put(key, raw if raw is not None else _compact(credential), db=self.credentials)
+
+        attributes = _attributes(credential)
+        subject, issuer = credential_subject(credential), credential_issuer(credential)
+        if subject and self._owned(subject):
+            txn.put(subject.encode(), key, db=self.indexes['subjects'], dupdata=False)
+        if issuer and self._owned(issuer):
+            txn.put(issuer.encode(), key, db=self.indexes['issuers'], dupdata=False)
+        also_known_as = attributes.get('alsoKnownAs')
+        if isinstance(also_known_as, list):
+            for did in also_known_as:
+                if self._owned(did):
+                    txn.put(did.encode(), key, db=self.indexes['dids'], dupdata=False)
+
+    def get_credential_raw(self, said):
+        """Return the stored credential serialization as bytes, or None"""
+        with self.reader() as txn:
+            value = txn.get(said.encode(), db=self.credentials)
+            return bytes(value) if value is not None else None
+
+    def get_credential(self, said):
+        """Return the stored credential as a dict, or None"""
+        raw = self.get_credential_raw(said)
+        return json.loads(raw) if raw is not None else None
+
+    def has_credential(self, said):
+        """Return True if a credential with the SAID is stored"""
+        with self.reader() as txn:
+            return txn.get(said.encode(), db=self.credentials) is not None
+
+    def lookup(self, index, key):
+        """Return the credential SAIDs stored under key in a named index ('dids', 'subjects', 'issuers')"""
+        db = self.indexes[index]
+        with self.reader() as txn:
+            cursor = txn.cursor(db=db)
+            if not cursor.set_key(key.encode()):
+                return []
+            return [bytes(value).decode() for value in cursor.iternext_dup()]
+
+    # Removal (seed-verifier-db.py, when the artifacts that wrote a record are gone)
+
+    def delete_key_states(self, aids, txn):
+        """Delete the key states of the given AIDs"""
+        for aid in aids:
+            txn.delete(aid.encode(), db=self.key_states)
+
+    def delete_credentials(self, saids, txn):
+        """Delete credentials by SAID together with every index entry pointing at them"""
+        targets = {said.encode() for said in saids}
+        if not targets:
+            return
+        for key in targets:
+            txn.delete(key, db=self.credentials)
+        # Index keys (subject, issuer, DIDs) are not known without the credential, which may be stored
+        # on another shard, so each index is scanned once for all targets
+        for db in self.indexes.values():
+            entries = [(bytes(key), bytes(value)) for key, value in txn.cursor(db=db) if bytes(value) in targets]
+            for key, value in entries:
+                txn.delete(key, value, db=db)
+
+    def clear(self):
+        """Delete every key state, credential and index entry (metadata is kept)"""
+        with self.writer() as txn:
+            for db in (self.key_states, self.credentials, *self.indexes.values()):
+                txn.drop(db, delete=False)
+
+    # Metadata
+
+    def get_meta(self, name):
+        """Return a JSON metadata value, or None"""
+        with self.reader() as txn:
+            value = txn.get(name.encode(), db=self.meta)
+            return json.loads(bytes(value)) if value is not None else None
+
+    def put_meta(self, name, value, txn=None):
+        """Store a JSON metadata value"""
+        if txn is None:
+            with self.writer() as txn:
+                txn.put(name.encode(), _compact(value), db=self.meta)
+        else:
+            txn.put(name.encode(), _compact(value), db=self.meta)
+
+    def snapshot(self):
+        """Copy key states, credentials and indexes into plain dicts (values stay raw JSON bytes)"""
+        with self.reader() as txn:
+            key_states = {bytes(key).decode(): bytes(value) for key, value in txn.cursor(db=self.key_states)}
+            credentials = {bytes(key).decode(): bytes(value) for key, value in txn.cursor(db=self.credentials)}
+            indexes = {}
+            for name, db in self.indexes.items():
+                index = {}
+                for key, value in txn.cursor(db=db):
+                    index.setdefault(bytes(key).decode(), []).append(bytes(value).decode())
+                indexes[name] = index
+        return {'key_states': key_states, 'credentials': credentials, 'indexes': indexes}
+
+    def stats(self):
+        """Entry counts per sub-database"""
+        with self.reader() as txn:
+            counts = {
+                'key_states': txn.stat(self.key_states)['entries'],
+                'credentials': txn.stat(self.credentials)['entries'],
+            }
+            for name, db in self.indexes.items():
+                counts[f'{name}_index'] = txn.stat(db)['entries']
+        counts['map_size'] = self.env.info()['map_size']
+        return counts
+
+
+class SnapshotStore:
+    """Read-only, in-memory TrustStore built from TrustStore.snapshot()"""
+
+    def __init__(self, snapshot):
+        self.key_states = snapshot['key_states']
+        self.credentials = snapshot['credentials']
+        self.indexes = snapshot['indexes']
+
+    def has_key_state(self, aid):
+        """Return True if key state is known for the AID"""
+        return aid in self.key_states
+
+    def get_key_state(self, aid, txn=None):
+        """Return {'s': sn, 'k': [qb64 keys]} for the AID, or None"""
+        value = self.key_states.get(aid)
+        return json.loads(value) if value is not None else None
+
+    def get_credential_raw(self, said):
+        """Return the stored credential serialization as bytes, or None"""
+        return self.credentials.get(said)
+
+    def get_credential(self, said):
+        """Return the stored credential as a dict, or None"""
+        raw = self.credentials.get(said)
+        return json.loads(raw) if raw is not None else None
+
+    def has_credential(self, said):
+        """Return True if a credential with the SAID is stored"""
+        return said in self.credentials
+
+    def lookup(self, index, key):
+        """Return the credential SAIDs stored under key in a named index ('dids', 'subjects', 'issuers')"""
+        return list(self.indexes[index].get(key, ()))
+
+    def stats(self):
+        """Entry counts"""
+        counts = {'key_states': len(self.key_states), 'credentials': len(self.credentials)}
+        for name, index in self.indexes.items():
+            counts[f'{name}_index'] = sum(len(saids) for saids in index.values())
+        return counts
+
+
+def open_trust_store(baser, map_size=LMDB_MAP_SIZE, owns=None):
+    """Open the trust store on an already opened keripy Baser (owns restricts it to one shard)"""
+    trust_store = TrustStore(baser.env, map_size, owns)
+    logger.info(f"Opened trust store on {baser.path} (map size {trust_store.env.info()['map_size']} bytes)")
+    return trust_store
@@ -0,0 +1,125 @@
+"""
+Shared fixtures for the verification service tests
+
+app.py configures itself from the environment at import time, so the
+environment is set here before any test module imports it: a temporary
+database directory, a placeholder GLEIF root (tests install their own) and no
+checkpoints, RPC socket or worker processes.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+from pathlib import Path
+
+import lmdb
+import pytest
+from keri.core import coring, serdering
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+SCHEMA_SAID = "EAbggvtjgJoWAlrlJHupavNwjK0JLK-WdFVWvgzNtbiW"
+sys.path.insert(0, str(SERVICE_DIR))
+
+os.environ['VERIFIER_DB_DIR'] = tempfile.mkdtemp(prefix="verifier-tests-")
+os.environ.setdefault('GLEIF_ROOT_AID', 'EPlaceholderGleifRootAidForTests0000000000000')
+os.environ['CHECKPOINT_ENABLED'] = 'false'
+os.environ.pop('VERIFIER_RPC_SOCKET', None)
+os.environ.pop('VERIFY_WORKER_PROCESSES', None)
+os.environ.pop('CAPTURE_DIR', None)
+
+
+@pytest.fixture
+def trust_store(tmp_path):
+    """An empty TrustStore on its own LMDB environment"""
+    from store import TrustStore
+
+    env = lmdb.open(str(tmp_path / "trust"), max_dbs=16, map_size=1 << 24)
+    yield TrustStore(env, map_size=0)
+    env.close()
+
+
+@pytest.fixture
+def verifier(trust_store, monkeypatch):
+    """app.py with its trust state replaced by trust_store and no seeded habitats"""
+    import app
+
+    monkeypatch.setattr(app, 'trust_store', trust_store)
+    monkeypatch.setattr(app, 'trust_habitats', {})
+    monkeypatch.setattr(app, '_chain_cache', {})
+    monkeypatch.setattr(app, '_status_cache', {})
+    return app
+
+
+def make_aid(name):
+    """(AID, signer) for a test identifier"""
+    signer = coring.Signer(transferable=True)
+    return coring.Diger(ser=name.encode()).qb64, signer
+
+
+def make_credential(issuer, issuee, edges=None, **attributes):
+    """SAIDified vLEI-layout credential issued by issuer to issuee"""
+    sad = {
+        'v': 'ACDC10JSON000000_',
+        'd': '',
+        'i': issuer,
+        's': SCHEMA_SAID,
+        'a': {'i': issuee, **attributes},
+    }
+    if edges:
+        sad['e'] = {name: {'n': parent['d'], 's': SCHEMA_SAID} for name, parent in edges.items()}
+    serder = serdering.SerderACDC(sad=sad, makify=True)
+    return serder.sad, serder
+
+
+@pytest.fixture
+def ecr_chain(verifier, trust_store, monkeypatch):
+    """
+    GLEIF -> QVI -> LE -> ECR, chained through e.qvi.n and e.le.n
+
+    The QVI and LE credentials and the key states are stored; returns the ECR
+    credential, its serder, the LE signer and the AIDs by role.
+    """
+    gleif, gleif_signer = make_aid('gleif')
+    qvi, qvi_signer = make_aid('qvi')
+    le, le_signer = make_aid('legal-entity')
+    person, _ = make_aid('person')
+    monkeypatch.setattr(verifier, 'GLEIF_ROOT_AID', gleif)
+
+    qvi_credential, _ = make_credential(gleif, qvi, LEI="5493001KJTIIGC8Y1R12")
+    le_credential, _ = make_credential(qvi, le, edges={'qvi': qvi_credential}, LEI="984500E5DEFDBQ1O9038")
+    ecr_credential, ecr_serder = make_credential(le, person, edges={'le': le_credential}, engagementContextRole="Director")
+
+    for aid, signer in ((gleif, gleif_signer), (qvi, qvi_signer), (le, le_signer)):
+        trust_store.put_key_state(aid, [signer.verfer.qb64])
+    for credential in (qvi_credential, le_credential):
+        credential['p'] = {'d': 'placeholder'}
+        trust_store.put_credential(credential)
+    return ecr_credential, ecr_serder, le_signer, {'gleif': gleif, 'qvi': qvi, 'le': le, 'person': person}
+
+
+async def asgi_send(method, path, body=b'', headers=(), chunk_size=None):
+    """Send one request to asgi.app on the running event loop, returning (status, headers, body)"""
+    import asgi
+
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] if chunk_size else [body]
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': index < len(chunks) - 1}
+                for index, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+             'headers': [(name.encode(), value.encode()) for name, value in headers]}
+    await asgi.app(scope, receive, send)
+    response_headers = {name.decode(): value.decode() for name, value in sent[0]['headers']}
+    return sent[0]['status'], response_headers, sent[1]['body']
+
+
+def asgi_request(*args, **kwargs):
+    """Run one request through asgi.app (see asgi_send)"""
+    return asyncio.run(asgi_send(*args, **kwargs))
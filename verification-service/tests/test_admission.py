@@ -0,0 +1,154 @@
+"""Admission control: queue deadlines, slot release and separate batch slots"""
+
+import time
+import asyncio
+import threading
+
+import pytest
+
+import asgi
+import admission
+from admission import AdmissionController, AsyncAdmissionController
+from conftest import asgi_request, asgi_send
+
+
+@pytest.fixture
+def saturated(monkeypatch):
+    """Occupy every slot of a controller with a short queue deadline; slots are released afterwards"""
+    held = []
+
+    def saturate(controller, queue_timeout_ms=50):
+        monkeypatch.setattr(controller, 'queue_timeout', queue_timeout_ms / 1000)
+        for _ in range(controller.max_concurrency):
+            assert controller.acquire()
+            held.append(controller)
+
+    yield saturate
+    for controller in held:
+        controller.release()
+
+
+def slots_free(controller):
+    """True if every slot can be taken (and gives them back)"""
+    taken = 0
+    try:
+        while taken < controller.max_concurrency and controller._slots.acquire(blocking=False):
+            taken += 1
+        return taken == controller.max_concurrency and controller.in_flight == 0
+    finally:
+        for _ in range(taken):
+            controller._slots.release()
+
+
+def test_waiting_request_is_admitted_when_a_slot_frees():
+    controller = AdmissionController('test', 1, 1, 1000, 1)
+    assert controller.acquire()
+    threading.Timer(0.05, controller.release).start()
+
+    assert controller.acquire()
+    assert controller.snapshot()['admitted_total'] == 2
+
+
+def test_queue_timeout_and_full_queue_are_shed():
+    controller = AdmissionController('test', 1, 1, 50, 1)
+    assert controller.acquire()
+    waiter = threading.Thread(target=controller.acquire)
+    waiter.start()
+    time.sleep(0.01)
+
+    # The queue holds one waiter: a second one is shed at once
+    start = time.perf_counter()
+    assert not controller.acquire()
+    assert time.perf_counter() - start < 0.04
+    waiter.join()
+
+    snap = controller.snapshot()
+    assert (snap['shed_queue_full_total'], snap['shed_timeout_total'], snap['queue_depth']) == (1, 1, 0)
+
+
+def test_flask_queue_timeout_is_503_with_retry_after(verifier, saturated):
+    saturated(admission.verify_admission)
+
+    response = verifier.app.test_client().post('/verify', json={})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(admission.verify_admission.retry_after_seconds)
+
+
+def test_flask_slot_is_released_when_the_handler_raises(verifier, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("verification crashed")
+
+    monkeypatch.setattr(verifier, 'verify_credential_request', broken)
+
+    assert verifier.app.test_client().post('/verify', json={}).status_code == 500
+    assert slots_free(admission.verify_admission)
+
+
+def test_rpc_slot_is_released_when_the_handler_raises(verifier):
+    def broken(payload):
+        raise RuntimeError("verification crashed")
+
+    handler = verifier.rpc_handler('/verify', broken)
+
+    with pytest.raises(RuntimeError):
+        handler(b'{}')
+    assert slots_free(admission.verify_admission)
+
+
+def test_asgi_slot_is_released_when_the_handler_raises(verifier, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("verification crashed")
+
+    monkeypatch.setattr(verifier, 'verify_credential_request', broken)
+    monkeypatch.setattr(asgi, 'verify_admission', AsyncAdmissionController('verify', 1, 0, 50, 1))
+
+    for _ in range(3):
+        status, _, body = asgi_request('POST', '/verify', b'{}', headers=[('content-type', 'application/json')])
+        assert status == 500, body
+    assert asgi.verify_admission.in_flight == 0
+
+
+def test_batches_do_not_take_single_verification_slots(verifier, saturated):
+    saturated(admission.batch_admission)
+    client = verifier.app.test_client()
+
+    shed = client.post('/verify/batch', json={'credentials': []})
+    single = client.post('/verify', json={})
+
+    assert shed.status_code == 503 and 'Retry-After' in shed.headers
+    assert single.status_code != 503
+
+
+def test_single_verifications_do_not_take_batch_slots(verifier, saturated):
+    saturated(admission.verify_admission)
+
+    assert verifier.app.test_client().post('/verify/batch', json={'credentials': []}).status_code != 503
+
+
+def test_asgi_batches_have_their_own_slots(verifier, monkeypatch):
+    monkeypatch.setattr(asgi, 'verify_admission', AsyncAdmissionController('verify', 1, 0, 50, 1))
+
+    async def saturated_single():
+        assert await asgi.verify_admission.acquire()
+        try:
+            return await asyncio.gather(*(
+                asgi_send('POST', path, body, headers=[('content-type', 'application/json')])
+                for path, body in (('/verify', b'{}'), ('/verify/batch', b'{"credentials":[]}'))
+            ))
+        finally:
+            asgi.verify_admission.release()
+
+    (single, _, _), (batch, _, _) = asyncio.run(saturated_single())
+
+    assert single == 503
+    assert batch != 503
+
+
+def test_metrics_report_both_queues(verifier):
+    text = verifier.app.test_client().get('/metrics').get_data(as_text=True)
+
+    assert 'verifier_admission_in_flight{endpoint="verify"}' in text
+    assert 'verifier_admission_in_flight{endpoint="verify_batch"}' in text
+    # One HELP line per metric family, whatever the number of controllers
+    assert text.count('# HELP verifier_admission_in_flight ') == 1
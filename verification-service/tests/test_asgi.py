@@ -0,0 +1,123 @@
+"""ASGI serving mode"""
+
+import os
+import json
+import time
+import asyncio
+import importlib
+
+import pytest
+
+import asgi
+from admission import AsyncAdmissionController
+from conftest import asgi_request as call, asgi_send
+
+
+def metric_names(text):
+    return {line.split()[2] for line in text.splitlines() if line.startswith('# HELP')}
+
+
+def test_metrics_match_the_flask_endpoint(verifier, monkeypatch):
+    monkeypatch.setattr(verifier, 'startup_timings', {'seed': 0.25, 'habitat': 0.5})
+
+    status, headers, body = call('GET', '/metrics')
+    flask_text = verifier.app.test_client().get('/metrics').get_data(as_text=True)
+
+    assert status == 200 and headers['content-type'].startswith('text/plain')
+    asgi_text = body.decode()
+    assert metric_names(asgi_text) == metric_names(flask_text)
+    assert 'verifier_startup_phase_seconds{phase="habitat"} 0.500000' in asgi_text
+    assert 'verifier_domain_linkage_fetches_total{cache="fresh"}' in asgi_text
+    assert f'verifier_trust_generation {verifier.trust_generation}' in asgi_text
+
+
+def test_verify(ecr_chain):
+    credential = dict(ecr_chain[0], p={'d': 'placeholder'})
+
+    status, headers, body = call('POST', '/verify', json.dumps({'credential': credential}).encode(),
+                                 headers=[('content-type', 'application/json'), ('x-trace-id', 'a' * 32)])
+
+    assert status == 200, body
+    assert json.loads(body)['verified'] is True
+    assert headers['x-trace-id'] == 'a' * 32
+
+
+def test_chunked_body_is_reassembled(ecr_chain):
+    body = json.dumps({'credential': dict(ecr_chain[0], p={'d': 'placeholder'})}).encode()
+
+    status, _, _ = call('POST', '/verify', body, headers=[('content-type', 'application/json')], chunk_size=64)
+
+    assert status == 200
+
+
+def test_oversized_body_is_rejected(verifier, monkeypatch):
+    monkeypatch.setattr(asgi, 'ASGI_MAX_BODY_BYTES', 100)
+
+    status, _, body = call('POST', '/verify', b'{' + b' ' * 200 + b'}',
+                           headers=[('content-type', 'application/json')], chunk_size=50)
+
+    assert status == 413
+    assert json.loads(body)['error'] == "Request body exceeds 100 bytes"
+
+
+@pytest.mark.parametrize('method, path, status', [
+    ('GET', '/health', 200),
+    ('GET', '/nowhere', 404),
+    ('GET', '/verify', 404),
+    ('GET', '/credentials//status', 404),
+])
+def test_routing(verifier, method, path, status):
+    assert call(method, path)[0] == status
+
+
+def test_malformed_body_is_a_client_error(verifier):
+    status, _, body = call('POST', '/verify', b'not json', headers=[('content-type', 'application/json')])
+
+    assert status == 400
+    assert json.loads(body)['success'] is False
+
+
+@pytest.fixture
+def reload_asgi(monkeypatch):
+    """Re-import asgi.py under the given environment (restored afterwards)"""
+    def reload(**environment):
+        for name, value in environment.items():
+            monkeypatch.setenv(name, value)
+        return importlib.reload(asgi)
+
+    yield reload
+    monkeypatch.undo()
+    importlib.reload(asgi)
+
+
+def test_admission_defaults_to_the_executor_size(reload_asgi):
+    module = reload_asgi(VERIFY_EXECUTOR_WORKERS='3')
+    assert module.verify_admission.max_concurrency == 3
+
+
+def test_admission_never_exceeds_the_executor_size(reload_asgi):
+    module = reload_asgi(VERIFY_EXECUTOR_WORKERS='2', ASGI_MAX_CONCURRENCY='1024')
+    assert module.verify_admission.max_concurrency == 2
+
+
+def test_requests_beyond_the_executor_are_shed_fast(verifier, monkeypatch):
+    monkeypatch.setattr(asgi, 'verify_admission', AsyncAdmissionController('verify', 1, 1, 100, 1))
+
+    def slow(*args, refresh=True):
+        time.sleep(0.5)
+        return {'success': True}, 200
+
+    monkeypatch.setattr(verifier, 'verify_credential_request', slow)
+
+    async def burst():
+        async def timed():
+            start = time.perf_counter()
+            status, headers, _ = await asgi_send('POST', '/verify', b'{}', headers=[('content-type', 'application/json')])
+            return status, headers.get('retry-after'), time.perf_counter() - start
+        return await asyncio.gather(*[timed() for _ in range(3)])
+
+    results = sorted(asyncio.run(burst()))
+
+    assert [status for status, _, _ in results] == [200, 503, 503]
+    # Queue full at once, queue wait timed out after 100 ms: both well before the admitted request finished
+    assert all(retry_after == '1' and elapsed < 0.4 for status, retry_after, elapsed in results if status == 503)
@@ -0,0 +1,110 @@
+"""Trust bundle: layout round trip, stale and broken bundles, and what the generator puts in it"""
+
+import os
+import json
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import bundle
+from conftest import SERVICE_DIR, make_aid, make_credential
+
+GENERATE_SCRIPT = SERVICE_DIR.parent / "did-management" / "generate-credentials.py"
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    """An artifact directory with one key event, one credential and a bundle written after them"""
+    directory = tmp_path / "keri"
+    (directory / "icp").mkdir(parents=True)
+    aid, signer = make_aid('issuer')
+    event = {'v': 'KERI10JSON000000_', 't': 'icp', 'd': aid, 'i': aid, 's': "0", 'k': [signer.verfer.qb64]}
+    credential, _ = make_credential(aid, make_aid('holder')[0], LEI="5493001KJTIIGC8Y1R12")
+    credential['p'] = {'d': 'placeholder'}
+    (directory / "icp" / aid).write_text(json.dumps(event))
+    (directory / "qvi-credential.json").write_text(json.dumps(credential))
+
+    path = directory / bundle.BUNDLE_NAME
+    bundle.write_trust_bundle(path, [event], [credential], {'habitats': {'qvi': {'aid': aid}}})
+    return directory, path, event, credential
+
+
+def age(path, seconds):
+    """Move a file's modification time into the past"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - int(seconds * 1e9)))
+
+
+def test_round_trip(artifacts):
+    directory, _, event, credential = artifacts
+
+    with bundle.open_bundle(directory) as trust_bundle:
+        assert len(trust_bundle) == 3
+        assert trust_bundle.get(bundle.KIND_KEY_EVENT, event['i']) == event
+        assert json.loads(bytes(trust_bundle.raw(bundle.KIND_CREDENTIAL, credential['d']))) == credential
+        assert trust_bundle.get(bundle.KIND_META, 'habitats') == {'qvi': {'aid': event['i']}}
+        assert trust_bundle.get(bundle.KIND_CREDENTIAL, 'Emissing') is None
+
+
+def test_key_too_long_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        bundle.write_trust_bundle(tmp_path / bundle.BUNDLE_NAME, [], [], {'x' * (bundle.BUNDLE_MAX_KEY_BYTES + 1): {}})
+
+
+@pytest.mark.parametrize('artifact', ["qvi-credential.json", "icp"])
+def test_bundle_older_than_an_artifact_is_ignored(artifacts, artifact):
+    directory, path, event, _ = artifacts
+    age(path, 10)
+    changed = directory / artifact
+    if changed.is_dir():
+        changed = changed / event['i']
+    changed.write_text(changed.read_text())
+
+    assert bundle.open_bundle(directory) is None
+
+
+@pytest.mark.parametrize('corrupt', [
+    lambda data: data[:bundle.BUNDLE_HEADER.size - 1],
+    lambda data: b"NOTABNDL" + data[8:],
+    lambda data: data[:-5],
+])
+def test_broken_bundle_is_ignored(artifacts, corrupt):
+    directory, path, _, _ = artifacts
+    path.write_bytes(corrupt(path.read_bytes()))
+
+    assert bundle.open_bundle(directory) is None
+
+
+def test_verifier_seeds_from_a_current_bundle_and_falls_back_from_a_stale_one(artifacts, verifier):
+    directory, path, event, credential = artifacts
+    # Bundle-only content, to tell which source the verifier seeded from
+    bundle.write_trust_bundle(path, [event], [], {'habitats': {'bundled': {'aid': event['i']}}})
+
+    assert verifier.seed_from_bundle(directory)
+    assert verifier.trust_habitats == {'bundled': {'aid': event['i']}}
+    assert verifier.trust_store.get_credential(credential['d']) is None
+
+    age(path, 10)
+    assert not verifier.seed_from_bundle(directory)
+
+
+def test_generator_bundle_holds_no_salts(tmp_path):
+    # The script writes next to itself (../gleif-frontend/...) and imports ../verification-service/bundle.py
+    script_dir = tmp_path / "did-management"
+    script_dir.mkdir()
+    shutil.copy(GENERATE_SCRIPT, script_dir)
+    (tmp_path / "verification-service").mkdir()
+    shutil.copy(SERVICE_DIR / "bundle.py", tmp_path / "verification-service")
+    (script_dir / "twin-wallet.json").write_text(json.dumps({"did": "did:iota:testnet:0x" + "ab" * 32}))
+
+    subprocess.run([sys.executable, str(script_dir / GENERATE_SCRIPT.name), "did:iota:testnet:0x" + "ab" * 32],
+                   cwd=str(script_dir), capture_output=True, check=True)
+
+    output_dir = tmp_path / "gleif-frontend" / "public" / ".well-known" / "keri"
+    with bundle.open_bundle(output_dir) as trust_bundle:
+        habitats = trust_bundle.get(bundle.KIND_META, 'habitats')
+    assert set(habitats) == {'gleif', 'qvi', 'legal_entity'}
+    assert all(set(habitat) == {'aid'} for habitat in habitats.values())
+    assert json.loads((output_dir / "habitats.json").read_text()) == habitats
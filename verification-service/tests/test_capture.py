@@ -0,0 +1,146 @@
+"""Traffic capture: pseudonym salt, capture on every transport, off-thread parsing and replay"""
+
+import json
+import atexit
+import base64
+import asyncio
+import threading
+
+import pytest
+
+import capture
+import tracing
+
+
+@pytest.fixture
+def capture_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(capture, 'CAPTURE_DIR', str(tmp_path))
+    monkeypatch.setattr(capture, 'CAPTURE_SALT', None)
+    monkeypatch.setattr(capture, '_salt', None)
+    return tmp_path
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Capture every request; returns the list of capture.record calls"""
+    calls = []
+    monkeypatch.setattr(capture, 'sampled', lambda: True)
+    monkeypatch.setattr(capture, 'record', lambda *args, **kwargs: calls.append((args, kwargs)))
+    return calls
+
+
+@pytest.fixture
+def body(ecr_chain):
+    return json.dumps({'credential': dict(ecr_chain[0], p={'d': 'placeholder'})}).encode()
+
+
+def test_salt_is_kept_in_the_capture_directory(capture_dir, monkeypatch):
+    first = capture.pseudonym("did:example:1")
+    assert (capture_dir / capture.CAPTURE_SALT_FILENAME).stat().st_mode & 0o777 == 0o600
+
+    # A restarted process reads the same salt back
+    monkeypatch.setattr(capture, '_salt', None)
+    assert capture.pseudonym("did:example:1") == first
+    assert capture.pseudonym("did:example:2") != first
+
+
+def test_configured_salt_wins(capture_dir, monkeypatch):
+    monkeypatch.setattr(capture, 'CAPTURE_SALT', 'configured')
+    capture.pseudonym("did:example:1")
+    assert not (capture_dir / capture.CAPTURE_SALT_FILENAME).exists()
+
+
+def test_rpc_verify_is_captured(verifier, body, recorded):
+    handler = verifier.rpc_handler(
+        '/verify', lambda payload: verifier.run_request_handler('verify_credential_request', payload, 'application/json', {}),
+        capture_mimetype='application/json',
+    )
+
+    _, status = handler(body)
+
+    assert status == 200
+    (trace, captured_body, mimetype, args, _, captured_status, endpoint), kwargs = recorded[0]
+    assert (captured_body, mimetype, captured_status, endpoint) == (body, 'application/json', 200, '/verify')
+    assert kwargs == {'transport': 'rpc'}
+    assert trace.sampled and trace.spans
+
+
+def test_asgi_verify_is_captured(verifier, body, recorded):
+    import asgi
+
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': '/verify', 'query_string': b'',
+             'headers': [(b'content-type', b'application/json')]}
+    asyncio.run(asgi.app(scope, receive, send))
+
+    assert sent[0]['status'] == 200
+    (trace, captured_body, mimetype, _, _, status), kwargs = recorded[0]
+    assert (captured_body, mimetype, status) == (body, 'application/json', 200)
+    assert kwargs == {'transport': 'asgi'}
+    assert trace.sampled and trace.spans
+
+
+@pytest.fixture
+def capture_file(capture_dir, monkeypatch):
+    """Records go to a fresh listener in capture_dir; read() stops it and returns the records"""
+    handlers = list(capture.capture_logger.handlers)
+    monkeypatch.setattr(capture, '_listener', None)
+
+    def stop():
+        if capture._listener is not None and capture._listener._thread is not None:
+            capture._listener.stop()
+            atexit.unregister(capture._listener.stop)
+
+    def read():
+        stop()
+        path = capture_dir / capture.CAPTURE_FILENAME
+        return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+    yield read
+    stop()
+    capture.capture_logger.handlers[:] = handlers
+
+
+def test_request_is_parsed_in_the_listener_thread(capture_file, body, monkeypatch):
+    parsed_on = []
+    request_fields = capture._request_fields
+    monkeypatch.setattr(capture, '_request_fields', lambda *args: parsed_on.append(threading.current_thread()) or request_fields(*args))
+    trace = tracing.start_trace(sampled=True)
+
+    capture.record(trace, body, 'application/json', {}, json.dumps({'verified': True}).encode(), 200, transport='asgi')
+
+    [entry] = capture_file()
+    assert parsed_on and threading.main_thread() not in parsed_on
+    assert entry['said'] == json.loads(body)['credential']['d']
+    assert (entry['endpoint'], entry['content_type'], entry['outcome'], entry['transport']) == ('/verify', 'application/json', 'verified', 'asgi')
+
+
+def test_replay_uses_the_recorded_endpoint_and_content_type(monkeypatch):
+    import replay
+
+    sent = []
+
+    def post(session, url, data=None, params=None, headers=None, timeout=None):
+        sent.append((url, data, headers['Content-Type'], params))
+        return type('Response', (), {'status_code': 200, 'json': lambda self: {'verified': True}})()
+
+    monkeypatch.setattr(replay.requests.Session, 'post', post)
+    entry = {'ts': 1.0, 'anonymized': False, 'endpoint': '/verify/batch', 'content_type': 'application/cesr',
+             'body_b64': base64.b64encode(b'-cesr-').decode(), 'query': {'issuer_aid': 'EIssuer'}, 'outcome': 'verified'}
+    legacy = {'ts': 2.0, 'anonymized': False, 'body': '{}', 'outcome': 'verified'}
+
+    results, _ = replay.replay([entry, legacy], "http://verifier", 0, 1, {})
+
+    assert len(results) == 2
+    assert sorted(sent) == [
+        ("http://verifier/verify", b'{}', 'application/json', {}),
+        ("http://verifier/verify/batch", b'-cesr-', 'application/cesr', {'issuer_aid': 'EIssuer'}),
+    ]
@@ -0,0 +1,154 @@
+"""CESR / CBOR / MsgPack credential streams"""
+
+import json
+
+import pytest
+from keri.core import coring, serdering
+from keri.kering import Serials
+
+import cesr_stream
+from conftest import SCHEMA_SAID, make_aid
+
+
+def acdc(issuee, kind=Serials.json):
+    issuer, signer = make_aid('issuer')
+    serder = serdering.SerderACDC(
+        sad={'v': 'ACDC10JSON000000_', 'd': '', 'i': issuer, 's': SCHEMA_SAID, 'a': {'i': issuee}},
+        makify=True, kind=kind,
+    )
+    return serder, signer
+
+
+def signatures(serder, *signers, text=True):
+    """Controller indexed signature group over serder.raw, one signature per signer"""
+    counter = coring.Counter(code=coring.CtrDex.ControllerIdxSigs, count=len(signers))
+    sigers = [signer.sign(serder.raw, index=index) for index, signer in enumerate(signers)]
+    if text:
+        return counter.qb64b + b''.join(siger.qb64b for siger in sigers)
+    return counter.qb2 + b''.join(siger.qb2 for siger in sigers)
+
+
+def wrapped(group, text=True, extra_quadlets=0):
+    """group inside a -V attachment group (whose count is off by extra_quadlets)"""
+    count = len(group) // (4 if text else 3) + extra_quadlets
+    counter = coring.Counter(code=coring.CtrDex.AttachedMaterialQuadlets, count=count)
+    return (counter.qb64b if text else counter.qb2) + group
+
+
+def test_multi_message_stream_mixes_serializations():
+    first, _ = acdc('EFirst')
+    second, _ = acdc('ESecond', kind=Serials.cbor)
+    third, _ = acdc('EThird', kind=Serials.mgpk)
+
+    messages = cesr_stream.parse_stream(bytearray(first.raw + second.raw + third.raw))
+
+    assert [message.serder.sad['a']['i'] for message in messages] == ['EFirst', 'ESecond', 'EThird']
+    assert [message.serder.kind for message in messages] == [Serials.json, Serials.cbor, Serials.mgpk]
+    assert [message.serder.raw for message in messages] == [first.raw, second.raw, third.raw]
+    assert all(message.sigers == [] for message in messages)
+
+
+@pytest.mark.parametrize('text', [True, False], ids=['text', 'binary'])
+def test_attached_signatures_stay_with_their_message(text):
+    first, first_signer = acdc('EFirst')
+    second, second_signer = acdc('ESecond', kind=Serials.cbor)
+    _, extra_signer = make_aid('extra')
+    body = (first.raw + signatures(first, first_signer, text=text)
+            + second.raw + wrapped(signatures(second, second_signer, extra_signer, text=text), text=text))
+
+    messages = cesr_stream.parse_stream(body)
+
+    assert [len(message.sigers) for message in messages] == [1, 2]
+    assert first_signer.verfer.verify(messages[0].sigers[0].raw, first.raw)
+    assert [siger.index for siger in messages[1].sigers] == [0, 1]
+    assert extra_signer.verfer.verify(messages[1].sigers[1].raw, second.raw)
+
+
+def test_single_message_body_is_not_copied():
+    serder, _ = acdc('EFirst')
+    body = bytes(serder.raw)
+
+    assert cesr_stream.parse_stream(body)[0].serder.raw is body
+
+
+@pytest.mark.parametrize('text', [True, False], ids=['text', 'binary'])
+@pytest.mark.parametrize('extra_quadlets, followed_by_credential, message', [
+    (1, False, "Truncated attachment group"),
+    (1, True, "declares"),
+    (-1, False, "declares"),
+    (-1, True, "declares"),
+], ids=['over-long at the end', 'over-long before a credential', 'short at the end', 'short before a credential'])
+def test_attachment_group_count_must_match_its_contents(text, extra_quadlets, followed_by_credential, message):
+    first, signer = acdc('EFirst')
+    second, _ = acdc('ESecond')
+    body = first.raw + wrapped(signatures(first, signer, text=text), text=text, extra_quadlets=extra_quadlets)
+    if followed_by_credential:
+        body += second.raw
+
+    with pytest.raises(cesr_stream.StreamError, match=message):
+        cesr_stream.parse_stream(body)
+
+
+def test_single_serialization_media_types():
+    cbor, _ = acdc('EFirst', kind=Serials.cbor)
+    assert cesr_stream.parse_stream(cbor.raw + cbor.raw, 'application/cbor')[1].serder.said == cbor.said
+
+    json_acdc, _ = acdc('EFirst')
+    with pytest.raises(cesr_stream.StreamError, match="Expected CBOR serialization"):
+        cesr_stream.parse_stream(cbor.raw + json_acdc.raw, 'application/cbor')
+
+
+@pytest.mark.parametrize('body, message', [
+    (b'', "Empty credential stream"),
+    (b'-AAB', "Attachment found before any credential"),
+    (b'{"v":"XXXX10JSON000000_"}', "Invalid version string at offset 0"),
+    (b'\xff\xff\xff', "Invalid version string at offset 0"),
+], ids=['empty', 'leading attachment', 'bad version string', 'garbage'])
+def test_malformed_streams(body, message):
+    with pytest.raises(cesr_stream.StreamError, match=message):
+        cesr_stream.parse_stream(body)
+
+
+def test_truncated_credential_reports_its_offset():
+    first, _ = acdc('EFirst')
+    second, _ = acdc('ESecond')
+    with pytest.raises(cesr_stream.StreamError, match=f"Truncated credential at offset {len(first.raw)}"):
+        cesr_stream.parse_stream(first.raw + second.raw[:-1])
+
+
+def test_truncated_signature_is_rejected():
+    serder, signer = acdc('EFirst')
+    with pytest.raises(cesr_stream.StreamError, match="Invalid siger"):
+        cesr_stream.parse_stream(serder.raw + signatures(serder, signer)[:-10])
+
+
+def test_unsupported_attachment_group_is_rejected():
+    serder, _ = acdc('EFirst')
+    counter = coring.Counter(code=coring.CtrDex.NonTransReceiptCouples, count=1)
+    with pytest.raises(cesr_stream.StreamError, match=f"Unsupported attachment group {coring.CtrDex.NonTransReceiptCouples}"):
+        cesr_stream.parse_stream(serder.raw + counter.qb64b)
+
+
+def test_attachments_need_the_cesr_media_type():
+    serder, signer = acdc('EFirst', kind=Serials.cbor)
+    with pytest.raises(cesr_stream.StreamError, match="only accepted as application/cesr"):
+        cesr_stream.parse_stream(serder.raw + signatures(serder, signer), 'application/cbor')
+
+
+def test_streamed_credential_signatures_are_verified(ecr_chain, verifier):
+    credential, serder, le_signer, _ = ecr_chain
+    _, impostor = make_aid('impostor')
+    client = verifier.app.test_client()
+
+    signed = client.post('/verify', data=serder.raw + signatures(serder, le_signer, text=False),
+                         content_type='application/cesr')
+    forged = client.post('/verify', data=serder.raw + signatures(serder, impostor),
+                         content_type='application/cesr')
+    malformed = client.post('/verify', data=b'-AAB' + serder.raw, content_type='application/cesr')
+
+    assert signed.status_code == 200, signed.get_json()
+    assert signed.get_json()['details']['credential_said'] == credential['d']
+    assert forged.status_code == 400
+    assert "Invalid signature at index 0" in json.dumps(forged.get_json())
+    assert malformed.status_code == 400
+    assert "Attachment found before any credential" in malformed.get_json()['error']
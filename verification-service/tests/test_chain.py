@@ -0,0 +1,62 @@
+"""Issuance chain traversal for the vLEI credential layout (issuer in 'i', issuee in 'a.i', parents in 'e')"""
+
+from keri.core import coring
+
+from conftest import make_credential
+from store import credential_issuer, credential_subject
+
+
+def test_issuer_and_subject_of_vlei_layout(ecr_chain):
+    ecr_credential, _, _, aids = ecr_chain
+    assert credential_issuer(ecr_credential) == aids['le']
+    assert credential_subject(ecr_credential) == aids['person']
+
+
+def test_issuer_and_subject_of_poc_layout():
+    credential = {'i': 'EQvi', 'a': {'issuer': 'EGleif', 'issuee': 'EQvi'}}
+    assert credential_issuer(credential) == 'EGleif'
+    assert credential_subject(credential) == 'EQvi'
+    # The generated Legal Entity credential names no issuer
+    assert credential_issuer({'i': 'ELegalEntity', 'a': {'alsoKnownAs': []}}) is None
+
+
+def test_store_indexes_use_issuee_and_issuer(ecr_chain, trust_store):
+    _, _, _, aids = ecr_chain
+    le_saids = trust_store.lookup('subjects', aids['le'])
+    assert len(le_saids) == 1
+    assert trust_store.lookup('issuers', aids['qvi']) == le_saids
+    assert trust_store.lookup('subjects', aids['qvi']) == trust_store.lookup('issuers', aids['gleif'])
+
+
+def test_edge_chained_ecr_credential_verifies(verifier, ecr_chain):
+    ecr_credential, ecr_serder, le_signer, aids = ecr_chain
+    siger = le_signer.sign(ecr_serder.raw, index=0)
+
+    result = verifier.verify_acdc_credential(ecr_credential, serder=ecr_serder, sigers=[siger])
+
+    assert result['verified'], result
+    assert result['issuer_aid'] == aids['le']
+    assert result['subject_aid'] == aids['person']
+    assert [entry['aid'] for entry in result['issuance_chain']] == [aids['person'], aids['le'], aids['qvi'], aids['gleif']]
+
+
+def test_edge_to_unknown_parent_fails(verifier, ecr_chain):
+    _, _, le_signer, aids = ecr_chain
+    orphan, _ = make_credential(aids['qvi'], aids['le'])
+    ecr_credential, ecr_serder = make_credential(aids['le'], aids['person'], edges={'le': orphan})
+    siger = le_signer.sign(ecr_serder.raw, index=0)
+
+    result = verifier.verify_acdc_credential(ecr_credential, serder=ecr_serder, sigers=[siger])
+
+    assert not result['verified']
+    assert result['step'] == 'chain_traversal'
+
+
+def test_signature_by_another_key_fails(verifier, ecr_chain):
+    ecr_credential, ecr_serder, _, _ = ecr_chain
+    siger = coring.Signer(transferable=True).sign(ecr_serder.raw, index=0)
+
+    result = verifier.verify_acdc_credential(ecr_credential, serder=ecr_serder, sigers=[siger])
+
+    assert not result['verified']
+    assert result['step'] == 'signature_validation'
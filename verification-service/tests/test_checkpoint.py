@@ -0,0 +1,120 @@
+"""Warm-cache checkpoints: write and restore, unusable files, and the SIGTERM handler"""
+
+import os
+import sys
+import json
+import signal
+import subprocess
+
+import pytest
+
+import checkpoint
+from conftest import SERVICE_DIR
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / checkpoint.CHECKPOINT_FILENAME)
+
+
+@pytest.fixture
+def sigterm():
+    """Restore the process SIGTERM handler after a test that installs its own"""
+    previous = signal.getsignal(signal.SIGTERM)
+    yield
+    signal.signal(signal.SIGTERM, previous)
+
+
+def test_round_trip_keeps_only_the_current_generation(path):
+    caches = {'status': {'ESaid': (2, {'verified': True}), 'EOld': (1, {'verified': False})}, 'chain': {}}
+
+    assert checkpoint.save_checkpoint(path, 2, 'fp', caches) == 1
+
+    assert checkpoint.load_checkpoint(path, 2, 'fp') == {'status': {'ESaid': (2, {'verified': True})}, 'chain': {}}
+    assert not os.path.exists(f"{path}.tmp")
+
+
+@pytest.mark.parametrize('generation, fingerprint', [(3, 'fp'), (2, 'other')])
+def test_checkpoint_from_another_trust_state_is_discarded(path, generation, fingerprint):
+    checkpoint.save_checkpoint(path, 2, 'fp', {'status': {'ESaid': (2, {'verified': True})}})
+
+    assert checkpoint.load_checkpoint(path, generation, fingerprint) == {}
+
+
+@pytest.mark.parametrize('content', [
+    '{"format": "verifier-warm-cache", "version": 1, "caches": {',
+    '\x00\x01 not json',
+    json.dumps({'format': checkpoint.CHECKPOINT_FORMAT, 'version': checkpoint.CHECKPOINT_VERSION + 1,
+                'generation': 2, 'fingerprint': 'fp', 'caches': {'status': [['ESaid', {}]]}}),
+    json.dumps({'format': 'something-else', 'version': checkpoint.CHECKPOINT_VERSION,
+                'generation': 2, 'fingerprint': 'fp', 'caches': {'status': [['ESaid', {}]]}}),
+])
+def test_corrupted_or_foreign_checkpoint_is_ignored(path, content):
+    with open(path, 'w') as f:
+        f.write(content)
+
+    assert checkpoint.load_checkpoint(path, 2, 'fp') == {}
+
+
+def test_missing_checkpoint_is_empty(path):
+    assert checkpoint.load_checkpoint(path, 2, 'fp') == {}
+
+
+def test_verifier_restores_its_caches(verifier, tmp_path, monkeypatch):
+    monkeypatch.setattr(verifier, 'VERIFIER_DB_DIR', str(tmp_path))
+    monkeypatch.setattr(verifier, 'trust_generation', 4)
+    monkeypatch.setattr(verifier, '_trust_fingerprint', 'fp')
+    verifier._status_cache['ESaid'] = (4, {'verified': True})
+    verifier._chain_cache['EChain'] = (4, True)
+    assert verifier.save_warm_caches() == 2
+
+    verifier._status_cache.clear()
+    verifier._chain_cache.clear()
+    assert verifier.restore_warm_caches() == 2
+    assert verifier._status_cache == {'ESaid': (4, {'verified': True})}
+
+    # A new trust generation starts cold
+    verifier._status_cache.clear()
+    monkeypatch.setattr(verifier, 'trust_generation', 5)
+    assert verifier.restore_warm_caches() == 0
+
+
+def test_sigterm_checkpoints_then_chains_to_the_previous_handler(sigterm):
+    calls = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: calls.append('server'))
+    checkpointer = checkpoint.Checkpointer(lambda: calls.append('save') or 0, interval=0)
+    checkpointer.start()
+    try:
+        os.kill(os.getpid(), signal.SIGTERM)
+    finally:
+        checkpointer.stop()
+
+    assert calls == ['save', 'server']
+
+
+def test_ignored_sigterm_stays_ignored(sigterm):
+    calls = []
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    checkpointer = checkpoint.Checkpointer(lambda: calls.append('save') or 0, interval=0)
+    checkpointer.start()
+
+    os.kill(os.getpid(), signal.SIGTERM)
+
+    assert calls == ['save']
+
+
+def test_default_sigterm_still_terminates_after_the_checkpoint(tmp_path):
+    marker = tmp_path / "saved"
+    script = f"""
+import os, sys, signal
+sys.path.insert(0, {str(SERVICE_DIR)!r})
+import checkpoint
+checkpoint.Checkpointer(lambda: open({str(marker)!r}, 'w').close() or 0, interval=0).start()
+os.kill(os.getpid(), signal.SIGTERM)
+print("survived")
+"""
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == -signal.SIGTERM
+    assert 'survived' not in result.stdout
+    assert marker.exists()
@@ -0,0 +1,94 @@
+"""Cacheable credential status: ETags, 304 responses and trust generation changes"""
+
+import json
+
+import pytest
+
+from conftest import asgi_request
+
+
+@pytest.fixture
+def artifacts(verifier, monkeypatch):
+    """Trust artifacts whose fingerprint the test changes (version['fingerprint']) to start a new generation"""
+    version = {'fingerprint': 'v1'}
+    monkeypatch.setattr(verifier, 'trust_artifacts_fingerprint', lambda inception_dir: version['fingerprint'])
+    monkeypatch.setattr(verifier, 'seed_verifier_database', lambda: None)
+    monkeypatch.setattr(verifier, 'TRUST_REFRESH_INTERVAL_SECONDS', 0)
+    monkeypatch.setattr(verifier, '_trust_fingerprint', None)
+    monkeypatch.setattr(verifier, '_trust_checked_at', None)
+    monkeypatch.setattr(verifier, 'trust_generation', 0)
+    return version
+
+
+@pytest.fixture
+def stored_said(ecr_chain, verifier):
+    """SAID of the seeded Legal Entity credential"""
+    return verifier.trust_store.lookup('subjects', ecr_chain[3]['le'])[0]
+
+
+@pytest.fixture
+def verifications(verifier, monkeypatch):
+    """Count full verifications behind the status endpoint"""
+    calls = []
+    verify = verifier.verify_acdc_credential
+    monkeypatch.setattr(verifier, 'verify_acdc_credential', lambda credential: calls.append(credential['d']) or verify(credential))
+    return calls
+
+
+def flask_status(verifier, said, etag=None):
+    headers = {'If-None-Match': etag} if etag else {}
+    response = verifier.app.test_client().get(f"/credentials/{said}/status", headers=headers)
+    return response.status_code, response.headers, response.get_data()
+
+
+def asgi_status(verifier, said, etag=None):
+    return asgi_request('GET', f"/credentials/{said}/status", headers=[('if-none-match', etag)] if etag else [])
+
+
+@pytest.fixture(params=[flask_status, asgi_status], ids=['flask', 'asgi'])
+def get_status(request, verifier):
+    return lambda said, etag=None: request.param(verifier, said, etag)
+
+
+def etag_of(headers):
+    return headers.get('ETag') or headers.get('etag')
+
+
+def test_etag_names_the_said_and_generation(artifacts, stored_said, get_status, verifier):
+    status, headers, body = get_status(stored_said)
+
+    assert status == 200, body
+    assert etag_of(headers) == f'"{stored_said}.{verifier.trust_generation}"'
+    assert json.loads(body)['verified']
+
+
+@pytest.mark.parametrize('form', ['{etag}', 'W/{etag}', '"other", {etag}', '*'])
+def test_matching_if_none_match_is_not_modified(artifacts, stored_said, get_status, verifications, form):
+    _, headers, _ = get_status(stored_said)
+    verifications.clear()
+
+    status, not_modified_headers, body = get_status(stored_said, form.format(etag=etag_of(headers)))
+
+    assert status == 304 and body == b''
+    assert etag_of(not_modified_headers) == etag_of(headers)
+    assert verifications == []
+
+
+def test_stale_etag_gets_the_full_response(artifacts, stored_said, get_status):
+    status, _, body = get_status(stored_said, f'"{stored_said}.0"')
+
+    assert status == 200 and json.loads(body)['verified']
+
+
+def test_etag_changes_with_the_trust_generation(artifacts, stored_said, get_status, verifications):
+    _, headers, _ = get_status(stored_said)
+    first = etag_of(headers)
+
+    artifacts['fingerprint'] = 'v2'
+    status, headers, body = get_status(stored_said, first)
+
+    assert status == 200
+    assert etag_of(headers) != first and etag_of(headers).endswith('.2"')
+    # The cached result of the previous generation is not reused
+    assert verifications == [stored_said, stored_said]
+    assert get_status(stored_said, etag_of(headers))[0] == 304
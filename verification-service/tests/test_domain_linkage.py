@@ -0,0 +1,145 @@
+"""Domain-linkage origin checks and batch prefetching (no network: documents come from a fake client)"""
+
+import time
+import importlib.util
+
+import pytest
+from keri.core import coring
+
+import domain_linkage
+from conftest import SERVICE_DIR
+
+ORIGIN = "https://linked.example"
+RESOLVER = "https://resolver.example/resolve-did"
+
+_spec = importlib.util.spec_from_file_location('standin', SERVICE_DIR / "domain-linkage-standin.py")
+standin = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(standin)
+
+
+class FakeClient:
+    """get_json over a dict of documents by URL; records every URL requested"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.requested = []
+        self.stats = {'requests': 0, 'fresh_hits': 0, 'revalidated': 0}
+
+    def get_json(self, url):
+        self.requested.append(url)
+        if url not in self.documents:
+            raise domain_linkage.FetchError(f"{url} returned HTTP 404")
+        return self.documents[url]
+
+
+@pytest.fixture
+def site():
+    """(client, did) for a DID whose document declares ORIGIN and whose configuration links it"""
+    signer = coring.Signer(transferable=False)
+    did = "did:iota:test:0x01"
+    kid = f"{did}#key-1"
+    document = {
+        'id': did,
+        'verificationMethod': [{'id': kid, 'type': 'JsonWebKey2020', 'controller': did,
+                                'publicKeyJwk': {'kty': 'OKP', 'crv': 'Ed25519', 'x': standin._b64url(signer.verfer.raw)}}],
+        'service': [{'id': f"{did}#linked-domain", 'type': 'LinkedDomains', 'serviceEndpoint': ORIGIN}],
+    }
+    configuration = {'linked_dids': [standin.linkage_jwt(signer, did, ORIGIN, kid)]}
+    client = FakeClient({
+        f"{RESOLVER}/{did}": document,
+        f"{ORIGIN}{domain_linkage.DID_CONFIGURATION_PATH}": configuration,
+    })
+    return client, did
+
+
+def test_declared_origin_verifies(site):
+    client, did = site
+    verifier = domain_linkage.DomainLinkageVerifier(client, RESOLVER)
+    assert verifier.verify(did)['verified']
+    assert verifier.verify(did, ORIGIN + "/")['cached'] is True
+
+
+def test_undeclared_origin_is_never_fetched(site):
+    client, did = site
+    verifier = domain_linkage.DomainLinkageVerifier(client, RESOLVER)
+
+    result = verifier.verify(did, "http://169.254.169.254")
+
+    assert not result['verified']
+    assert result['step'] == 'origin'
+    assert not any(url.startswith("http://169.254.169.254") for url in client.requested)
+
+
+def test_allow_listed_origin_is_fetched(site):
+    client, did = site
+    verifier = domain_linkage.DomainLinkageVerifier(client, RESOLVER, allowed_origins="https://partner.example,")
+
+    result = verifier.verify(did, "https://partner.example")
+
+    assert result['step'] == 'fetch'
+    assert f"https://partner.example{domain_linkage.DID_CONFIGURATION_PATH}" in client.requested
+
+
+def test_verify_many_fetches_each_document_once(site):
+    client, did = site
+    verifier = domain_linkage.DomainLinkageVerifier(client, RESOLVER, ttl=0)
+    items = [{'did': did}, {'did': did, 'origin': ORIGIN}, {'did': did, 'origin': "http://internal.invalid"},
+             {'did': "did:iota:test:0xmissing", 'origin': ORIGIN}]
+
+    results = verifier.verify_many(items * 2)
+
+    assert [result['verified'] for result in results] == [True, True, False, False] * 2
+    assert [result.get('step') for result in results[2:4]] == ['origin', 'fetch']
+    assert sorted(client.requested) == sorted([
+        f"{RESOLVER}/{did}",
+        f"{RESOLVER}/did:iota:test:0xmissing",
+        f"{ORIGIN}{domain_linkage.DID_CONFIGURATION_PATH}",
+    ])
+
+
+def test_linked_domain_origins_lists_every_endpoint():
+    document = {'service': [
+        {'type': 'LinkedDomains', 'serviceEndpoint': {'origins': ["https://a.example/", "https://b.example"]}},
+        {'type': ['LinkedDomains'], 'serviceEndpoint': ["https://a.example", "ftp://c.example"]},
+        {'type': 'DIDCommMessaging', 'serviceEndpoint': "https://d.example"},
+    ]}
+    assert domain_linkage.linked_domain_origins(document) == ["https://a.example", "https://b.example"]
+    assert domain_linkage.linked_domain_origin(document) == "https://a.example"
+
+
+def test_verify_many_answers_verified_pairs_without_resolving(site):
+    client, did = site
+    verifier = domain_linkage.DomainLinkageVerifier(client, RESOLVER)
+    assert verifier.verify(did, ORIGIN)['verified']
+    client.requested.clear()
+
+    results = verifier.verify_many([{'did': did, 'origin': ORIGIN}, {'did': did, 'origin': ORIGIN + "/"}])
+
+    assert [result['cached'] for result in results] == [True, True]
+    assert client.requested == []
+
+
+def test_verified_pairs_are_bounded_and_expire(site, monkeypatch):
+    client, did = site
+    verifier = domain_linkage.DomainLinkageVerifier(client, RESOLVER, allowed_origins=["https://a.example"], max_entries=2)
+    for key in (("https://a.example", did), ("https://b.example", did), (ORIGIN, did)):
+        verifier._remember(key, time.time() + 60, {'verified': True})
+
+    assert list(verifier._verified) == [("https://b.example", did), (ORIGIN, did)]
+
+    now = time.time()
+    monkeypatch.setattr(domain_linkage.time, 'time', lambda: now + 120)
+    assert verifier._cached((ORIGIN, did)) is None
+    assert list(verifier._verified) == [("https://b.example", did)]
+
+
+def test_http_cache_evicts_the_least_recently_used_url(monkeypatch):
+    client = domain_linkage.CachingHttpClient(max_entries=2)
+    response = type('Response', (), {'status_code': 200, 'headers': {'Cache-Control': 'max-age=60'}, 'json': lambda self: {}})
+    monkeypatch.setattr(client.session, 'get', lambda url, **kwargs: response())
+
+    for url in ("https://a.example/", "https://b.example/", "https://a.example/", "https://c.example/"):
+        client.get_json(url)
+
+    assert list(client._cache) == ["https://a.example/", "https://c.example/"]
+    assert client.stats == {'requests': 3, 'fresh_hits': 1, 'revalidated': 0}
@@ -0,0 +1,85 @@
+"""Request profiling: the X-Profile secret, the profile directory and admin sampling windows"""
+
+import importlib
+from pathlib import Path
+
+import pytest
+
+import profiling
+
+SECRET = "test-profile-secret"
+
+
+@pytest.fixture
+def profiled(verifier, tmp_path, monkeypatch):
+    """Profiling enabled with SECRET, writing to a temporary directory; returns a Flask test client"""
+    monkeypatch.setattr(profiling, 'PROFILE_SECRET', SECRET)
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', tmp_path / "profiles")
+    yield verifier.app.test_client()
+    profiling.stop_window()
+
+
+@pytest.fixture
+def reload_profiling(monkeypatch):
+    """Re-import profiling.py under the given environment (restored afterwards)"""
+    def reload(**environment):
+        for name, value in environment.items():
+            if value is None:
+                monkeypatch.delenv(name, raising=False)
+            else:
+                monkeypatch.setenv(name, value)
+        return importlib.reload(profiling)
+
+    yield reload
+    monkeypatch.undo()
+    importlib.reload(profiling)
+
+
+def test_profile_dir_defaults_to_the_database_directory(reload_profiling, tmp_path):
+    module = reload_profiling(VERIFIER_DB_DIR=str(tmp_path), PROFILE_DIR=None)
+    assert module.PROFILE_DIR == tmp_path / "profiles"
+
+
+def test_configured_profile_dir_wins(reload_profiling, tmp_path):
+    module = reload_profiling(VERIFIER_DB_DIR=str(tmp_path), PROFILE_DIR=str(tmp_path / "elsewhere"))
+    assert module.PROFILE_DIR == tmp_path / "elsewhere"
+
+
+def test_secret_in_the_header_profiles_the_request(profiled):
+    response = profiled.post('/verify', json={}, headers={'X-Profile': SECRET})
+
+    name = response.headers['X-Profile-File']
+    assert (profiling.PROFILE_DIR / name).is_file()
+
+
+@pytest.mark.parametrize('headers, query', [
+    ({}, f"?profile={SECRET}"),
+    ({'X-Profile': 'wrong'}, ""),
+    ({'X-Profile': ''}, ""),
+])
+def test_request_without_the_secret_in_the_header_is_not_profiled(profiled, headers, query):
+    response = profiled.post(f"/verify{query}", json={}, headers=headers)
+
+    assert 'X-Profile-File' not in response.headers
+    assert not Path(profiling.PROFILE_DIR).exists()
+
+
+def test_profiling_is_off_without_a_secret(monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_SECRET', None)
+    assert not profiling.requested({'X-Profile': ''})
+    assert not profiling.requested({'X-Profile': 'anything'})
+
+
+def test_admin_window_needs_the_header_and_samples_traffic(profiled):
+    assert profiled.post('/admin/profiling', json={'percent': 100, 'duration_seconds': 60}).status_code == 403
+
+    response = profiled.post('/admin/profiling', json={'percent': 100, 'duration_seconds': 10 ** 6},
+                             headers={'X-Profile': SECRET})
+    status = response.get_json()['profiling']
+    assert status['active'] and status['remaining_seconds'] <= profiling.PROFILE_MAX_WINDOW_SECONDS
+
+    assert 'X-Profile-File' in profiled.post('/verify', json={}).headers
+    assert profiled.get('/admin/profiling', headers={'X-Profile': SECRET}).get_json()['profiling']['profiled_requests'] == 1
+
+    assert not profiled.delete('/admin/profiling', headers={'X-Profile': SECRET}).get_json()['profiling']['active']
+    assert not profiling.sampled()
@@ -0,0 +1,124 @@
+"""Signed verification receipts"""
+
+import os
+import copy
+import json
+import stat
+import base64
+
+import pytest
+from keri.app import habbing
+from keri.core import coring
+
+import receipts
+from conftest import asgi_request
+
+
+def make_signer():
+    return 'EVerifierAid', coring.Signer(transferable=True)
+
+
+@pytest.fixture
+def receipt_signer(verifier, monkeypatch):
+    monkeypatch.setattr(receipts, 'RECEIPT_TTL_SECONDS', 300)
+    signer = receipts.ReceiptSigner(*make_signer())
+    monkeypatch.setattr(verifier, 'receipt_signer', signer)
+    return signer
+
+
+def test_issued_receipt_validates(receipt_signer):
+    receipt = receipt_signer.issue('ESaid', ['ESubject', 'EGleif'], 7, did='did:example:1', now=1000)
+
+    result = receipts.validate_receipt(receipt, receipt_signer.key, said='ESaid', did='did:example:1', now=1299)
+
+    assert result['valid']
+    assert result['payload'] == {'v': receipts.RECEIPT_VERSION, 'vrf': 'EVerifierAid', 'said': 'ESaid',
+                                 'chain': ['ESubject', 'EGleif'], 'gen': 7, 'iat': 1000, 'exp': 1300,
+                                 'did': 'did:example:1'}
+
+
+def test_receipt_expires(receipt_signer):
+    receipt = receipt_signer.issue('ESaid', [], 1, ttl=60, now=1000)
+
+    assert receipts.validate_receipt(receipt, receipt_signer.key, now=1059)['valid']
+    assert receipts.validate_receipt(receipt, receipt_signer.key, now=1060)['reason'] == "Receipt expired"
+
+
+def test_receipt_is_bound_to_its_credential_and_did(receipt_signer):
+    receipt = receipt_signer.issue('ESaid', [], 1, did='did:example:1')
+
+    assert receipts.validate_receipt(receipt, receipt_signer.key, said='EOther')['reason'] == "Receipt is for another credential"
+    assert receipts.validate_receipt(receipt, receipt_signer.key, did='did:example:2')['reason'] == "Receipt is for another DID"
+
+
+def test_tampered_receipts_are_rejected(receipt_signer):
+    receipt = receipt_signer.issue('ESaid', [], 1)
+    encoded, signature = receipt.split('.')
+    payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+    forged = base64.urlsafe_b64encode(json.dumps(dict(payload, said='EForged')).encode()).rstrip(b'=').decode()
+    _, other = make_signer()
+
+    assert receipts.validate_receipt(f"{forged}.{signature}", receipt_signer.key)['reason'] == "Invalid receipt signature"
+    assert receipts.validate_receipt(receipt, other.verfer.qb64)['reason'] == "Invalid receipt signature"
+    assert receipts.validate_receipt(encoded, receipt_signer.key)['reason'] == "Malformed receipt"
+    assert not receipts.validate_receipt(f"{encoded}.{signature[:-4]}", receipt_signer.key)['valid']
+
+
+def test_verifier_key_reports_the_current_trust_generation(verifier, receipt_signer, monkeypatch):
+    monkeypatch.setattr(verifier, 'refresh_verifier_state', lambda: True)
+    monkeypatch.setattr(verifier, 'trust_generation', 4)
+    assert verifier.app.test_client().get('/verifier/key').get_json()['trust_generation'] == 4
+
+    monkeypatch.setattr(verifier, 'trust_generation', 5)
+    body = verifier.app.test_client().get('/verifier/key').get_json()
+    assert (body['key'], body['trust_generation']) == (receipt_signer.key, 5)
+    status, _, asgi_body = asgi_request('GET', '/verifier/key')
+    assert (status, json.loads(asgi_body)) == (200, body)
+
+
+def test_receipt_names_the_received_said(ecr_chain, verifier, receipt_signer):
+    # The 'p' block is not covered by the SAID, so structure validation falls back to makify
+    credential = dict(ecr_chain[0], p={'d': 'placeholder'})
+    received = copy.deepcopy(credential)
+
+    body, status = verifier.verify_credential_request(
+        verifier.json.dumps({'credential': credential}).encode(), 'application/json', {})
+
+    assert status == 200, body
+    assert body['details']['credential_said'] == received['d']
+    assert receipts.validate_receipt(body['receipt'], receipt_signer.key, said=received['d'])['valid']
+
+
+def test_verification_leaves_the_callers_credential_alone(ecr_chain, verifier):
+    credential = dict(ecr_chain[0], p={'d': 'placeholder'})
+    received = copy.deepcopy(credential)
+
+    assert verifier.verify_acdc_credential(credential)['verified']
+    assert credential == received
+
+
+def test_status_details_name_the_stored_said(ecr_chain, verifier):
+    stored = verifier.trust_store.get_credential(verifier.trust_store.lookup('subjects', ecr_chain[3]['le'])[0])
+
+    response = verifier.app.test_client().get(f"/credentials/{stored['d']}/status")
+
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['details']['credential_said'] == stored['d']
+
+
+def test_receipt_key_is_dedicated_and_endorsed_by_the_habitat(tmp_path):
+    with habbing.openHby(name="receipts-test", temp=True) as hby:
+        hab = hby.makeHab(name="verifier")
+        signer = receipts.ReceiptSigner.from_hab(hab, str(tmp_path))
+
+        assert signer.aid == hab.pre and signer.aid_key == hab.kever.verfers[0].qb64
+        assert signer.key != signer.aid_key
+        assert receipts.validate_endorsement(signer.key, signer.endorsement, signer.aid_key)
+        assert not receipts.validate_endorsement(signer.aid_key, signer.endorsement, signer.aid_key)
+        # Worker processes get the receipt key only
+        assert hab.mgr.ks.pris.get(signer.aid_key, decrypter=hab.mgr.decrypter).qb64 not in signer.export().values()
+
+        # The key survives restarts, so receipts issued before one still validate
+        path = tmp_path / receipts.RECEIPT_KEY_FILENAME
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert receipts.ReceiptSigner.from_hab(hab, str(tmp_path)).key == signer.key
@@ -0,0 +1,139 @@
+"""Unix socket RPC: framing, socket start-up and per-connection in-flight cap"""
+
+import os
+import json
+import stat
+import socket
+import threading
+
+import pytest
+
+import rpc
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "v.sock")
+
+
+@pytest.fixture
+def server(socket_path):
+    servers = []
+
+    def start(handlers=(), **kwargs):
+        servers.append(rpc.RpcServer(socket_path, dict(handlers), **kwargs).start())
+        return servers[-1]
+
+    yield start
+    for started in servers:
+        started.close()
+
+
+def test_pipelined_responses_match_their_requests(server, socket_path):
+    server({1: lambda payload: ({'echo': payload.decode()}, 200),
+            2: lambda payload: 1 / 0})
+
+    with rpc.RpcClient(socket_path) as client:
+        responses = client.pipeline([(1, b'a'), (9, b''), (2, b''), (1, b'b'), (rpc.OP_PING, b'')])
+
+    assert [status for status, _ in responses] == [200, 400, 500, 200, 200]
+    assert responses[0][1] == {'echo': 'a'} and responses[3][1] == {'echo': 'b'}
+    assert responses[1][1]['error'] == "Unknown operation 9"
+
+
+def test_oversized_frame_is_rejected():
+    left, right = socket.socketpair()
+    with left, right:
+        left.sendall(rpc.FRAME_HEADER.pack(11, 1, rpc.OP_VERIFY))
+        with pytest.raises(rpc.RpcError, match="exceeds the limit"):
+            rpc.read_frame(right, max_payload=10)
+
+
+def test_truncated_frame_is_an_error():
+    left, right = socket.socketpair()
+    with right:
+        left.sendall(rpc.FRAME_HEADER.pack(10, 1, rpc.OP_VERIFY) + b'short')
+        left.close()
+        with pytest.raises(rpc.RpcError, match="middle of a frame"):
+            rpc.read_frame(right)
+        assert rpc.read_frame(right) is None
+
+
+def test_socket_is_created_group_accessible_only(server, socket_path):
+    server()
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o660
+
+
+def test_live_socket_is_not_taken_over(server, socket_path):
+    server()
+
+    with pytest.raises(rpc.RpcError, match="in use"):
+        rpc.RpcServer(socket_path, {}).start()
+    with rpc.RpcClient(socket_path) as client:
+        assert client.ping() == (200, {'success': True})
+
+
+def test_stale_socket_is_replaced(server, socket_path):
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+
+    server()
+    with rpc.RpcClient(socket_path) as client:
+        assert client.ping()[0] == 200
+
+
+def test_other_files_are_not_replaced(server, socket_path):
+    with open(socket_path, 'w') as f:
+        f.write("not a socket")
+
+    with pytest.raises(rpc.RpcError, match="not a socket"):
+        server()
+
+
+def test_inflight_requests_are_capped_per_connection(server, socket_path):
+    release = threading.Event()
+    lock = threading.Lock()
+    running = [0, 0]  # current, peak
+
+    def slow(payload):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        release.wait(10)
+        with lock:
+            running[0] -= 1
+        return {'ok': True}, 200
+
+    server({1: slow}, workers=8, max_inflight=2)
+    responses = []
+    with rpc.RpcClient(socket_path) as client:
+        caller = threading.Thread(target=lambda: responses.extend(client.pipeline([(1, b'')] * 6)))
+        caller.start()
+        caller.join(0.5)
+        assert running[1] == 2
+        release.set()
+        caller.join(10)
+
+    assert running[1] == 2
+    assert [status for status, _ in responses] == [200] * 6
+
+
+def test_pipeline_larger_than_the_socket_buffers_completes(server, socket_path):
+    server({1: lambda payload: ({'n': len(payload)}, 200)}, max_inflight=2)
+
+    with rpc.RpcClient(socket_path, timeout=10) as client:
+        responses = client.pipeline([(1, bytes(64 * 1024))] * 64)
+
+    assert responses == [(200, {'n': 64 * 1024})] * 64
+
+
+def test_raw_frames_round_trip(server, socket_path):
+    server({1: lambda payload: (json.dumps({'n': len(payload)}).encode(), 200)})
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        rpc.write_frame(sock, 7, 1, b'12345')
+        request_id, status, body = rpc.read_frame(sock)
+
+    assert (request_id, status, json.loads(body)) == (7, 200, {'n': 5})
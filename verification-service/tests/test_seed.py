@@ -0,0 +1,155 @@
+"""Incremental seeding (seed-verifier-db.py): manifest, removals and full runs"""
+
+import os
+import json
+import importlib.util
+
+import pytest
+from keri.core import coring
+
+from conftest import SERVICE_DIR, make_aid, make_credential
+
+_spec = importlib.util.spec_from_file_location('seed_verifier_db', SERVICE_DIR / "seed-verifier-db.py")
+seed = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(seed)
+
+
+def new_key():
+    return coring.Signer(transferable=True).verfer.qb64
+
+
+def write(path, value):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(value))
+    # Distinct mtimes even when the clock is coarse
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def key_event(aid, keys, sn="0", ilk='icp'):
+    return {'v': 'KERI10JSON000000_', 't': ilk, 'd': aid, 'i': aid, 's': sn, 'k': keys}
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    return tmp_path / "keri"
+
+
+@pytest.fixture
+def ingest(trust_store, artifacts, tmp_path):
+    manifest_path = tmp_path / seed.MANIFEST_NAME
+
+    def run(full=False):
+        return seed.ingest_artifacts(trust_store, str(artifacts), manifest_path, workers=1, full=full)
+
+    return run
+
+
+def test_only_new_and_changed_artifacts_are_parsed(trust_store, artifacts, ingest):
+    aid, key = make_aid('issuer')[0], new_key()
+    credential, _ = make_credential(aid, make_aid('holder')[0], alsoKnownAs=["did:example:1"])
+    write(artifacts / "icp" / aid, key_event(aid, [key]))
+    write(artifacts / "credential.json", credential)
+    write(artifacts / "notes.json", {'hello': 'world'})
+
+    first = ingest()
+    assert (first['parsed'], first['key_states'], first['credentials'], first['other']) == (3, 1, 1, 1)
+    assert trust_store.get_key_state(aid)['k'] == [key]
+
+    assert ingest()['parsed'] == 0
+
+    rotated = new_key()
+    write(artifacts / "icp" / aid, key_event(aid, [rotated], sn="1"))
+    second = ingest()
+    assert (second['parsed'], second['unchanged']) == (1, 2)
+    assert trust_store.get_key_state(aid)['k'] == [rotated]
+
+
+def test_removed_credential_is_deleted_with_its_index_entries(trust_store, artifacts, ingest):
+    issuer, holder = make_aid('issuer')[0], make_aid('holder')[0]
+    credential, _ = make_credential(issuer, holder, alsoKnownAs=["did:example:1"])
+    write(artifacts / "credential.json", credential)
+    ingest()
+    assert trust_store.lookup('dids', "did:example:1") == [credential['d']]
+
+    (artifacts / "credential.json").unlink()
+    stats = ingest()
+
+    assert (stats['removed'], stats['deleted']) == (1, 1)
+    assert not trust_store.has_credential(credential['d'])
+    assert trust_store.lookup('dids', "did:example:1") == []
+    assert trust_store.lookup('subjects', holder) == []
+    assert trust_store.lookup('issuers', issuer) == []
+
+
+def test_changed_credential_said_replaces_the_old_record(trust_store, artifacts, ingest):
+    issuer, holder = make_aid('issuer')[0], make_aid('holder')[0]
+    old, _ = make_credential(issuer, holder, role="Director")
+    new, _ = make_credential(issuer, holder, role="Officer")
+    write(artifacts / "credential.json", old)
+    ingest()
+
+    write(artifacts / "credential.json", new)
+    ingest()
+
+    assert not trust_store.has_credential(old['d'])
+    assert trust_store.lookup('subjects', holder) == [new['d']]
+
+
+def test_key_state_is_rebuilt_from_the_remaining_events(trust_store, artifacts, ingest):
+    aid = make_aid('issuer')[0]
+    inception, rotation = new_key(), new_key()
+    write(artifacts / "icp" / aid, key_event(aid, [inception]))
+    write(artifacts / "rot" / aid, key_event(aid, [rotation], sn="1", ilk='rot'))
+    ingest()
+    assert trust_store.get_key_state(aid) == {'s': "1", 'k': [rotation]}
+
+    (artifacts / "rot" / aid).unlink()
+    stats = ingest()
+
+    assert (stats['removed'], stats['rebuilt'], stats['deleted']) == (1, 1, 0)
+    assert trust_store.get_key_state(aid) == {'s': "0", 'k': [inception]}
+
+    (artifacts / "icp" / aid).unlink()
+    ingest()
+    assert trust_store.get_key_state(aid) is None
+
+
+def test_unreadable_artifact_is_retried(trust_store, artifacts, ingest, monkeypatch):
+    aid, key = make_aid('issuer')[0], new_key()
+    write(artifacts / "icp" / aid, key_event(aid, [key]))
+    parse_artifact = seed.parse_artifact
+    monkeypatch.setattr(seed, 'parse_artifact', lambda path: (path, None, 'invalid', None, "Permission denied"))
+
+    assert ingest()['invalid'] == 1
+    assert trust_store.get_key_state(aid) is None
+
+    monkeypatch.setattr(seed, 'parse_artifact', parse_artifact)
+    assert ingest()['key_states'] == 1
+    assert trust_store.get_key_state(aid)['k'] == [key]
+
+
+def test_full_run_clears_the_store(trust_store, artifacts, ingest):
+    aid, key = make_aid('issuer')[0], new_key()
+    write(artifacts / "icp" / aid, key_event(aid, [key]))
+    ingest()
+    trust_store.put_key_state('EWrittenOutsideTheArtifacts', [new_key()])
+
+    stats = ingest(full=True)
+
+    assert stats['key_states'] == 1
+    assert trust_store.get_key_state('EWrittenOutsideTheArtifacts') is None
+    assert trust_store.get_key_state(aid)['k'] == [key]
+
+
+def test_manifest_from_an_older_version_rebuilds_the_store(trust_store, artifacts, ingest, tmp_path):
+    aid = make_aid('issuer')[0]
+    write(artifacts / "icp" / aid, key_event(aid, [new_key()]))
+    ingest()
+    trust_store.put_key_state('EStale', [new_key()])
+    (tmp_path / seed.MANIFEST_NAME).write_text(json.dumps({'version': 1, 'artifacts': {}}))
+
+    ingest()
+
+    assert trust_store.get_key_state('EStale') is None
+    assert trust_store.has_key_state(aid)
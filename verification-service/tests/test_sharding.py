@@ -0,0 +1,195 @@
+"""Sharded mode: the hash ring, /shard authentication and a cluster of verifier processes"""
+
+import json
+import socket
+import threading
+import importlib.util
+from urllib.parse import quote
+
+import pytest
+import requests
+from keri.core import coring
+
+import sharding
+from conftest import SERVICE_DIR, make_aid, make_credential
+
+SECRET = "test-shard-secret"
+
+
+def load_script(name, filename):
+    spec = importlib.util.spec_from_file_location(name, SERVICE_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+seed = load_script('seed_verifier_db', "seed-verifier-db.py")
+cluster = load_script('shard_cluster', "shard-cluster.py")
+
+
+def test_adding_a_node_only_moves_keys_to_it():
+    keys = [f"EKey{i}" for i in range(2000)]
+    before = sharding.HashRing(["http://a", "http://b", "http://c"])
+    after = sharding.HashRing(["http://a", "http://b", "http://c", "http://d"])
+
+    moved = [key for key in keys if before.node_for(key) != after.node_for(key)]
+
+    assert all(after.node_for(key) == "http://d" for key in moved)
+    assert 0.15 < len(moved) / len(keys) < 0.35
+
+
+def test_client_counters_are_exact_under_concurrency(monkeypatch):
+    client = sharding.ShardClient(secret=SECRET)
+    monkeypatch.setattr(client.session, 'get', lambda *args, **kwargs: type('Response', (), {'status_code': 404}))
+
+    threads = [threading.Thread(target=lambda: [client.get("http://a", "x") for _ in range(2000)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client.lookups == 16000
+    assert client.session.headers[sharding.SECRET_HEADER] == SECRET
+
+
+def test_shard_endpoints_need_the_secret(verifier, trust_store, monkeypatch):
+    node = "http://127.0.0.1:1"
+    ring = sharding.HashRing([node])
+    aid = make_aid('issuer')[0]
+    trust_store.put_key_state(aid, [coring.Signer(transferable=True).verfer.qb64])
+    monkeypatch.setattr(sharding, 'ring', ring)
+    monkeypatch.setattr(sharding, 'SHARD_SELF', node)
+    monkeypatch.setattr(sharding, 'SHARD_SECRET', SECRET)
+    monkeypatch.setattr(verifier, 'trust_store', sharding.ShardedTrustStore(trust_store, ring, node))
+    monkeypatch.setattr(verifier, 'refresh_verifier_state', lambda: True)
+    client = verifier.app.test_client()
+
+    for path in ("/shard/ring", f"/shard/key-states/{aid}"):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers={sharding.SECRET_HEADER: "wrong"}).status_code == 401
+        assert client.get(path, headers={sharding.SECRET_HEADER: SECRET}).status_code == 200
+
+
+def free_base_port(count):
+    """A port p such that p..p+count-1 are free right now"""
+    for _ in range(20):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            base = probe.getsockname()[1]
+        try:
+            for port in range(base, base + count):
+                with socket.socket() as s:
+                    s.bind(('127.0.0.1', port))
+            return base
+        except OSError:
+            continue
+    raise RuntimeError("No free port range")
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    """GLEIF -> QVI -> Legal Entity artifacts as generate-credentials.py writes them"""
+    directory = tmp_path / "keri"
+    (directory / "icp").mkdir(parents=True)
+    roles = {role: make_aid(role) for role in ('gleif', 'qvi', 'legal_entity')}
+    for aid, signer in roles.values():
+        event = {'v': 'KERI10JSON000000_', 't': 'icp', 'd': aid, 'i': aid, 's': "0", 'k': [signer.verfer.qb64]}
+        (directory / "icp" / aid).write_text(json.dumps(event))
+
+    gleif, qvi, legal_entity = (roles[role][0] for role in ('gleif', 'qvi', 'legal_entity'))
+    qvi_credential, _ = make_credential(gleif, qvi, LEI="5493001KJTIIGC8Y1R12")
+    le_credential, _ = make_credential(qvi, legal_entity, edges={'qvi': qvi_credential}, LEI="984500E5DEFDBQ1O9038")
+    for credential in (qvi_credential, le_credential):
+        credential['p'] = {'d': 'placeholder'}
+        (directory / credential['d']).write_text(json.dumps(credential))
+    (directory / "habitats.json").write_text(json.dumps({role: {'aid': aid} for role, (aid, _) in roles.items()}))
+
+    keys = [('key-states', aid) for aid, _ in roles.values()]
+    keys += [('credentials', credential['d']) for credential in (qvi_credential, le_credential)]
+    return directory, gleif, le_credential, keys
+
+
+class Cluster:
+    """Verifier processes on consecutive ports, each seeded with its partition before it starts"""
+
+    def __init__(self, db_root, base_port, inception_dir, gleif):
+        self.db_root, self.base_port, self.inception_dir, self.gleif = db_root, base_port, inception_dir, gleif
+        self.nodes = []
+
+    @property
+    def urls(self):
+        return [url for url, _ in self.nodes]
+
+    def start(self, count):
+        urls = [f"http://127.0.0.1:{self.base_port + i}" for i in range(count)]
+        ring = sharding.HashRing(urls)
+        for i, url in enumerate(urls):
+            baser = seed.initialize_verifier_baser(self.db_root / f"shard-{i}")
+            try:
+                trust_store = seed.open_trust_store(baser, seed.LMDB_MAP_SIZE, lambda key, url=url: ring.node_for(key) == url)
+                partition = {'self': url, 'nodes': ring.nodes, 'vnodes': ring.vnodes}
+                seed.ingest_artifacts(trust_store, str(self.inception_dir), self.db_root / f"shard-{i}" / seed.MANIFEST_NAME,
+                                      workers=1, partition=partition)
+            finally:
+                baser.close()
+        self.nodes = cluster.start_nodes(count, self.base_port, self.db_root, self.gleif, SECRET)
+        cluster.wait_healthy(self.nodes)
+        return ring
+
+    def stop(self):
+        cluster.stop_nodes(self.nodes)
+
+    def shard(self, url, path, secret=SECRET):
+        return requests.get(f"{url}/shard/{path}", headers={sharding.SECRET_HEADER: secret}, timeout=10)
+
+    def owners(self, kind, key):
+        return [url for url in self.urls if self.shard(url, f"{kind}/{quote(key, safe='')}").status_code == 200]
+
+    def verify(self, url, credential):
+        return requests.post(f"{url}/verify", json={'credential': credential}, timeout=30)
+
+
+@pytest.fixture
+def shard_cluster(artifacts, tmp_path, monkeypatch):
+    inception_dir, gleif, _, _ = artifacts
+    monkeypatch.setenv('GLEIF_ROOT_AID', gleif)
+    monkeypatch.setenv('LOG_LEVEL', 'WARNING')
+    running = Cluster(tmp_path / "shards", free_base_port(3), inception_dir, gleif)
+    yield running
+    running.stop()
+
+
+def test_cluster_routing_failure_and_rebalancing(shard_cluster, artifacts):
+    _, _, le_credential, keys = artifacts
+
+    # Two nodes: every key on exactly its owner, every node verifies through the other
+    ring = shard_cluster.start(2)
+    for kind, key in keys:
+        assert shard_cluster.owners(kind, key) == [ring.node_for(key)], (kind, key)
+    for url in shard_cluster.urls:
+        assert shard_cluster.shard(url, "ring", secret="wrong").status_code == 401
+        response = shard_cluster.verify(url, le_credential)
+        assert response.status_code == 200 and response.json()['verified'], response.text
+    assert sum(shard_cluster.shard(url, "ring").json()['remote_lookups'] for url in shard_cluster.urls) > 0
+
+    # A third node joins: only keys moving to it change owner, and each is still stored once
+    shard_cluster.stop()
+    grown = shard_cluster.start(3)
+    new_node = shard_cluster.urls[-1]
+    for kind, key in keys:
+        assert shard_cluster.owners(kind, key) == [grown.node_for(key)], (kind, key)
+        assert grown.node_for(key) in (ring.node_for(key), new_node)
+    stats = [shard_cluster.shard(url, "ring").json()['stats'] for url in shard_cluster.urls]
+    assert sum(node['key_states'] for node in stats) == 3 and sum(node['credentials'] for node in stats) == 2
+    for url in shard_cluster.urls:
+        assert shard_cluster.verify(url, le_credential).json()['verified']
+
+    # The node holding the QVI credential fails: the others cannot follow the LE credential's edge, and count the error
+    failed = grown.node_for(keys[3][1])
+    dict(shard_cluster.nodes)[failed].kill()
+    dict(shard_cluster.nodes)[failed].wait()
+    survivor = next(url for url in shard_cluster.urls if url != failed)
+    response = shard_cluster.verify(survivor, le_credential)
+    assert response.json().get('verified') is not True
+    assert shard_cluster.shard(survivor, "ring").json()['remote_errors'] > 0
+    assert requests.get(f"{survivor}/health", timeout=10).status_code == 200
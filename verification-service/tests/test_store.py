@@ -0,0 +1,62 @@
+"""TrustStore read transaction pool"""
+
+import threading
+
+import store
+
+
+def test_writes_are_visible_to_the_next_read(trust_store):
+    trust_store.put_key_state('EAid', ['DKey1'])
+    assert trust_store.get_key_state('EAid')['k'] == ['DKey1']
+    trust_store.put_key_state('EAid', ['DKey2'])
+    assert trust_store.get_key_state('EAid')['k'] == ['DKey2']
+
+
+def test_commits_outside_the_store_are_visible_once_readers_age_out(trust_store, monkeypatch):
+    trust_store.put_key_state('EAid', ['DKey1'])
+    assert trust_store.get_key_state('EAid')['k'] == ['DKey1']
+
+    # Like a commit from seed-verifier-db.py in another process
+    with trust_store.env.begin(write=True) as txn:
+        txn.put(b'EAid', store._compact({'s': '1', 'k': ['DKey2']}), db=trust_store.key_states)
+
+    monkeypatch.setattr(store, 'LMDB_READER_MAX_AGE_SECONDS', 0)
+    assert trust_store.get_key_state('EAid')['k'] == ['DKey2']
+
+
+def test_thread_per_request_reuses_a_bounded_pool(trust_store, monkeypatch):
+    monkeypatch.setattr(store, 'LMDB_READER_POOL_SIZE', 4)
+    monkeypatch.setattr(store, 'LMDB_READER_MAX_AGE_SECONDS', 60)
+    trust_store.put_key_state('EAid', ['DKey1'])
+    opened = []
+    begin = trust_store.env.begin
+
+    class CountingEnv:
+        def begin(self, **kwargs):
+            opened.append(kwargs)
+            return begin(**kwargs)
+
+    monkeypatch.setattr(trust_store, 'env', CountingEnv())
+    barrier = threading.Barrier(8)
+
+    def request():
+        barrier.wait()
+        for _ in range(10):
+            assert trust_store.has_key_state('EAid')
+
+    for _ in range(3):
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    # Transactions are shared across threads: fewer opened than threads started (24), let alone lookups (240)
+    assert len(opened) < 24
+    assert len(trust_store._readers) <= 4
+
+
+def test_nested_reads_share_one_transaction(trust_store):
+    with trust_store.reader() as outer:
+        with trust_store.reader() as inner:
+            assert inner is outer
@@ -0,0 +1,99 @@
+"""Request tracing: sampling, span records, trace IDs and the record listener"""
+
+import json
+import atexit
+import threading
+
+import pytest
+
+import tracing
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    """Trace records go to a fresh listener writing trace_file; read() stops it and returns the records"""
+    path = tmp_path / "traces.jsonl"
+    handlers = list(tracing.trace_logger.handlers)
+    monkeypatch.setattr(tracing, 'TRACE_LOG_FILE', str(path))
+    monkeypatch.setattr(tracing, '_listener', None)
+
+    def stop():
+        if tracing._listener is not None and tracing._listener._thread is not None:
+            tracing._listener.stop()
+            atexit.unregister(tracing._listener.stop)
+
+    def read():
+        stop()
+        return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+    yield read
+    stop()
+    tracing.trace_logger.handlers[:] = handlers
+
+
+def test_sampled_trace_records_its_spans(trace_file):
+    trace = tracing.start_trace(sampled=True)
+    with tracing.span('structure_validation'):
+        pass
+    with pytest.raises(ValueError):
+        with tracing.span('chain_traversal'):
+            raise ValueError("broken chain")
+    tracing.annotate(credential_said='ESaid')
+    tracing.finish_trace(trace, endpoint='/verify', outcome='not_verified')
+
+    [record] = trace_file()
+    assert record['trace_id'] == trace.trace_id
+    assert [(span['name'], span['ok']) for span in record['spans']] == [('structure_validation', True), ('chain_traversal', False)]
+    assert record['spans'][0]['at_ms'] <= record['spans'][1]['at_ms'] <= record['total_ms']
+    assert (record['endpoint'], record['outcome'], record['credential_said']) == ('/verify', 'not_verified', 'ESaid')
+    assert tracing.current_trace() is None
+
+
+def test_unsampled_trace_records_nothing(trace_file):
+    trace = tracing.start_trace(sampled=False)
+    with tracing.span('structure_validation'):
+        pass
+    tracing.annotate(credential_said='ESaid')
+    tracing.finish_trace(trace)
+
+    assert trace.spans == [] and trace.attrs == {}
+    assert trace_file() == []
+
+
+@pytest.mark.parametrize('rate, sampled', [(0.0, False), (1.0, True)])
+def test_sample_rate(monkeypatch, rate, sampled):
+    monkeypatch.setattr(tracing, 'TRACE_SAMPLE_RATE', rate)
+    assert all(tracing.start_trace().sampled is sampled for _ in range(100))
+
+
+def test_valid_trace_id_is_kept():
+    assert tracing.start_trace('0123456789abcdef' * 2).trace_id == '0123456789abcdef' * 2
+
+
+@pytest.mark.parametrize('trace_id', ['', 'short', 'A' * 32, 'g' * 32, 'a' * 33, 'a' * 31 + '\n', '"}{' + 'a' * 29])
+def test_invalid_trace_id_is_replaced(trace_id):
+    generated = tracing.start_trace(trace_id).trace_id
+    assert generated != trace_id and tracing.valid_trace_id(generated)
+
+
+def test_invalid_trace_id_header_is_not_echoed(verifier):
+    response = verifier.app.test_client().post('/verify', json={}, headers={'X-Trace-Id': 'x' * 40})
+    assert tracing.valid_trace_id(response.headers['X-Trace-Id'])
+
+
+def test_concurrent_first_traces_start_one_listener(trace_file):
+    barrier = threading.Barrier(8)
+    traces = [tracing.Trace(f"{i:032x}", True) for i in range(8)]
+
+    def finish(trace):
+        barrier.wait()
+        tracing.finish_trace(trace)
+
+    threads = [threading.Thread(target=finish, args=(trace,)) for trace in traces]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # One queue handler, so each record is written once
+    assert sorted(record['trace_id'] for record in trace_file()) == sorted(trace.trace_id for trace in traces)
@@ -0,0 +1,18 @@
+"""Trust artifact change detection"""
+
+
+def test_fingerprint_is_checked_at_most_once_per_interval(verifier, monkeypatch):
+    calls = []
+    monkeypatch.setattr(verifier, 'trust_artifacts_fingerprint', lambda inception_dir: calls.append(inception_dir) or 'unchanged')
+    monkeypatch.setattr(verifier, '_trust_fingerprint', 'unchanged')
+    monkeypatch.setattr(verifier, '_trust_checked_at', None)
+    monkeypatch.setattr(verifier, 'TRUST_REFRESH_INTERVAL_SECONDS', 60)
+
+    for _ in range(100):
+        assert verifier.refresh_verifier_state()
+    assert len(calls) == 1
+
+    monkeypatch.setattr(verifier, 'TRUST_REFRESH_INTERVAL_SECONDS', 0)
+    verifier.refresh_verifier_state()
+    verifier.refresh_verifier_state()
+    assert len(calls) == 3
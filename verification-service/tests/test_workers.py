@@ -0,0 +1,61 @@
+"""Verification worker processes"""
+
+import os
+import json
+import time
+
+import pytest
+
+import tracing
+import workers
+
+
+@pytest.fixture
+def pool(verifier, ecr_chain):
+    pool = workers.VerifierPool(1, verifier.trust_snapshot, lambda: verifier.trust_generation)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def body(ecr_chain):
+    ecr_credential = dict(ecr_chain[0], p={'d': 'placeholder'})
+    return json.dumps({'credential': ecr_credential}).encode()
+
+
+def test_worker_marker_does_not_touch_the_environment(pool):
+    assert not workers.in_worker_process()
+    assert not any(key.startswith('VERIFIER_WORKER') for key in os.environ)
+
+
+def test_sampled_trace_keeps_worker_spans(pool, body):
+    trace = tracing.start_trace(sampled=True)
+    with tracing.span('worker_pool'):
+        result, status = pool.call('verify_credential_request', body, 'application/json', {})
+
+    assert status == 200 and json.loads(result)['verified']
+    spans = {name: (at, duration) for name, at, duration, _ in trace.spans}
+    assert {'structure_validation', 'chain_traversal', 'gleif_verification'} <= spans.keys()
+    hop_start, hop_duration = spans['worker_pool']
+    assert hop_start <= spans['structure_validation'][0] <= hop_start + hop_duration
+    assert trace.attrs['credential_said'] == json.loads(body)['credential']['d']
+
+
+def test_unsampled_trace_records_nothing(pool, body):
+    trace = tracing.start_trace(sampled=False)
+    assert pool.call('verify_credential_request', body, 'application/json', {})[1] == 200
+    assert trace.spans == []
+
+
+def test_new_generation_restarts_in_the_background(pool, body, verifier, monkeypatch):
+    pool.warm_up()
+    monkeypatch.setattr(verifier, 'trust_generation', verifier.trust_generation + 1)
+
+    # Served by the current pool while the new one starts
+    assert pool.call('verify_credential_request', body, 'application/json', {})[1] == 200
+    for _ in range(600):
+        if pool.restarts:
+            break
+        time.sleep(0.05)
+    assert pool.restarts == 1
+    assert pool.generation == verifier.trust_generation
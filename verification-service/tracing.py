@@ -0,0 +1,169 @@
+"""
+Request tracing for the KERI ACDC Verification Service
+
+Each verification request gets a trace ID and one span per verification step.
+Only sampled traces are recorded, and they are written as a single compact JSON
+record per request through a queue-based handler, so the request thread never
+formats or writes trace output itself. Unsampled requests only pay for a
+random() call and a context variable lookup per span.
+
+A trace ID supplied by the caller (X-Trace-Id) is kept only if it has the
+format of a generated one (32 lowercase hex characters); anything else is
+replaced, so trace records and response headers never carry arbitrary input.
+
+DeferredQueueHandler, JsonLineFormatter and start_queue_listener are also used
+for capture records (capture.py).
+
+Configuration:
+- TRACE_SAMPLE_RATE: fraction of requests to record (0.0 - 1.0, default 0.01)
+- TRACE_LOG_FILE: optional file for trace records (default: stderr)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import random
+import logging
+import threading
+import logging.handlers
+import contextvars
+from contextlib import contextmanager
+
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 0.01))
+TRACE_LOG_FILE = os.getenv('TRACE_LOG_FILE')
+
+trace_logger = logging.getLogger('verifier.trace')
+trace_logger.setLevel(logging.INFO)
+trace_logger.propagate = False
+
+TRACE_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+_current_trace = contextvars.ContextVar('verifier_trace', default=None)
+_listener = None
+_listener_lock = threading.Lock()
+
+
+class Trace:
+    """Per-request trace state: ID, sampling decision and recorded spans"""
+
+    __slots__ = ('trace_id', 'sampled', 'spans', 'start', 'attrs')
+
+    def __init__(self, trace_id, sampled):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans = []
+        self.start = time.perf_counter()
+        self.attrs = {}
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread"""
+
+    def prepare(self, record):
+        return record
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Serialize dict records as compact JSON lines"""
+
+    def format(self, record):
+        return json.dumps(record.msg, separators=(',', ':'), default=str)
+
+
+def start_queue_listener(source_logger, target):
+    """Send source_logger's records through a queue to target, written by a background thread; returns the listener"""
+    record_queue = queue.SimpleQueue()
+    source_logger.addHandler(DeferredQueueHandler(record_queue))
+    listener = logging.handlers.QueueListener(record_queue, target, respect_handler_level=False)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def _start_listener():
+    """Attach the asynchronous queue handler to the trace logger"""
+    global _listener
+    if _listener is not None:
+        return
+
+    with _listener_lock:
+        # Concurrent first traces must not each attach a handler (every record would be written twice)
+        if _listener is not None:
+            return
+        if TRACE_LOG_FILE:
+            target = logging.FileHandler(TRACE_LOG_FILE)
+        else:
+            target = logging.StreamHandler(sys.stderr)
+        target.setFormatter(JsonLineFormatter())
+        _listener = start_queue_listener(trace_logger, target)
+
+
+def valid_trace_id(trace_id):
+    """Return True if trace_id has the format of a generated trace ID"""
+    return isinstance(trace_id, str) and TRACE_ID_PATTERN.fullmatch(trace_id) is not None
+
+
+def start_trace(trace_id=None, sampled=None):
+    """Begin a trace for the current request (a caller-supplied ID is kept if valid) and make it the active trace"""
+    if sampled is None:
+        sampled = TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE
+    trace = Trace(trace_id if valid_trace_id(trace_id) else uuid.uuid4().hex, sampled)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace():
+    """Return the active trace, if any"""
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name):
+    """Time one verification step on the active trace (no-op when unsampled)"""
+    trace = _current_trace.get()
+    if trace is None or not trace.sampled:
+        yield
+        return
+
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        trace.spans.append((name, start - trace.start, time.perf_counter() - start, ok))
+
+
+def annotate(**attrs):
+    """Attach attributes to the active sampled trace"""
+    trace = _current_trace.get()
+    if trace is not None and trace.sampled:
+        trace.attrs.update(attrs)
+
+
+def finish_trace(trace, **attrs):
+    """Close the trace and enqueue its record if it was sampled"""
+    _current_trace.set(None)
+    if not trace.sampled:
+        return
+
+    _start_listener()
+    trace.attrs.update(attrs)
+    record = {
+        'trace_id': trace.trace_id,
+        'ts': time.time(),
+        'total_ms': round((time.perf_counter() - trace.start) * 1000, 3),
+        'spans': [
+            {'name': name, 'at_ms': round(at * 1000, 3), 'ms': round(dur * 1000, 3), 'ok': ok}
+            for name, at, dur, ok in trace.spans
+        ],
+    }
+    record.update(trace.attrs)
+    trace_logger.info(record)
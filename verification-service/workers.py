@@ -0,0 +1,239 @@
+"""
+Process-pool verification for the KERI ACDC Verification Service
+
+SAID recomputation, SerderACDC parsing and signature checks are CPU-bound
+Python, so verification threads serialize on the GIL. With
+VERIFY_WORKER_PROCESSES set, /verify, /verify/batch and /verify/by-did (and
+the RPC and ASGI equivalents) run in a pool of worker processes instead.
+
+Each worker is started with a snapshot of the trust state (key states,
+credentials and indexes from the trust store, the seeded habitats and the
+GLEIF root AID) and runs the unchanged verification core from app.py against
+an in-memory SnapshotStore, without opening LMDB. Requests are sent to workers
+as the raw request body, and only the compact JSON response body and status
+come back. When the trust generation changes, a new pool is started from a
+fresh snapshot in a background thread and warmed up before requests switch to
+it; until then, and for requests already running, the old pool keeps serving.
+
+Spans recorded in a worker for a sampled trace are sent back with the result
+and added to the caller's trace, so traces and captures keep their per-step
+timings. Span start times are taken from perf_counter, which is system-wide on
+the supported platforms, so they line up with the caller's spans.
+
+Each worker is one more process competing for cores, and every call costs a
+round trip between processes, so the pool is capped at the CPUs this process
+may run on. With a single CPU it only adds overhead.
+
+Configuration:
+- VERIFY_WORKER_PROCESSES: worker processes (default: 0, verification runs in-process)
+"""
+
+import os
+import json
+import logging
+import threading
+import multiprocessing
+import multiprocessing.context
+from concurrent.futures import Future, InvalidStateError, ProcessPoolExecutor
+
+import tracing
+
+logger = logging.getLogger(__name__)
+
+VERIFY_WORKER_PROCESSES = int(os.getenv('VERIFY_WORKER_PROCESSES', 0))
+
+# app.py request handlers a worker may run
+WORKER_HANDLERS = ('verify_credential_request', 'verify_batch_request', 'verify_by_did_request')
+
+# Set in worker processes by _init_worker
+_verifier = None
+
+
+class VerifierWorkerProcess(multiprocessing.context.SpawnProcess):
+    """
+    Spawned pool worker
+
+    Its default name (VerifierWorkerProcess-N) is set in the child before the
+    parent's main module is re-imported, so app.py can tell it is starting in a
+    worker without anything in the parent's environment.
+    """
+
+
+class _WorkerContext(multiprocessing.context.SpawnContext):
+    Process = VerifierWorkerProcess
+
+
+def in_worker_process():
+    """Return True inside a pool worker (app.py then skips opening the database)"""
+    # Not parent_process(): a spawned child only learns its parent after the main module is re-imported
+    return multiprocessing.current_process().name.startswith(VerifierWorkerProcess.__name__)
+
+
+def usable_cpus():
+    """CPUs this process may run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def configured_processes():
+    """VERIFY_WORKER_PROCESSES, capped at the usable CPUs"""
+    cpus = usable_cpus()
+    if VERIFY_WORKER_PROCESSES > cpus:
+        logger.warning(f"VERIFY_WORKER_PROCESSES={VERIFY_WORKER_PROCESSES} exceeds the {cpus} usable CPUs, starting {cpus}")
+    if VERIFY_WORKER_PROCESSES > 0 and cpus == 1:
+        logger.warning("Only one CPU is usable: worker processes add a round trip per request without adding throughput")
+    return min(VERIFY_WORKER_PROCESSES, cpus)
+
+
+def _init_worker(snapshot):
+    """Load the trust snapshot into this worker's copy of the verification core"""
+    global _verifier
+    from store import SnapshotStore
+    import sharding
+    import receipts
+    import app as verifier
+
+    # In sharded mode the snapshot only holds this node's partition; other keys are fetched from their shards
+    verifier.trust_store = sharding.shard_store(SnapshotStore(snapshot['store']))
+    verifier.trust_habitats = snapshot['habitats']
+    verifier.trust_generation = snapshot['generation']
+    verifier.GLEIF_ROOT_AID = snapshot['gleif_root_aid']
+    # Start from the parent's verified chain suffixes (restored from a checkpoint after a restart)
+    verifier._chain_cache.update(snapshot['chain_cache'])
+    if snapshot['receipt_signer']:
+        verifier.receipt_signer = receipts.ReceiptSigner.from_export(snapshot['receipt_signer'])
+    _verifier = verifier
+
+
+def _run(handler, args, sampled=False):
+    """
+    Run an app.py request handler and return (compact JSON body, status, trace)
+
+    trace is None unless sampled; then it holds the spans (with absolute
+    perf_counter start times) and attributes recorded while handling.
+    """
+    trace = tracing.start_trace(sampled=sampled)
+    body, status = getattr(_verifier, handler)(*args, refresh=False)
+    recorded = None
+    if sampled:
+        recorded = {
+            'spans': [(name, trace.start + at, duration, ok) for name, at, duration, ok in trace.spans],
+            'attrs': trace.attrs,
+        }
+    return json.dumps(body, separators=(',', ':'), default=str).encode(), status, recorded
+
+
+def _ping(_):
+    return os.getpid()
+
+
+class VerifierPool:
+    """
+    Pool of verification worker processes bound to one trust generation
+
+    snapshot_source() returns (generation, snapshot); it is called at start-up
+    and, from a background thread, whenever current_generation() no longer
+    matches the pool.
+    """
+
+    def __init__(self, processes, snapshot_source, current_generation):
+        self.processes = max(1, processes)
+        self._snapshot_source = snapshot_source
+        self._current_generation = current_generation
+        self._lock = threading.Lock()
+        self._restarting = False
+        self.restarts = 0
+        self._executor, self.generation = self._start()
+        logger.info(f"Started {self.processes} verification worker processes at trust generation {self.generation}")
+
+    def _start(self):
+        """A new executor for the current trust state; returns (executor, generation)"""
+        generation, snapshot = self._snapshot_source()
+        # spawn: workers must not inherit the parent's LMDB environment or threads
+        executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=_WorkerContext(),
+            initializer=_init_worker,
+            initargs=(snapshot,),
+        )
+        return executor, generation
+
+    def _restart(self):
+        """Start and warm up a pool for the new trust generation, then switch requests to it"""
+        try:
+            executor, generation = self._start()
+            # Every worker is spawned and has loaded the snapshot before it gets requests
+            set(executor.map(_ping, range(self.processes)))
+            with self._lock:
+                old, self._executor, self.generation = self._executor, executor, generation
+                self.restarts += 1
+            old.shutdown(wait=False)
+            logger.info(f"Restarted {self.processes} verification worker processes at trust generation {generation}")
+        except Exception as e:
+            logger.error(f"Failed to restart verification worker processes: {str(e)}")
+        finally:
+            with self._lock:
+                self._restarting = False
+
+    def warm_up(self):
+        """Start every worker now instead of on first use; returns the worker PIDs"""
+        return set(self._executor.map(_ping, range(self.processes)))
+
+    def submit(self, handler, *args):
+        """
+        Run an app.py request handler in a worker; returns a Future of (JSON body bytes, status)
+
+        Never blocks on a pool restart: while the pool for a new trust
+        generation starts, requests keep going to the current one.
+        """
+        if handler not in WORKER_HANDLERS:
+            raise ValueError(f"Handler {handler} cannot run in a worker process")
+        if self._current_generation() != self.generation and not self._restarting:
+            with self._lock:
+                if not self._restarting and self._current_generation() != self.generation:
+                    self._restarting = True
+                    threading.Thread(target=self._restart, name='worker-pool-restart', daemon=True).start()
+
+        trace = tracing.current_trace()
+        sampled = trace is not None and trace.sampled
+        inner = self._executor.submit(_run, handler, args, sampled)
+        outer = Future()
+
+        def done(future):
+            if future.cancelled():
+                outer.cancel()
+                return
+            try:
+                body, status, recorded = future.result()
+            except BaseException as e:
+                try:
+                    outer.set_exception(e)
+                except InvalidStateError:
+                    pass
+                return
+            if recorded:
+                # Re-based on the caller's trace, as if the steps had run in-process
+                trace.spans.extend((name, start - trace.start, duration, ok) for name, start, duration, ok in recorded['spans'])
+                trace.attrs.update(recorded['attrs'])
+            try:
+                outer.set_result((body, status))
+            except InvalidStateError:
+                # The caller cancelled (e.g. an ASGI client disconnected)
+                pass
+
+        outer.add_done_callback(lambda future: future.cancelled() and inner.cancel())
+        inner.add_done_callback(done)
+        return outer
+
+    def call(self, handler, *args):
+        """Run an app.py request handler in a worker and wait for (JSON body bytes, status)"""
+        return self.submit(handler, *args).result()
+
+    def shutdown(self):
+        with self._lock:
+            self._restarting = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None